@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DB_DIR = os.path.join(os.path.dirname(__file__), "data")
@@ -19,10 +19,28 @@ else:
         connect_args={"check_same_thread": False},
     )
 
+    # SQLite 는 기본적으로 FK 제약(ON DELETE CASCADE 포함)을 무시하므로 연결마다 켜 줌
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_fk(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def commit_keep_loaded(db):
+    """commit 후에도 로드된 객체를 만료시키지 않음 — 응답을 메모리의 값으로 바로 만들 때.
+    요청 세션의 expire_on_commit 설정은 commit 뒤 원래대로 되돌림."""
+    previous = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = previous
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -15,6 +15,11 @@ import models.project  # noqa: F401
 import models.saved_estimate  # noqa: F401
 import models.customer  # noqa: F401
 import models.contract  # noqa: F401
+import models.dashboard  # noqa: F401
+import models.cache  # noqa: F401
+import models.activity  # noqa: F401
+import models.intake  # noqa: F401
+import models.handler  # noqa: F401
 
 # DB 테이블 생성
 Base.metadata.create_all(bind=engine)
@@ -41,6 +46,40 @@ def _migrate_schema():
                     "ALTER TABLE contracts ADD COLUMN tax_invoice_issued BOOLEAN NOT NULL DEFAULT FALSE"
                 ))
                 conn.commit()
+        if "version" not in cols:
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "ALTER TABLE contracts ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+                ))
+                conn.commit()
+        if "paid_total" not in cols:
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "ALTER TABLE contracts ADD COLUMN paid_total FLOAT NOT NULL DEFAULT 0"
+                ))
+                conn.commit()
+            # 기존 입금으로 합계 채움 (상태 전환은 python -m scripts.contract_state)
+            from database import SessionLocal
+            from services import contract_state
+            db = SessionLocal()
+            try:
+                contract_state.recompute_paid(db)
+                db.commit()
+            finally:
+                db.close()
+        # 전체 계약 목록 조회용
+        with engine.connect() as conn:
+            for index_name, columns in [
+                ("ix_contracts_contract_date", "contract_date, id"),
+                ("ix_contracts_state_contract_date", "state, contract_date, id"),
+            ]:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON contracts ({columns})"
+                ))
+            conn.commit()
+        # 세금계산서 발행 대기 부분 인덱스 — WHERE 절을 모델 정의와 똑같이 만들도록 SQLAlchemy 로 생성
+        from models.contract import ix_contracts_tax_pending
+        ix_contracts_tax_pending.create(bind=engine, checkfirst=True)
 
     if "customer_contacts" in inspector.get_table_names():
         cols = [c["name"] for c in inspector.get_columns("customer_contacts")]
@@ -50,6 +89,13 @@ def _migrate_schema():
                     "ALTER TABLE customer_contacts ADD COLUMN handler VARCHAR(100) NOT NULL DEFAULT ''"
                 ))
                 conn.commit()
+        # 컨택 이력 페이지 조회용
+        with engine.connect() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_customer_contacts_customer_sequence "
+                "ON customer_contacts (customer_id, sequence, id)"
+            ))
+            conn.commit()
 
     if "contract_payments" in inspector.get_table_names():
         cols = [c["name"] for c in inspector.get_columns("contract_payments")]
@@ -59,10 +105,174 @@ def _migrate_schema():
                     "ALTER TABLE contract_payments ADD COLUMN handler VARCHAR(100) NOT NULL DEFAULT ''"
                 ))
                 conn.commit()
+        # 기간별 매출 조회(일/주 단위)·입금 장부 keyset 용 (paid_at, id) — 단일 컬럼 인덱스를 대체
+        indexes = [i["name"] for i in inspector.get_indexes("contract_payments")]
+        if "ix_contract_payments_paid_at_id" not in indexes:
+            with engine.connect() as conn:
+                if engine.dialect.name == "sqlite":
+                    # keyset 비교는 저장 문자열 그대로 하므로 server_default(CURRENT_TIMESTAMP) 로
+                    # 채워진 예전 값도 파이썬이 쓰는 마이크로초 형식으로 맞춤
+                    conn.execute(text(
+                        "UPDATE contract_payments SET paid_at = paid_at || '.000000' "
+                        "WHERE length(paid_at) = 19"
+                    ))
+                conn.execute(text(
+                    "CREATE INDEX ix_contract_payments_paid_at_id ON contract_payments (paid_at, id)"
+                ))
+                conn.execute(text("DROP INDEX IF EXISTS ix_contract_payments_paid_at"))
+                conn.commit()
+
+    if "customers" in inspector.get_table_names():
+        cols = [c["name"] for c in inspector.get_columns("customers")]
+        added = False
+        with engine.connect() as conn:
+            for name, sql_type in [
+                ("contract_count", "INTEGER"),
+                ("contract_total", "FLOAT"),
+                ("paid_total", "FLOAT"),
+                ("outstanding_total", "FLOAT"),
+                ("tax_pending_count", "INTEGER"),
+                ("contact_count", "INTEGER"),
+            ]:
+                if name not in cols:
+                    conn.execute(text(
+                        f"ALTER TABLE customers ADD COLUMN {name} {sql_type} NOT NULL DEFAULT 0"
+                    ))
+                    added = True
+            if "version" not in cols:
+                conn.execute(text(
+                    "ALTER TABLE customers ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+                ))
+            keys_added = False
+            from models.customer import KEY_COLUMNS
+            for name, size in KEY_COLUMNS.items():
+                if name not in cols:
+                    conn.execute(text(
+                        f"ALTER TABLE customers ADD COLUMN {name} VARCHAR({size}) NOT NULL DEFAULT ''"
+                    ))
+                    keys_added = True
+            if engine.dialect.name == "postgresql":
+                # 앞부분 일치 범위 조회가 로케일 콜레이션에 좌우되지 않도록 검색 키는 "C" 콜레이션으로
+                rows = conn.execute(text(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_name = 'customers' AND column_name = ANY(:names) "
+                    "AND (collation_name IS NULL OR collation_name <> 'C')"
+                ), {"names": list(KEY_COLUMNS)}).all()
+                for (name,) in rows:
+                    conn.execute(text(
+                        f'ALTER TABLE customers ALTER COLUMN {name} '
+                        f'TYPE VARCHAR({KEY_COLUMNS[name]}) COLLATE "C"'
+                    ))
+            # 목록 정렬/필터·자동완성·중복 탐지용 — 기존 테이블엔 create_all 이 인덱스를 안 만듦
+            for index_name, columns in [
+                ("ix_customers_updated_at_id", "updated_at, id"),
+                ("ix_customers_outstanding_total", "outstanding_total, id"),
+                ("ix_customers_contact_count", "contact_count, id"),
+                ("ix_customers_name", "name"),
+                ("ix_customers_name_key", "name_key"),
+                ("ix_customers_name_chosung", "name_chosung"),
+                ("ix_customers_company_chosung", "company_chosung"),
+                ("ix_customers_phone_digits", "phone_digits"),
+                ("ix_customers_phone_digits_rev", "phone_digits_rev"),
+                ("ix_customers_email_lower", "lower(email)"),
+            ]:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON customers ({columns})"
+                ))
+            conn.commit()
+        if added or keys_added:
+            # 새로 추가한 집계/검색 키 컬럼을 원본 값에서 채움
+            from database import SessionLocal
+            from services import customer_finance, customer_search
+            db = SessionLocal()
+            try:
+                if added:
+                    customer_finance.recompute(db)
+                if keys_added:
+                    customer_search.rebuild_keys(db)
+                db.commit()
+            finally:
+                db.close()
 
 
 _migrate_schema()
 
+
+def _ensure_dashboard_stats():
+    """대시보드 스냅샷/매출 롤업/활동 로그/고객·자재 검색 색인/담당자 사전·월간 통계가 비어 있으면 (신규 배포 등) 원본 테이블에서 한 번 계산."""
+    from sqlalchemy.exc import IntegrityError
+    from database import SessionLocal
+    from models.activity import ActivityEvent
+    from models.customer import Contact, Customer, CustomerSearchGram
+    from models.dashboard import DashboardStat
+    from models.handler import Handler, HandlerMonthlyStat
+    from models.material import Material, MaterialSearchGram
+    from services import (
+        activity_log,
+        customer_search,
+        dashboard_stats,
+        handler_index,
+        handler_stats,
+        material_search,
+        revenue_rollup,
+    )
+
+    # (다시 채워야 하는지, 재계산) — 대개 원본에 데이터가 있는데 파생 테이블이 빈 경우
+    backfills = [
+        (lambda db: db.query(DashboardStat.key).first() is None, dashboard_stats.rebuild),
+        (revenue_rollup.needs_rebuild, revenue_rollup.rebuild),
+        (
+            lambda db: db.query(ActivityEvent.id).first() is None
+            and db.query(Customer.id).first() is not None,
+            activity_log.backfill,
+        ),
+        (
+            lambda db: db.query(CustomerSearchGram.customer_id).first() is None
+            and db.query(Customer.id).first() is not None,
+            customer_search.rebuild,
+        ),
+        # 검색 필드를 쓰기 때 NFC 로 맞추기 전에 저장된 고객
+        (customer_search.has_unnormalized, customer_search.normalize_stored),
+        (
+            lambda db: db.query(Handler.name).first() is None and bool(handler_index.compute(db)),
+            handler_index.rebuild,
+        ),
+        (
+            lambda db: db.query(HandlerMonthlyStat.handler).first() is None
+            and db.query(Contact.id).first() is not None,
+            handler_stats.rebuild,
+        ),
+        (
+            lambda db: db.query(MaterialSearchGram.material_id).first() is None
+            and db.query(Material.id).first() is not None,
+            material_search.rebuild,
+        ),
+    ]
+    # 항목마다 따로 트랜잭션 — 하나가 실패해도 나머지는 채움
+    for is_empty, rebuild in backfills:
+        db = SessionLocal()
+        try:
+            if is_empty(db):
+                rebuild(db)
+                db.commit()
+        except IntegrityError:
+            # 다른 워커가 동시에 채운 경우
+            db.rollback()
+        finally:
+            db.close()
+
+
+_ensure_dashboard_stats()
+
+
+def _flush_pending_intake():
+    """이전 프로세스가 처리하지 못하고 남긴 폼 접수 처리."""
+    from services import intake_queue
+    intake_queue.flush()
+
+
+_flush_pending_intake()
+
 app = FastAPI(
     title="컨빌 디자인 견적서 API",
     description="인테리어 설계 회사 컨빌디자인 견적서 자동 생성 시스템",
@@ -86,6 +296,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 목록 API 의 keyset 페이지네이션 커서
+    expose_headers=["X-Next-Cursor"],
 )
 
 # 라우터 등록
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
+from sqlalchemy.sql import func
+from database import Base
+
+
+# 활동 종류 (프론트 ActivityItem.type 과 동일하게 유지)
+ACTIVITY_TYPES = [
+    "customer_created",
+    "contact_logged",
+    "contract_created",
+    "payment_received",
+]
+
+
+class ActivityEvent(Base):
+    """대시보드 활동 피드 — 생성 이벤트를 쌓기만 하는 로그 (services/activity_log.py)."""
+    __tablename__ = "activity_events"
+    __table_args__ = (
+        # 피드는 (occurred_at, id) 내림차순 keyset 페이지네이션
+        Index("ix_activity_events_occurred_at_id", "occurred_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(30), nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)  # 등록/컨택/입금 시각
+    customer_id = Column(Integer, nullable=True)       # 고객 삭제 후에도 로그는 유지 (FK 없음)
+    customer_name = Column(String(200), nullable=False, default="")  # 기록 시점 이름
+    amount = Column(Float, nullable=True)
+    description = Column(String(300), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
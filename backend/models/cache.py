@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Integer
+from database import Base
+
+
+class CacheGeneration(Base):
+    """응답 캐시 무효화용 세대 카운터 — 쓰기마다 +1, 워커 간 공유를 위해 DB 에 둠."""
+    __tablename__ = "cache_generations"
+
+    name = Column(String(50), primary_key=True)  # 캐시 영역 (예: "dashboard")
+    generation = Column(Integer, nullable=False, default=0)
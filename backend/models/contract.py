@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Boolean
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Text, Float, ForeignKey, Boolean, Index,
+    and_, false, literal_column,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -14,13 +17,18 @@ PAYMENT_METHODS = [
 # 계약 상태
 CONTRACT_STATES = [
     "active",      # 진행 중
-    "completed",   # 완료 (모두 입금 받음)
+    "completed",   # 완료 (모두 입금 받음 — 완납되면 자동 전환)
     "cancelled",   # 취소
 ]
 
 
 class Contract(Base):
     __tablename__ = "contracts"
+    __table_args__ = (
+        # 전체 계약 목록 (계약일 최신순 keyset, 상태 필터)
+        Index("ix_contracts_contract_date", "contract_date", "id"),
+        Index("ix_contracts_state_contract_date", "state", "contract_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     customer_id = Column(
@@ -40,9 +48,16 @@ class Contract(Base):
     contract_date = Column(String(20), nullable=False, default="")
     state = Column(String(30), nullable=False, default="active")
     tax_invoice_issued = Column(Boolean, nullable=False, default=False)
+    # 입금 합계 — 입금 쓰기 때 services/contract_state.py 에서 변경분만큼 갱신
+    paid_total = Column(Float, nullable=False, default=0, server_default="0")
     memo = Column(Text, nullable=False, default="")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # 행 버전 — 모든 UPDATE 에서 1 증가 (updated_at 을 그대로 두는 입금 합계 갱신 포함). 클라이언트 변경 감지용
+    version = Column(
+        Integer, nullable=False, default=1, server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
 
     payments = relationship(
         "Payment",
@@ -52,8 +67,29 @@ class Contract(Base):
     )
 
 
+# 세금계산서 발행 대기 — 취소되지 않은 미발행 계약.
+# 부분 인덱스를 타도록 조회도 반드시 이 조건 그대로 (값을 바인드 파라미터로 넘기면 SQLite 가 인덱스 조건과 대조 못 함)
+TAX_INVOICE_PENDING = and_(
+    Contract.tax_invoice_issued == false(),
+    Contract.state != literal_column("'cancelled'"),
+)
+
+# 회계 작업 큐 (계약일 오래된 순 keyset) — 발행 대기 계약만 담는 부분 인덱스
+ix_contracts_tax_pending = Index(
+    "ix_contracts_tax_pending",
+    Contract.contract_date,
+    Contract.id,
+    sqlite_where=TAX_INVOICE_PENDING,
+    postgresql_where=TAX_INVOICE_PENDING,
+)
+
+
 class Payment(Base):
     __tablename__ = "contract_payments"
+    __table_args__ = (
+        # 기간별 매출 조회 + 입금 장부 (입금일 최신순 keyset)
+        Index("ix_contract_payments_paid_at_id", "paid_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     contract_id = Column(
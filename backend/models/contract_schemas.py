@@ -57,4 +57,104 @@ class ContractDetail(BaseModel):
     remainingAmount: float  # 미수금 = 계약금액 - 입금합계
     createdAt: str
     updatedAt: str
+    version: int = 1        # 행 버전 — 입금 합계 등 집계만 바뀌어도 증가
     payments: List[PaymentResponse] = []
+
+
+class ContractListItem(BaseModel):
+    """전체 계약 목록용 — 입금 내역 없이 합계만."""
+    id: int
+    customerId: int
+    customerName: str
+    estimateId: Optional[int]
+    title: str
+    contractAmount: float
+    contractDate: str
+    state: str
+    taxInvoiceIssued: bool = False
+    paidAmount: float
+    remainingAmount: float
+    createdAt: str
+    updatedAt: str
+
+
+class ContractPage(BaseModel):
+    items: List[ContractListItem]
+    nextCursor: Optional[str] = None  # 다음 페이지가 있으면 다음 요청의 cursor 로
+
+
+class TaxInvoicePage(ContractPage):
+    total: int  # 발행 대기 전체 건수 (커서와 무관)
+
+
+class TaxInvoiceIssuePayload(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
+    issued: bool = True
+
+
+class ContractAggregates(BaseModel):
+    """입금 변경 응답(view=row)용 — 계약의 현재 버전과 입금 집계만."""
+    id: int
+    updatedAt: str
+    version: int
+    state: str
+    contractAmount: float
+    paidAmount: float
+    remainingAmount: float
+
+
+class PaymentMutation(BaseModel):
+    payment: Optional[PaymentResponse] = None  # 삭제면 None
+    contract: ContractAggregates
+
+
+# ── 은행 거래내역 대사 ──
+
+class ReconcileItem(BaseModel):
+    row: int                  # 파일의 행 번호
+    date: str
+    amount: float
+    depositor: str
+    status: str               # auto / proposed / duplicate / unmatched
+    contractId: Optional[int] = None
+    customerId: Optional[int] = None
+    customerName: str = ""
+    contractTitle: str = ""
+    remainingBefore: Optional[float] = None  # 매칭 당시 계약의 남은 금액
+    score: float = 0
+    reasons: List[str] = []   # name / name_prefix / amount / partial / date
+    paymentId: Optional[int] = None  # apply 로 등록된 입금
+
+
+class ReconcileError(BaseModel):
+    row: int
+    message: str
+
+
+class ReconcileResult(BaseModel):
+    deposits: int
+    auto: int
+    proposed: int
+    duplicate: int
+    unmatched: int
+    failed: int
+    applied: int              # 실제로 등록한 입금 수 (apply=false 면 0)
+    errors: List[ReconcileError] = []
+    items: List[ReconcileItem] = []
+
+
+class ReconcileConfirmItem(BaseModel):
+    contractId: int
+    amount: float = Field(gt=0)
+    paidAt: datetime
+    depositor: str = ""
+    memo: str = ""
+
+
+class ReconcileConfirmPayload(BaseModel):
+    items: List[ReconcileConfirmItem] = Field(min_length=1, max_length=5000)
+
+
+class ReconcileConfirmed(BaseModel):
+    created: int
+    paymentIds: List[int]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, Index, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -22,8 +22,37 @@ CONTRACT_STATUSES = [
 ]
 
 
+def _KeyString(length: int):
+    """검색 키 컬럼 타입 — 앞부분 일치 범위 조회(prefix <= col < prefix + U+10FFFF)와 정렬이
+    코드포인트 순서여야 하므로 PostgreSQL 에서는 로케일 콜레이션 대신 "C" (SQLite 는 기본이 바이너리)."""
+    return String(length).with_variant(String(length, collation="C"), "postgresql")
+
+
+# 콜레이션을 "C" 로 맞춰야 하는 검색 키 컬럼 (main.py 마이그레이션용)
+KEY_COLUMNS = {
+    "name_key": 200,
+    "name_chosung": 200,
+    "company_chosung": 200,
+    "phone_digits": 50,
+    "phone_digits_rev": 50,
+}
+
+
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # 목록 정렬·필터 (keyset: 값, id) — 기본 최근 수정순, 미수금/컨택 수
+        Index("ix_customers_updated_at_id", "updated_at", "id"),
+        Index("ix_customers_outstanding_total", "outstanding_total", "id"),
+        Index("ix_customers_contact_count", "contact_count", "id"),
+        # 자동완성 (앞부분 일치 범위 조회) / 중복 후보 이름 일치
+        Index("ix_customers_name", "name"),
+        Index("ix_customers_name_key", "name_key"),
+        Index("ix_customers_name_chosung", "name_chosung"),
+        Index("ix_customers_company_chosung", "company_chosung"),
+        Index("ix_customers_phone_digits", "phone_digits"),
+        Index("ix_customers_phone_digits_rev", "phone_digits_rev"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(200), nullable=False)
@@ -37,6 +66,26 @@ class Customer(Base):
     contract_status = Column(String(50), nullable=False, default="pre_consultation")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # 행 버전 — 모든 UPDATE 에서 1 증가 (updated_at 을 그대로 두는 집계 갱신 포함). 클라이언트 변경 감지용
+    version = Column(
+        Integer, nullable=False, default=1, server_default="1",
+        onupdate=literal_column("version") + 1,
+    )
+
+    # 재무/컨택 집계 — 계약·입금·컨택 쓰기 때 services/customer_finance.py 에서 갱신
+    contract_count = Column(Integer, nullable=False, default=0, server_default="0")
+    contract_total = Column(Float, nullable=False, default=0, server_default="0")
+    paid_total = Column(Float, nullable=False, default=0, server_default="0")
+    outstanding_total = Column(Float, nullable=False, default=0, server_default="0")  # 취소 계약 제외
+    tax_pending_count = Column(Integer, nullable=False, default=0, server_default="0")  # 미발행 세금계산서
+    contact_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # 검색 키 — 고객 쓰기 때 services/customer_search.py 에서 갱신
+    name_key = Column(_KeyString(200), nullable=False, default="", server_default="")  # 소문자·NFC
+    name_chosung = Column(_KeyString(200), nullable=False, default="", server_default="")  # 김민수 → ㄱㅁㅅ
+    company_chosung = Column(_KeyString(200), nullable=False, default="", server_default="")
+    phone_digits = Column(_KeyString(50), nullable=False, default="", server_default="")  # 숫자만
+    phone_digits_rev = Column(_KeyString(50), nullable=False, default="", server_default="")  # 뒷자리 검색용
 
     contacts = relationship(
         "Contact",
@@ -48,6 +97,10 @@ class Customer(Base):
 
 class Contact(Base):
     __tablename__ = "customer_contacts"
+    __table_args__ = (
+        # 고객별 컨택 이력 keyset 페이지 (customer_id, sequence, id)
+        Index("ix_customer_contacts_customer_sequence", "customer_id", "sequence", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     customer_id = Column(
@@ -63,3 +116,36 @@ class Contact(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     customer = relationship("Customer", back_populates="contacts")
+
+
+class CustomerSearchGram(Base):
+    """고객 검색용 n-gram 역색인 — 이름/회사/연락처/이메일의 1·2글자 조각 (services/customer_search.py 에서 갱신)."""
+    __tablename__ = "customer_search_grams"
+
+    gram = Column(String(8), primary_key=True)
+    customer_id = Column(
+        Integer,
+        ForeignKey("customers.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+
+class CustomerDuplicate(Base):
+    """중복 의심 고객 쌍 (services/customer_dedup.py). customer_id < duplicate_id 로 한 번만 저장."""
+    __tablename__ = "customer_duplicates"
+
+    customer_id = Column(
+        Integer, ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True
+    )
+    duplicate_id = Column(
+        Integer, ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    score = Column(Float, nullable=False)           # 0~1 유사도
+    reasons = Column(String(100), nullable=False, default="")  # 예: "phone,name"
+    dismissed = Column(Boolean, nullable=False, default=False)  # "중복 아님" 처리
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# 이메일 중복 탐색은 대소문자 무시 — 식 인덱스라 테이블 정의 뒤에 선언
+Index("ix_customers_email_lower", func.lower(Customer.email))
@@ -22,6 +22,21 @@ class ContactResponse(BaseModel):
 
 # ── Customer ──
 
+class CustomerAggregates(BaseModel):
+    """컨택 변경 응답(view=row)용 — 고객의 현재 버전과 집계만."""
+    id: int
+    updatedAt: str
+    version: int
+    contactCount: int
+    contractCount: int = 0
+    outstandingTotal: float = 0
+
+
+class ContactMutation(BaseModel):
+    contact: Optional[ContactResponse] = None  # 삭제면 None
+    customer: CustomerAggregates
+
+
 class CustomerInput(BaseModel):
     name: str = Field(min_length=1, max_length=200)
     companyName: str = ""
@@ -54,6 +69,41 @@ class CustomerListItem(BaseModel):
     updatedAt: str
 
 
+class SearchHighlight(BaseModel):
+    field: str  # name | company_name | phone | email
+    start: int  # 소문자·NFC 정규화한 값 기준 위치
+    length: int
+
+
+class CustomerSearchHit(BaseModel):
+    customer: CustomerListItem
+    score: float
+    highlights: List[SearchHighlight] = []
+
+
+class CustomerSuggestion(BaseModel):
+    id: int
+    name: str
+    companyName: str
+    phone: str
+
+
+class DuplicatePair(BaseModel):
+    customer: CustomerListItem
+    duplicate: CustomerListItem
+    score: float
+    reasons: List[str] = []  # phone | email | name | company
+
+
+class DuplicateDismiss(BaseModel):
+    customerId: int
+    duplicateId: int
+
+
+class MergePayload(BaseModel):
+    sourceIds: List[int] = Field(min_length=1)  # target 으로 합칠 (삭제될) 고객
+
+
 class CustomerDetail(BaseModel):
     id: int
     name: str
@@ -67,4 +117,12 @@ class CustomerDetail(BaseModel):
     contractStatus: str
     createdAt: str
     updatedAt: str
+    version: int = 1  # 행 버전 — 컨택 수/미수금 등 집계만 바뀌어도 증가
     contacts: List[ContactResponse] = []
+    contactTotal: int = 0  # 전체 컨택 수 (contactLimit 로 일부만 받았을 때도)
+    contactsNextCursor: Optional[str] = None  # 더 이전 컨택이 있으면 GET /{id}/contacts 의 cursor 로
+
+
+class ContactPage(BaseModel):
+    items: List[ContactResponse]
+    nextCursor: Optional[str] = None  # 더 이전 컨택이 있으면 다음 요청의 cursor 로
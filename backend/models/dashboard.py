@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Float, Integer
+from database import Base
+
+
+class DashboardStat(Base):
+    """대시보드 통계 스냅샷 — 지표 key 별 누적값 (services/dashboard_stats.py 에서 갱신)."""
+    __tablename__ = "dashboard_stats"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(Float, nullable=False, default=0)
+
+
+class RevenueByMonth(Base):
+    """월 × 결제수단 × 담당자 매출 롤업 (services/revenue_rollup.py 에서 갱신)."""
+    __tablename__ = "revenue_by_month"
+
+    month = Column(String(7), primary_key=True)      # YYYY-MM
+    method = Column(String(30), primary_key=True)
+    handler = Column(String(100), primary_key=True)  # 미지정은 ""
+    amount = Column(Float, nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Integer, Float
+from database import Base
+
+
+class Handler(Base):
+    """담당자 사전 — 컨택/입금에 쓰인 담당자 이름별 사용 횟수 (services/handler_index.py 에서 갱신).
+
+    이름은 앞뒤 공백 제거·연속 공백 하나로 정규화한 값. 사용처가 모두 지워져도 행은 남고 횟수만 0.
+    """
+    __tablename__ = "handlers"
+
+    name = Column(String(100), primary_key=True)
+    contact_count = Column(Integer, nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+
+
+class HandlerMonthlyStat(Base):
+    """담당자 × 월 컨택 활동 카운터 (services/handler_stats.py 에서 갱신).
+
+    담당자는 handlers.name 과 같은 정규화 값 (미지정은 ""), 월은 컨택 일시 기준 YYYY-MM.
+    """
+    __tablename__ = "handler_monthly_stats"
+
+    handler = Column(String(100), primary_key=True)
+    month = Column(String(7), primary_key=True)
+    contact_count = Column(Integer, nullable=False, default=0)
+    lead_count = Column(Integer, nullable=False, default=0)       # 고객의 첫 컨택
+    converted_count = Column(Integer, nullable=False, default=0)  # 그 중 계약 전환된 고객
+    gap_days = Column(Float, nullable=False, default=0)           # 직전 컨택과의 간격(일) 합계
+    gap_count = Column(Integer, nullable=False, default=0)
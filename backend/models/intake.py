@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.sql import func
+from database import Base
+
+
+# 접수 처리 상태
+INTAKE_STATUSES = ["queued", "processing", "done", "failed"]
+
+
+class IntakeSubmission(Base):
+    """외부 폼 접수 큐 (services/intake_queue.py).
+
+    웹훅은 이 테이블에 한 행 넣고 바로 202 를 돌려주고, 고객/컨택 생성은 묶어서 나중에 처리.
+    idempotency_key 는 Idempotency-Key 헤더 값, 없으면 원본 페이로드 해시 — 폼 재전송 중복 방지
+    (해시는 일정 시간 안의 재전송만, 지난 접수는 key 뒤에 '@행 id' 를 붙여 비켜 둠).
+    """
+    __tablename__ = "intake_submissions"
+    __table_args__ = (
+        # 처리 대기열 조회 (status, id)
+        Index("ix_intake_submissions_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(200), nullable=False, unique=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    claim_token = Column(String(40), nullable=True)   # 처리 중인 워커 표시
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    customer_id = Column(Integer, nullable=True)      # 처리 후 생성된 고객 (고객 삭제와 무관하게 유지)
+    error = Column(Text, nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
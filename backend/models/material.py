@@ -55,6 +55,19 @@ class Material(Base):
     sketchup_mappings = relationship("SketchupMapping", back_populates="material")
 
 
+class MaterialSearchGram(Base):
+    """자재 검색용 n-gram 역색인 — 제품명/품번/규격/브랜드의 1·2글자 조각 (services/material_search.py 에서 갱신)."""
+    __tablename__ = "material_search_grams"
+
+    gram = Column(String(8), primary_key=True)
+    material_id = Column(
+        Integer,
+        ForeignKey("materials.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+
 class WorkType(Base):
     __tablename__ = "work_types"
 
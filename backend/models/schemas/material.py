@@ -107,7 +107,7 @@ class MaterialResponse(BaseModel):
 
 class MaterialListResponse(BaseModel):
     materials: List[MaterialResponse]
-    total: int
+    total: Optional[int] = None  # include_total=false 면 생략
 
 
 # ── WorkType ──
@@ -158,7 +158,7 @@ class LaborRateResponse(BaseModel):
 
 class LaborRateListResponse(BaseModel):
     labor_rates: List[LaborRateResponse]
-    total: int
+    total: Optional[int] = None  # include_total=false 면 생략
 
 
 # ── MiscItem ──
@@ -185,7 +185,7 @@ class MiscItemResponse(BaseModel):
 
 class MiscItemListResponse(BaseModel):
     misc_items: List[MiscItemResponse]
-    total: int
+    total: Optional[int] = None  # include_total=false 면 생략
 
 
 # ── SketchupMapping ──
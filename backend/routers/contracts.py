@@ -1,19 +1,37 @@
+from collections import Counter
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.orm import Session, selectinload
 
-from database import get_db
+from database import commit_keep_loaded, get_db
 from models.customer import Customer
-from models.contract import Contract, Payment, PAYMENT_METHODS, CONTRACT_STATES
+from models.contract import (
+    Contract,
+    Payment,
+    PAYMENT_METHODS,
+    CONTRACT_STATES,
+    TAX_INVOICE_PENDING,
+)
 from models.contract_schemas import (
+    ContractAggregates,
     ContractInput,
     ContractDetail,
+    ContractListItem,
+    ContractPage,
     PaymentInput,
+    PaymentMutation,
     PaymentResponse,
+    ReconcileConfirmed,
+    ReconcileConfirmPayload,
+    ReconcileResult,
+    TaxInvoiceIssuePayload,
+    TaxInvoicePage,
 )
 from models.saved_estimate import SavedEstimate
+from services import pagination, payment_reconcile, write_hooks
+from services.pagination import encode_cursor, parse_cursor, parse_text
 
 router = APIRouter(tags=["contracts"])
 
@@ -46,10 +64,46 @@ def _contract_to_detail(c: Contract) -> ContractDetail:
         remainingAmount=max(0, (c.contract_amount or 0) - paid),
         createdAt=c.created_at.isoformat() if c.created_at else "",
         updatedAt=c.updated_at.isoformat() if c.updated_at else "",
+        version=c.version or 1,
         payments=[_payment_to_response(p) for p in payments],
     )
 
 
+def _contract_to_list_item(c: Contract, customer_name: str) -> ContractListItem:
+    paid = c.paid_total or 0
+    return ContractListItem(
+        id=c.id,
+        customerId=c.customer_id,
+        customerName=customer_name or "",
+        estimateId=c.estimate_id,
+        title=c.title or "",
+        contractAmount=c.contract_amount or 0,
+        contractDate=c.contract_date or "",
+        state=c.state or "active",
+        taxInvoiceIssued=bool(c.tax_invoice_issued),
+        paidAmount=paid,
+        remainingAmount=max(0, (c.contract_amount or 0) - paid),
+        createdAt=c.created_at.isoformat() if c.created_at else "",
+        updatedAt=c.updated_at.isoformat() if c.updated_at else "",
+    )
+
+
+def _contract_aggregates(c: Contract, paid: float) -> ContractAggregates:
+    return ContractAggregates(
+        id=c.id,
+        updatedAt=c.updated_at.isoformat() if c.updated_at else "",
+        version=c.version or 1,
+        state=c.state or "active",
+        contractAmount=c.contract_amount or 0,
+        paidAmount=paid,
+        remainingAmount=max(0, (c.contract_amount or 0) - paid),
+    )
+
+
+# 입금 변경 응답 형식 — full: 계약 상세 + 입금 전체(기존), row: 바뀐 입금 + 계약 집계만
+_VIEW_QUERY = Query("full", pattern="^(full|row)$", description="row 는 바뀐 행과 부모 집계만")
+
+
 def _validate_state(state: str) -> None:
     if state not in CONTRACT_STATES:
         raise HTTPException(status_code=400, detail=f"잘못된 계약 상태: {state}")
@@ -60,6 +114,195 @@ def _validate_method(method: str) -> None:
         raise HTTPException(status_code=400, detail=f"잘못된 결제 수단: {method}")
 
 
+# ── Contract: 전체 목록 ──
+
+_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
+@router.get("/api/contracts", response_model=ContractPage)
+async def list_contracts(
+    db: Session = Depends(get_db),
+    state: Optional[str] = None,
+    taxInvoiceIssued: Optional[bool] = None,
+    customerId: Optional[int] = None,
+    dateFrom: Optional[str] = Query(None, pattern=_DATE_PATTERN, description="계약일 하한 (YYYY-MM-DD)"),
+    dateTo: Optional[str] = Query(None, pattern=_DATE_PATTERN, description="계약일 상한 (포함)"),
+    minAmount: Optional[float] = Query(None, ge=0),
+    maxAmount: Optional[float] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="이전 응답의 nextCursor"),
+):
+    """고객 구분 없는 계약 목록 (계약일 최신순). 입금 합계는 contracts.paid_total 컬럼."""
+    if state is not None:
+        _validate_state(state)
+    q = (
+        db.query(Contract, Customer.name)
+        .join(Customer, Customer.id == Contract.customer_id)
+    )
+    if state is not None:
+        q = q.filter(Contract.state == state)
+    if taxInvoiceIssued is not None:
+        q = q.filter(Contract.tax_invoice_issued == taxInvoiceIssued)
+    if customerId is not None:
+        q = q.filter(Contract.customer_id == customerId)
+    if dateFrom:
+        q = q.filter(Contract.contract_date >= dateFrom)
+    if dateTo:
+        q = q.filter(Contract.contract_date <= dateTo)
+    if minAmount is not None:
+        q = q.filter(Contract.contract_amount >= minAmount)
+    if maxAmount is not None:
+        q = q.filter(Contract.contract_amount <= maxAmount)
+    if cursor:
+        contract_date, contract_id = parse_cursor(cursor, parse_text, int)
+        q = q.filter(pagination.before(
+            db, [Contract.contract_date, Contract.id], [contract_date, contract_id]
+        ))
+    rows = (
+        q.order_by(Contract.contract_date.desc(), Contract.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.contract_date, last.id)
+    return ContractPage(
+        items=[_contract_to_list_item(c, name) for c, name in rows],
+        nextCursor=next_cursor,
+    )
+
+
+# ── 세금계산서 발행 대기 (회계 작업 큐) ──
+
+@router.get("/api/contracts/tax-invoice-pending", response_model=TaxInvoicePage)
+async def list_tax_invoice_pending(
+    db: Session = Depends(get_db),
+    customerId: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="이전 응답의 nextCursor"),
+):
+    """세금계산서를 아직 발행하지 않은 (취소 안 된) 계약 — 계약일 오래된 순.
+    조건이 ix_contracts_tax_pending 부분 인덱스와 같아 발행 대기 계약만 훑음."""
+    q = db.query(Contract).filter(TAX_INVOICE_PENDING)
+    if customerId is not None:
+        q = q.filter(Contract.customer_id == customerId)
+    total = q.count()
+    if cursor:
+        contract_date, contract_id = parse_cursor(cursor, parse_text, int)
+        q = q.filter(pagination.after(
+            db, [Contract.contract_date, Contract.id], [contract_date, contract_id]
+        ))
+    rows = (
+        q.order_by(Contract.contract_date, Contract.id)
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].contract_date, rows[-1].id)
+    names = dict(
+        db.query(Customer.id, Customer.name)
+        .filter(Customer.id.in_({r.customer_id for r in rows}))
+        .all()
+    ) if rows else {}
+    return TaxInvoicePage(
+        items=[_contract_to_list_item(r, names.get(r.customer_id, "")) for r in rows],
+        nextCursor=next_cursor,
+        total=total,
+    )
+
+
+@router.patch("/api/contracts/tax-invoice")
+async def bulk_set_tax_invoice(
+    payload: TaxInvoiceIssuePayload, db: Session = Depends(get_db)
+):
+    """여러 계약의 세금계산서 발행 여부를 UPDATE 한 번으로 변경 (이미 같은 값인 계약은 제외)."""
+    ids = write_hooks.contracts_tax_invoice_updating(db, payload.ids, payload.issued)
+    if ids:
+        db.query(Contract).filter(Contract.id.in_(ids)).update(
+            {"tax_invoice_issued": payload.issued}, synchronize_session=False
+        )
+    db.commit()
+    return {"updated": len(ids)}
+
+
+# ── 은행 거래내역 대사 ──
+
+@router.post("/api/contracts/reconcile", response_model=ReconcileResult)
+def reconcile_bank_statement(
+    file: UploadFile = File(...),
+    apply: bool = Query(False, description="자동 매칭 건을 입금으로 등록 (false 면 매칭 결과만)"),
+    db: Session = Depends(get_db),
+):
+    """은행 입금 내역(CSV/XLSX)을 진행 중인 계약에 매칭. 헤더는 거래일시/입금액/입금자(적요) 등.
+    apply=true 면 자동 매칭(auto) 건을 한 트랜잭션으로 입금 등록하고, 제안(proposed) 건은
+    확인 후 /api/contracts/reconcile/confirm 으로 등록. (오래 걸리는 작업이라 def)"""
+    errors: List[dict] = []
+    try:
+        deposits = payment_reconcile.read_deposits(file.filename, file.file, errors)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items = []
+    created = []
+    for deposit, result in payment_reconcile.match(db, deposits):
+        if apply and result["status"] == "auto":
+            payment = payment_reconcile.new_payment(
+                result["contractId"], deposit.amount, deposit.date, deposit.depositor, deposit.memo
+            )
+            db.add(payment)
+            created.append((payment, result))
+        items.append(result)
+    if created:
+        write_hooks.payments_added(db, [p for p, _ in created])
+        for payment, result in created:
+            result["paymentId"] = payment.id
+        db.commit()
+
+    counts = Counter(item["status"] for item in items)
+    return ReconcileResult(
+        deposits=len(deposits),
+        auto=counts["auto"],
+        proposed=counts["proposed"],
+        duplicate=counts["duplicate"],
+        unmatched=counts["unmatched"],
+        failed=len(errors),
+        applied=len(created),
+        errors=errors[:payment_reconcile.MAX_REPORTED_ERRORS],
+        items=sorted(items, key=lambda item: item["row"]),
+    )
+
+
+@router.post("/api/contracts/reconcile/confirm", response_model=ReconcileConfirmed)
+def confirm_reconciled_payments(
+    payload: ReconcileConfirmPayload, db: Session = Depends(get_db)
+):
+    """대사 결과 중 확인한 건들을 한 트랜잭션으로 입금 등록."""
+    contract_ids = {item.contractId for item in payload.items}
+    found = {
+        cid for (cid,) in db.query(Contract.id).filter(Contract.id.in_(contract_ids))
+    }
+    missing = sorted(contract_ids - found)
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"계약을 찾을 수 없습니다: {', '.join(map(str, missing))}",
+        )
+    payments = [
+        payment_reconcile.new_payment(
+            item.contractId, item.amount, item.paidAt, item.depositor, item.memo
+        )
+        for item in payload.items
+    ]
+    db.add_all(payments)
+    write_hooks.payments_added(db, payments)
+    db.commit()
+    return ReconcileConfirmed(created=len(payments), paymentIds=[p.id for p in payments])
+
+
 # ── Contract: 고객별 ──
 
 @router.get("/api/customers/{customer_id}/contracts", response_model=List[ContractDetail])
@@ -96,7 +339,7 @@ async def create_contract(
         memo=payload.memo,
     )
     db.add(row)
-    db.flush()
+    write_hooks.contract_saved(db, None, row)
 
     # 계약 생성과 동시에 입금 한 건 등록 (옵션)
     if payload.initialPayment and payload.initialPayment.amount > 0:
@@ -109,6 +352,7 @@ async def create_contract(
             handler=payload.initialPayment.handler or "",
         )
         db.add(payment)
+        write_hooks.payment_saved(db, row, None, payment)
 
     db.commit()
     db.refresh(row)
@@ -140,6 +384,7 @@ async def create_contract_from_estimate(
         memo=f"견적 #{estimate_id} 으로부터 자동 생성",
     )
     db.add(row)
+    write_hooks.contract_saved(db, None, row)
     db.commit()
     db.refresh(row)
     return _contract_to_detail(row)
@@ -168,6 +413,7 @@ async def update_contract(
     if not row:
         raise HTTPException(status_code=404, detail="계약을 찾을 수 없습니다")
     _validate_state(payload.state)
+    before = write_hooks.snapshot(row)
     row.estimate_id = payload.estimateId
     row.title = payload.title
     row.contract_amount = payload.contractAmount
@@ -175,6 +421,7 @@ async def update_contract(
     row.state = payload.state
     row.tax_invoice_issued = payload.taxInvoiceIssued
     row.memo = payload.memo
+    write_hooks.contract_saved(db, before, row)
     db.commit()
     db.refresh(row)
     return _contract_to_detail(row)
@@ -185,6 +432,7 @@ async def delete_contract(contract_id: int, db: Session = Depends(get_db)):
     row = db.query(Contract).filter(Contract.id == contract_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="계약을 찾을 수 없습니다")
+    write_hooks.contract_deleting(db, row)
     db.delete(row)
     db.commit()
     return {"ok": True}
@@ -192,9 +440,15 @@ async def delete_contract(contract_id: int, db: Session = Depends(get_db)):
 
 # ── Payment ──
 
-@router.post("/api/contracts/{contract_id}/payments", response_model=ContractDetail)
+@router.post(
+    "/api/contracts/{contract_id}/payments",
+    response_model=Union[ContractDetail, PaymentMutation],
+)
 async def add_payment(
-    contract_id: int, payload: PaymentInput, db: Session = Depends(get_db)
+    contract_id: int,
+    payload: PaymentInput,
+    view: str = _VIEW_QUERY,
+    db: Session = Depends(get_db),
 ):
     contract = db.query(Contract).filter(Contract.id == contract_id).first()
     if not contract:
@@ -209,14 +463,29 @@ async def add_payment(
         handler=payload.handler or "",
     )
     db.add(payment)
+    paid = write_hooks.payment_saved(db, contract, None, payment)
+    if view == "row":
+        # commit 후 계약/입금 재조회 없이 메모리의 값과 훅이 구한 입금 합계로 응답
+        commit_keep_loaded(db)
+        return PaymentMutation(
+            payment=_payment_to_response(payment),
+            contract=_contract_aggregates(contract, paid),
+        )
     db.commit()
     db.refresh(contract)
     return _contract_to_detail(contract)
 
 
-@router.put("/api/contracts/{contract_id}/payments/{payment_id}", response_model=ContractDetail)
+@router.put(
+    "/api/contracts/{contract_id}/payments/{payment_id}",
+    response_model=Union[ContractDetail, PaymentMutation],
+)
 async def update_payment(
-    contract_id: int, payment_id: int, payload: PaymentInput, db: Session = Depends(get_db)
+    contract_id: int,
+    payment_id: int,
+    payload: PaymentInput,
+    view: str = _VIEW_QUERY,
+    db: Session = Depends(get_db),
 ):
     payment = (
         db.query(Payment)
@@ -226,20 +495,34 @@ async def update_payment(
     if not payment:
         raise HTTPException(status_code=404, detail="입금 내역을 찾을 수 없습니다")
     _validate_method(payload.method)
+    before = write_hooks.snapshot(payment)
     payment.amount = payload.amount
     if payload.paidAt is not None:
         payment.paid_at = payload.paidAt
     payment.method = payload.method
     payment.memo = payload.memo
     payment.handler = payload.handler or ""
-    db.commit()
     contract = db.query(Contract).filter(Contract.id == contract_id).first()
+    paid = write_hooks.payment_saved(db, contract, before, payment)
+    if view == "row":
+        commit_keep_loaded(db)
+        return PaymentMutation(
+            payment=_payment_to_response(payment),
+            contract=_contract_aggregates(contract, paid),
+        )
+    db.commit()
     return _contract_to_detail(contract)
 
 
-@router.delete("/api/contracts/{contract_id}/payments/{payment_id}", response_model=ContractDetail)
+@router.delete(
+    "/api/contracts/{contract_id}/payments/{payment_id}",
+    response_model=Union[ContractDetail, PaymentMutation],
+)
 async def delete_payment(
-    contract_id: int, payment_id: int, db: Session = Depends(get_db)
+    contract_id: int,
+    payment_id: int,
+    view: str = _VIEW_QUERY,
+    db: Session = Depends(get_db),
 ):
     payment = (
         db.query(Payment)
@@ -248,7 +531,12 @@ async def delete_payment(
     )
     if not payment:
         raise HTTPException(status_code=404, detail="입금 내역을 찾을 수 없습니다")
+    before = write_hooks.snapshot(payment)
     db.delete(payment)
-    db.commit()
     contract = db.query(Contract).filter(Contract.id == contract_id).first()
+    paid = write_hooks.payment_saved(db, contract, before, None)
+    if view == "row":
+        commit_keep_loaded(db)
+        return PaymentMutation(contract=_contract_aggregates(contract, paid))
+    db.commit()
     return _contract_to_detail(contract)
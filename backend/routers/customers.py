@@ -1,14 +1,28 @@
 import json
 import os
+import shutil
+import tempfile
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import func, or_
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
-from database import get_db
+from database import SessionLocal, commit_keep_loaded, get_db
 from models.customer import (
     Customer,
     Contact,
@@ -16,13 +30,32 @@ from models.customer import (
     CONTRACT_STATUSES,
 )
 from models.contract import Contract, Payment
+from models.intake import IntakeSubmission
 from models.customer_schemas import (
     ContactInput,
+    ContactMutation,
+    ContactPage,
     ContactResponse,
+    CustomerAggregates,
     CustomerInput,
     CustomerListItem,
     CustomerDetail,
+    CustomerSearchHit,
+    CustomerSuggestion,
+    DuplicateDismiss,
+    DuplicatePair,
+    MergePayload,
+    SearchHighlight,
 )
+from services import (
+    customer_dedup,
+    customer_import,
+    customer_search,
+    intake_queue,
+    pagination,
+    write_hooks,
+)
+from services.pagination import encode_cursor, parse_cursor, parse_datetime
 
 router = APIRouter(prefix="/api/customers", tags=["customers"])
 
@@ -39,7 +72,14 @@ def _contact_to_response(c: Contact) -> ContactResponse:
     )
 
 
-def _customer_to_detail(c: Customer) -> CustomerDetail:
+def _customer_to_detail(
+    c: Customer,
+    contacts: Optional[List[Contact]] = None,
+    contacts_cursor: Optional[str] = None,
+) -> CustomerDetail:
+    """contacts 를 주면 (최근 N건) 그것만, 아니면 전체 컨택 이력."""
+    if contacts is None:
+        contacts = list(c.contacts or [])
     return CustomerDetail(
         id=c.id,
         name=c.name,
@@ -53,16 +93,14 @@ def _customer_to_detail(c: Customer) -> CustomerDetail:
         contractStatus=c.contract_status or "pre_consultation",
         createdAt=c.created_at.isoformat() if c.created_at else "",
         updatedAt=c.updated_at.isoformat() if c.updated_at else "",
-        contacts=[_contact_to_response(ct) for ct in (c.contacts or [])],
+        version=c.version or 1,
+        contacts=[_contact_to_response(ct) for ct in contacts],
+        contactTotal=c.contact_count or 0,
+        contactsNextCursor=contacts_cursor,
     )
 
 
-def _customer_to_list_item(
-    c: Customer,
-    contact_count: int,
-    finance: Optional[Dict[str, Any]] = None,
-) -> CustomerListItem:
-    f = finance or {}
+def _customer_to_list_item(c: Customer) -> CustomerListItem:
     return CustomerListItem(
         id=c.id,
         name=c.name,
@@ -72,17 +110,61 @@ def _customer_to_list_item(
         memo=c.memo or "",
         inquirySource=c.inquiry_source or "other",
         contractStatus=c.contract_status or "pre_consultation",
-        contactCount=contact_count,
-        contractCount=f.get("contract_count", 0),
-        contractTotal=f.get("contract_total", 0.0),
-        paidTotal=f.get("paid_total", 0.0),
-        outstandingTotal=f.get("outstanding_total", 0.0),
-        taxInvoicePending=f.get("tax_pending", 0),
+        contactCount=c.contact_count or 0,
+        contractCount=c.contract_count or 0,
+        contractTotal=c.contract_total or 0.0,
+        paidTotal=c.paid_total or 0.0,
+        outstandingTotal=c.outstanding_total or 0.0,
+        taxInvoicePending=c.tax_pending_count or 0,
         createdAt=c.created_at.isoformat() if c.created_at else "",
         updatedAt=c.updated_at.isoformat() if c.updated_at else "",
     )
 
 
+def _customer_aggregates(db: Session, customer_id: int) -> CustomerAggregates:
+    """집계 컬럼만 PK 로 한 번 조회 (컨택 전체 재조회 대신)."""
+    c = (
+        db.query(
+            Customer.id,
+            Customer.updated_at,
+            Customer.version,
+            Customer.contact_count,
+            Customer.contract_count,
+            Customer.outstanding_total,
+        )
+        .filter(Customer.id == customer_id)
+        .one()
+    )
+    return CustomerAggregates(
+        id=c.id,
+        updatedAt=c.updated_at.isoformat() if c.updated_at else "",
+        version=c.version,
+        contactCount=c.contact_count or 0,
+        contractCount=c.contract_count or 0,
+        outstandingTotal=c.outstanding_total or 0.0,
+    )
+
+
+def _contact_page(
+    db: Session, customer_id: int, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Contact], Optional[str]]:
+    """최근 차수부터 limit 건 — (sequence, id) 내림차순 keyset. (컨택 목록, 다음 커서)."""
+    q = db.query(Contact).filter(Contact.customer_id == customer_id)
+    if cursor:
+        sequence, contact_id = parse_cursor(cursor, int, int)
+        q = q.filter(pagination.before(db, [Contact.sequence, Contact.id], [sequence, contact_id]))
+    rows = q.order_by(Contact.sequence.desc(), Contact.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].sequence, rows[-1].id)
+    return rows, next_cursor
+
+
+# 컨택 변경 응답 형식 — full: 고객 상세 전체(기존), row: 바뀐 컨택 + 고객 집계만
+_VIEW_QUERY = Query("full", pattern="^(full|row)$", description="row 는 바뀐 행과 부모 집계만")
+
+
 def _validate_enums(payload: CustomerInput) -> None:
     if payload.inquirySource not in INQUIRY_SOURCES:
         raise HTTPException(status_code=400, detail=f"잘못된 문의 경로: {payload.inquirySource}")
@@ -107,83 +189,148 @@ async def create_customer(payload: CustomerInput, db: Session = Depends(get_db))
         contract_status=payload.contractStatus,
     )
     db.add(row)
+    write_hooks.customer_saved(db, None, row)
     db.commit()
     db.refresh(row)
     return _customer_to_detail(row)
 
 
+# 목록 정렬 기준 → (정렬 컬럼, 커서 값 복원)
+_LIST_SORTS = {
+    "updated": (Customer.updated_at, parse_datetime),
+    "outstanding": (Customer.outstanding_total, float),
+    "contacts": (Customer.contact_count, int),
+}
+
+
 @router.get("", response_model=List[CustomerListItem])
 async def list_customers(
+    response: Response,
     db: Session = Depends(get_db),
     search: Optional[str] = Query(None, description="이름/회사/연락처/이메일 검색"),
     contractStatus: Optional[str] = Query(None),
     inquirySource: Optional[str] = Query(None),
+    minOutstanding: Optional[float] = Query(None, ge=0, description="미수금 하한"),
+    minContacts: Optional[int] = Query(None, ge=0, description="컨택 수 하한"),
+    sort: str = Query("updated", pattern="^(updated|outstanding|contacts)$"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="없으면 전체"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
 ):
+    """고객 목록 (기본 최근 수정순, 미수금/컨택 수 내림차순 정렬 가능).
+    재무/컨택 집계는 쓰기 때 갱신되는 customers 컬럼을 그대로 읽음."""
+    sort_col, parse_value = _LIST_SORTS[sort]
     q = db.query(Customer)
     if contractStatus:
         q = q.filter(Customer.contract_status == contractStatus)
     if inquirySource:
         q = q.filter(Customer.inquiry_source == inquirySource)
+    if minOutstanding is not None:
+        q = q.filter(Customer.outstanding_total >= minOutstanding)
+    if minContacts is not None:
+        q = q.filter(Customer.contact_count >= minContacts)
     if search:
-        like = f"%{search}%"
-        q = q.filter(
-            or_(
-                Customer.name.ilike(like),
-                Customer.company_name.ilike(like),
-                Customer.phone.ilike(like),
-                Customer.email.ilike(like),
-            )
+        q = q.filter(customer_search.match(db, search))
+    if cursor:
+        value, customer_id = parse_cursor(cursor, parse_value, int)
+        q = q.filter(pagination.before(db, [sort_col, Customer.id], [value, customer_id]))
+    q = q.order_by(sort_col.desc(), Customer.id.desc())
+
+    if limit:
+        rows = q.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(getattr(last, sort_col.key), last.id)
+    else:
+        rows = q.all()
+    return [_customer_to_list_item(r) for r in rows]
+
+
+@router.get("/search", response_model=List[CustomerSearchHit])
+async def search_customers(
+    q: str = Query(..., min_length=1, description="이름/회사/연락처/이메일 일부"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """관련도순 고객 검색 + 일치 구간. 이름 완전/앞부분 일치가 가장 먼저."""
+    return [
+        CustomerSearchHit(
+            customer=_customer_to_list_item(c),
+            score=score,
+            highlights=[SearchHighlight(**h) for h in highlights],
         )
-    rows = q.order_by(Customer.updated_at.desc()).all()
+        for c, score, highlights in customer_search.search(db, q, limit)
+    ]
 
-    # 컨택 개수 일괄 조회
-    counts = dict(
-        db.query(Contact.customer_id, func.count(Contact.id))
-        .group_by(Contact.customer_id)
-        .all()
-    )
 
-    # 재무 집계 (모든 계약/입금 일괄 로드 후 customer 별로 묶기)
-    contracts_all = db.query(Contract).all()
-    paid_per_contract = dict(
-        db.query(Payment.contract_id, func.coalesce(func.sum(Payment.amount), 0))
-        .group_by(Payment.contract_id)
-        .all()
-    )
-    finance: Dict[int, Dict[str, Any]] = {}
-    for c in contracts_all:
-        info = finance.setdefault(c.customer_id, {
-            "contract_total": 0.0,
-            "paid_total": 0.0,
-            "outstanding_total": 0.0,
-            "contract_count": 0,
-            "tax_pending": 0,
-        })
-        amount = c.contract_amount or 0
-        paid = paid_per_contract.get(c.id, 0) or 0
-        info["contract_total"] += amount
-        info["paid_total"] += paid
-        info["contract_count"] += 1
-        # 취소된 계약은 미수금/세금계산서 집계 제외
-        if c.state != "cancelled":
-            info["outstanding_total"] += max(0, amount - paid)
-            if not c.tax_invoice_issued:
-                info["tax_pending"] += 1
-
-    return [_customer_to_list_item(r, counts.get(r.id, 0), finance.get(r.id)) for r in rows]
+@router.get("/autocomplete", response_model=List[CustomerSuggestion])
+async def autocomplete_customers(
+    q: str = Query(..., min_length=1, description="이름 앞부분, 초성(ㄱㅁㅅ), 연락처 앞/뒷자리"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    return [
+        CustomerSuggestion(
+            id=c.id, name=c.name, companyName=c.company_name or "", phone=c.phone or ""
+        )
+        for c in customer_search.autocomplete(db, q, limit)
+    ]
+
+
+# ── 중복 고객 ──
+
+@router.get("/duplicates", response_model=List[DuplicatePair])
+async def list_duplicates(
+    minScore: float = Query(customer_dedup.THRESHOLD, ge=0, le=1),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    """중복 의심 고객 쌍 (점수순). "중복 아님" 처리한 쌍은 제외."""
+    return [
+        DuplicatePair(
+            customer=_customer_to_list_item(a),
+            duplicate=_customer_to_list_item(b),
+            score=row.score,
+            reasons=[r for r in row.reasons.split(",") if r],
+        )
+        for row, a, b in customer_dedup.pairs(db, minScore, limit)
+    ]
+
+
+@router.post("/duplicates/dismiss")
+async def dismiss_duplicate(payload: DuplicateDismiss, db: Session = Depends(get_db)):
+    if not customer_dedup.dismiss(db, payload.customerId, payload.duplicateId):
+        raise HTTPException(status_code=404, detail="중복 후보를 찾을 수 없습니다")
+    db.commit()
+    return {"ok": True}
 
 
 @router.get("/{customer_id}", response_model=CustomerDetail)
-async def get_customer(customer_id: int, db: Session = Depends(get_db)):
-    row = (
-        db.query(Customer)
-        .options(selectinload(Customer.contacts))
-        .filter(Customer.id == customer_id)
-        .first()
-    )
+async def get_customer(
+    customer_id: int,
+    contactLimit: Optional[int] = Query(
+        None, ge=1, le=200, description="최근 컨택 N건만 (없으면 전체 이력)"
+    ),
+    db: Session = Depends(get_db),
+):
+    """고객 상세. contactLimit 를 주면 최근 N건만 차수순으로 담고, 나머지는
+    contactsNextCursor 로 GET /{id}/contacts 에서 이어 받음 (contactTotal 은 항상 전체 수)."""
+    if contactLimit is None:
+        row = (
+            db.query(Customer)
+            .options(selectinload(Customer.contacts))
+            .filter(Customer.id == customer_id)
+            .first()
+        )
+        if not row:
+            raise HTTPException(status_code=404, detail="고객을 찾을 수 없습니다")
+        return _customer_to_detail(row)
+
+    row = db.query(Customer).filter(Customer.id == customer_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="고객을 찾을 수 없습니다")
-    return _customer_to_detail(row)
+    contacts, next_cursor = _contact_page(db, customer_id, contactLimit)
+    return _customer_to_detail(row, list(reversed(contacts)), next_cursor)
 
 
 @router.put("/{customer_id}", response_model=CustomerDetail)
@@ -194,6 +341,7 @@ async def update_customer(
     row = db.query(Customer).filter(Customer.id == customer_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="고객을 찾을 수 없습니다")
+    before = write_hooks.snapshot(row)
     row.name = payload.name
     row.company_name = payload.companyName
     row.phone = payload.phone
@@ -203,6 +351,7 @@ async def update_customer(
     row.memo = payload.memo
     row.inquiry_source = payload.inquirySource
     row.contract_status = payload.contractStatus
+    write_hooks.customer_saved(db, before, row)
     db.commit()
     db.refresh(row)
     return _customer_to_detail(row)
@@ -213,11 +362,33 @@ async def delete_customer(customer_id: int, db: Session = Depends(get_db)):
     row = db.query(Customer).filter(Customer.id == customer_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="고객을 찾을 수 없습니다")
+    write_hooks.customers_deleting(db, [row.id])
     db.delete(row)
     db.commit()
     return {"ok": True}
 
 
+@router.post("/{customer_id}/merge", response_model=CustomerDetail)
+async def merge_customers(
+    customer_id: int, payload: MergePayload, db: Session = Depends(get_db)
+):
+    """sourceIds 고객의 컨택/계약/저장 견적을 이 고객으로 옮기고 원본은 삭제."""
+    target = db.query(Customer).filter(Customer.id == customer_id).first()
+    if not target:
+        raise HTTPException(status_code=404, detail="고객을 찾을 수 없습니다")
+    before = write_hooks.snapshot(target)
+    write_hooks.customers_merging(db, target.id, payload.sourceIds)
+    ids = customer_dedup.merge(db, target, payload.sourceIds)
+    if not ids:
+        raise HTTPException(status_code=400, detail="병합할 고객이 없습니다")
+    write_hooks.customers_deleting(db, ids)
+    db.query(Customer).filter(Customer.id.in_(ids)).delete(synchronize_session=False)
+    write_hooks.customer_merged(db, before, target)
+    db.commit()
+    db.refresh(target)
+    return _customer_to_detail(target)
+
+
 class ContractStatusPatch(BaseModel):
     contractStatus: str
 
@@ -232,35 +403,159 @@ async def patch_contract_status(
     row = db.query(Customer).filter(Customer.id == customer_id).first()
     if not row:
         raise HTTPException(status_code=404, detail="고객을 찾을 수 없습니다")
+    before = write_hooks.snapshot(row)
     row.contract_status = payload.contractStatus
+    write_hooks.customer_saved(db, before, row)
     db.commit()
     db.refresh(row)
     return _customer_to_detail(row)
 
 
 class BulkDeletePayload(BaseModel):
-    ids: List[int] = Field(default_factory=list)
+    ids: List[int] = Field(default_factory=list, max_length=1000)
 
 
 @router.post("/bulk-delete")
 async def bulk_delete_customers(
     payload: BulkDeletePayload, db: Session = Depends(get_db)
 ):
+    """DELETE ... WHERE id IN (...) 한 번 — 컨택/계약/입금은 DB FK cascade 로 함께 삭제."""
     if not payload.ids:
         return {"deleted": 0}
-    rows = db.query(Customer).filter(Customer.id.in_(payload.ids)).all()
-    count = len(rows)
-    for r in rows:
-        db.delete(r)
+    ids = [i for (i,) in db.query(Customer.id).filter(Customer.id.in_(payload.ids))]
+    write_hooks.customers_deleting(db, ids)
+    count = (
+        db.query(Customer)
+        .filter(Customer.id.in_(ids))
+        .delete(synchronize_session=False)
+    ) if ids else 0
     db.commit()
     return {"deleted": count}
 
 
+class BulkUpdatePayload(BaseModel):
+    ids: List[int] = Field(default_factory=list, max_length=1000)
+    # 지정한 항목만 변경
+    contractStatus: Optional[str] = None
+    manager: Optional[str] = Field(None, max_length=100)
+    inquirySource: Optional[str] = None
+
+
+@router.post("/bulk-update")
+async def bulk_update_customers(
+    payload: BulkUpdatePayload, db: Session = Depends(get_db)
+):
+    """목록 다중 선택 — 계약 상태/담당자/문의 경로를 UPDATE 한 번으로 변경."""
+    if payload.contractStatus is not None and payload.contractStatus not in CONTRACT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"잘못된 계약 상태: {payload.contractStatus}")
+    if payload.inquirySource is not None and payload.inquirySource not in INQUIRY_SOURCES:
+        raise HTTPException(status_code=400, detail=f"잘못된 문의 경로: {payload.inquirySource}")
+    values = {
+        column: value
+        for column, value in (
+            ("contract_status", payload.contractStatus),
+            ("manager", payload.manager),
+            ("inquiry_source", payload.inquirySource),
+        )
+        if value is not None
+    }
+    if not payload.ids or not values:
+        return {"updated": 0}
+    write_hooks.customers_updating(db, payload.ids, values)
+    count = (
+        db.query(Customer)
+        .filter(Customer.id.in_(payload.ids))
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    return {"updated": count}
+
+
+# ── 대량 가져오기 (CSV / XLSX) ──
+
+def _import(
+    db: Session, filename: str, fileobj, dedupe: str, dry_run: bool
+) -> Iterator[Dict[str, Any]]:
+    """진행 상황 dict 를 yield. 마지막 요약까지 가면 파생 데이터 반영 후 commit (dryRun 이면 rollback)."""
+    rows = customer_import.read_rows(filename, fileobj)
+    for progress in customer_import.run(db, rows, dedupe):
+        if progress["done"]:
+            ids = progress.pop("ids")
+            if dry_run:
+                db.rollback()
+            else:
+                write_hooks.customers_imported(db, ids)
+                db.commit()
+            progress["dryRun"] = dry_run
+        yield progress
+
+
+def _stream_import(filename: str, fileobj, dedupe: str, dry_run: bool) -> Iterator[str]:
+    # 응답 스트리밍 도중에도 쓸 수 있도록 요청 세션과 별개의 세션을 사용
+    db = SessionLocal()
+    try:
+        for progress in _import(db, filename, fileobj, dedupe, dry_run):
+            yield json.dumps(progress, ensure_ascii=False) + "\n"
+    except ValueError as e:
+        db.rollback()
+        yield json.dumps({"done": True, "error": str(e)}, ensure_ascii=False) + "\n"
+    finally:
+        db.close()
+        fileobj.close()
+
+
+@router.post("/import")
+def import_customers(
+    file: UploadFile = File(...),
+    dedupe: str = Query("none", pattern="^(none|phone|email|phone_or_email)$",
+                        description="기존 고객·파일 내 중복 건너뛰기 기준"),
+    dryRun: bool = Query(False, description="검증만 하고 저장하지 않음"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson 은 배치마다 진행 상황 스트리밍"),
+    db: Session = Depends(get_db),
+):
+    """CSV/XLSX 고객 일괄 등록 — 한 행씩 읽어 검증, BATCH_SIZE 행마다 INSERT 한 번, 전체가 한 트랜잭션.
+    첫 행은 헤더 (이름/회사명/연락처/이메일/주소/담당자/메모/문의 경로/계약 상태).
+    (오래 걸리는 작업이라 async 가 아닌 def — 스레드풀에서 실행)"""
+    if format == "ndjson":
+        # 업로드 파일은 핸들러가 끝나면 닫히므로 스트리밍용으로 임시 파일에 옮겨 둠 (디스크, 메모리 일정)
+        copy = tempfile.TemporaryFile()
+        shutil.copyfileobj(file.file, copy)
+        copy.seek(0)
+        return StreamingResponse(
+            _stream_import(file.filename, copy, dedupe, dryRun), media_type="application/x-ndjson"
+        )
+    try:
+        for progress in _import(db, file.filename, file.file, dedupe, dryRun):
+            pass
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return progress
+
+
 # ── Contact (컨택 이력) CRUD ──
 
-@router.post("/{customer_id}/contacts", response_model=CustomerDetail)
+@router.get("/{customer_id}/contacts", response_model=ContactPage)
+async def list_contacts(
+    customer_id: int,
+    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="이전 응답의 nextCursor (또는 상세의 contactsNextCursor)"),
+):
+    """컨택 이력 페이지 (최근 차수부터)."""
+    exists = db.query(Customer.id).filter(Customer.id == customer_id).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="고객을 찾을 수 없습니다")
+    rows, next_cursor = _contact_page(db, customer_id, limit, cursor)
+    return ContactPage(items=[_contact_to_response(r) for r in rows], nextCursor=next_cursor)
+
+
+@router.post("/{customer_id}/contacts", response_model=Union[CustomerDetail, ContactMutation])
 async def add_contact(
-    customer_id: int, payload: ContactInput, db: Session = Depends(get_db)
+    customer_id: int,
+    payload: ContactInput,
+    view: str = _VIEW_QUERY,
+    db: Session = Depends(get_db),
 ):
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
@@ -286,16 +581,28 @@ async def add_contact(
         handler=payload.handler or "",
     )
     db.add(contact)
+    write_hooks.contact_saved(db, None, contact)
+    if view == "row":
+        # commit 후 컨택 재조회(refresh) 없이 그대로 응답
+        commit_keep_loaded(db)
+        return ContactMutation(
+            contact=_contact_to_response(contact),
+            customer=_customer_aggregates(db, customer_id),
+        )
     db.commit()
     db.refresh(customer)
     return _customer_to_detail(customer)
 
 
-@router.put("/{customer_id}/contacts/{contact_id}", response_model=CustomerDetail)
+@router.put(
+    "/{customer_id}/contacts/{contact_id}",
+    response_model=Union[CustomerDetail, ContactMutation],
+)
 async def update_contact(
     customer_id: int,
     contact_id: int,
     payload: ContactInput,
+    view: str = _VIEW_QUERY,
     db: Session = Depends(get_db),
 ):
     contact = (
@@ -305,20 +612,34 @@ async def update_contact(
     )
     if not contact:
         raise HTTPException(status_code=404, detail="컨택 기록을 찾을 수 없습니다")
+    before = write_hooks.snapshot(contact)
     if payload.sequence is not None:
         contact.sequence = payload.sequence
     if payload.contactedAt is not None:
         contact.contacted_at = payload.contactedAt
     contact.content = payload.content
     contact.handler = payload.handler or ""
+    write_hooks.contact_saved(db, before, contact)
+    if view == "row":
+        commit_keep_loaded(db)
+        return ContactMutation(
+            contact=_contact_to_response(contact),
+            customer=_customer_aggregates(db, customer_id),
+        )
     db.commit()
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     return _customer_to_detail(customer)
 
 
-@router.delete("/{customer_id}/contacts/{contact_id}", response_model=CustomerDetail)
+@router.delete(
+    "/{customer_id}/contacts/{contact_id}",
+    response_model=Union[CustomerDetail, ContactMutation],
+)
 async def delete_contact(
-    customer_id: int, contact_id: int, db: Session = Depends(get_db)
+    customer_id: int,
+    contact_id: int,
+    view: str = _VIEW_QUERY,
+    db: Session = Depends(get_db),
 ):
     contact = (
         db.query(Contact)
@@ -327,8 +648,12 @@ async def delete_contact(
     )
     if not contact:
         raise HTTPException(status_code=404, detail="컨택 기록을 찾을 수 없습니다")
+    before = write_hooks.snapshot(contact)
     db.delete(contact)
+    write_hooks.contact_saved(db, before, None)
     db.commit()
+    if view == "row":
+        return ContactMutation(customer=_customer_aggregates(db, customer_id))
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     return _customer_to_detail(customer)
 
@@ -348,47 +673,94 @@ class IntakePayload(BaseModel):
     rawData: Optional[Dict[str, Any]] = None  # 원본 폼 응답 (참고용)
 
 
-@router.post("/intake", response_model=CustomerDetail)
-async def intake_from_webhook(
-    payload: IntakePayload,
-    request: Request,
-    db: Session = Depends(get_db),
-):
-    """공개 웹훅 — 구글 폼 등에서 호출해서 고객 자동 등록.
-    환경변수 WEBHOOK_TOKEN 이 설정된 경우 X-Webhook-Token 헤더 일치해야 함."""
+class IntakeBatchItem(IntakePayload):
+    idempotencyKey: Optional[str] = None  # 없으면 페이로드 해시
+
+
+class IntakeBatchPayload(BaseModel):
+    submissions: List[IntakeBatchItem] = Field(min_length=1, max_length=500)
+
+
+class IntakeAccepted(BaseModel):
+    id: int  # 접수 번호
+    status: str  # queued | processing | done | failed
+    customerId: Optional[int] = None
+    duplicate: bool = False  # 이미 접수된 요청의 재전송
+
+
+def _check_webhook_token(request: Request) -> None:
+    """환경변수 WEBHOOK_TOKEN 이 설정된 경우 X-Webhook-Token 헤더 일치해야 함."""
     expected = os.getenv("WEBHOOK_TOKEN")
     if expected:
         provided = request.headers.get("X-Webhook-Token") or request.headers.get("x-webhook-token") or ""
         if provided != expected:
             raise HTTPException(status_code=401, detail="Invalid webhook token")
 
-    src = payload.inquirySource if payload.inquirySource in INQUIRY_SOURCES else "other"
 
-    customer = Customer(
-        name=payload.name,
-        company_name=payload.companyName,
-        phone=payload.phone,
-        email=payload.email,
-        address=payload.address,
-        manager=payload.manager,
-        # 폼 문의 요약을 기본 정보 메모에도 저장
-        memo=payload.memo or "",
-        inquiry_source=src,
-        contract_status="pre_consultation",
+def _intake_accepted(row: IntakeSubmission, duplicate: bool) -> IntakeAccepted:
+    return IntakeAccepted(
+        id=row.id, status=row.status, customerId=row.customer_id, duplicate=duplicate
     )
-    db.add(customer)
-    db.flush()
-
-    # 1차 컨택 기록도 함께 생성 (이력/타임라인 용)
-    if payload.memo:
-        contact = Contact(
-            customer_id=customer.id,
-            sequence=1,
-            contacted_at=datetime.utcnow(),
-            content=f"📨 폼 문의:\n{payload.memo}",
-        )
-        db.add(contact)
 
-    db.commit()
-    db.refresh(customer)
-    return _customer_to_detail(customer)
+
+def _enqueue(db: Session, items) -> List[IntakeAccepted]:
+    try:
+        accepted = intake_queue.enqueue(db, items)
+        db.commit()
+    except IntegrityError:
+        # 같은 키가 동시에 들어온 경우 — 먼저 들어간 행 기준으로 다시
+        db.rollback()
+        accepted = intake_queue.enqueue(db, items)
+        db.commit()
+    return [_intake_accepted(row, not created) for row, created in accepted]
+
+
+@router.post("/intake", response_model=IntakeAccepted, status_code=202)
+async def intake_from_webhook(
+    payload: IntakePayload,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """공개 웹훅 — 구글 폼 등에서 호출해서 고객 자동 등록.
+    접수만 저장하고 202 로 바로 응답, 고객/컨택 생성은 응답 후 묶어서 처리.
+    Idempotency-Key 헤더(없으면 페이로드 해시)가 같은 재전송은 기존 접수를 200 으로 돌려줌."""
+    _check_webhook_token(request)
+    data = payload.model_dump(mode="json")
+    key = intake_queue.idempotency_key(request.headers.get("Idempotency-Key"), data)
+    [accepted] = _enqueue(db, [(key, data)])
+    if accepted.duplicate:
+        response.status_code = 200
+    else:
+        background_tasks.add_task(intake_queue.flush)
+    return accepted
+
+
+@router.post("/intake/batch", response_model=List[IntakeAccepted], status_code=202)
+async def intake_batch(
+    payload: IntakeBatchPayload,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
+    """과거 폼 응답 일괄 접수 (백필용). 항목 순서대로 접수 결과를 돌려줌."""
+    _check_webhook_token(request)
+    items = []
+    for item in payload.submissions:
+        data = item.model_dump(mode="json", exclude={"idempotencyKey"})
+        items.append((intake_queue.idempotency_key(item.idempotencyKey, data), data))
+    accepted = _enqueue(db, items)
+    if any(not a.duplicate for a in accepted):
+        background_tasks.add_task(intake_queue.flush)
+    return accepted
+
+
+@router.get("/intake/{submission_id}", response_model=IntakeAccepted)
+async def get_intake(submission_id: int, request: Request, db: Session = Depends(get_db)):
+    """접수 처리 상태 — done 이면 customerId 로 생성된 고객 확인."""
+    _check_webhook_token(request)
+    row = db.get(IntakeSubmission, submission_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="접수를 찾을 수 없습니다")
+    return _intake_accepted(row, duplicate=False)
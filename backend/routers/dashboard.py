@@ -1,19 +1,29 @@
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
-
-from fastapi import APIRouter, Depends, Query
+import csv
+import io
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import func
+from sqlalchemy import Date, Integer, case, cast, func, tuple_
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models.customer import Customer, Contact
+from database import SessionLocal, get_db
+from models.customer import Customer
 from models.contract import Contract, Payment
+from models.activity import ActivityEvent
+from services import activity_log, dashboard_stats, pagination, response_cache, revenue_rollup
+from services.pagination import encode_cursor, parse_cursor, parse_datetime
 
 # 담당자 자동완성용 (별도 router 만들기는 과해서 dashboard 모듈 안에 추가)
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
+# 입금 원장 스트리밍 시 DB 에서 한 번에 가져오는 행 수
+_STREAM_BATCH = 500
+
 
 # ── 응답 스키마 ──
 
@@ -26,6 +36,11 @@ class ActivityItem(BaseModel):
     description: Optional[str] = None
 
 
+class ActivityPage(BaseModel):
+    items: List[ActivityItem]
+    nextCursor: Optional[str] = None  # 더 이전 항목이 있으면 다음 요청의 before 로 전달
+
+
 class MonthlyRevenue(BaseModel):
     month: str  # YYYY-MM
     amount: float
@@ -40,6 +55,14 @@ class OutstandingItem(BaseModel):
     paidAmount: float
     remainingAmount: float
     contractDate: str
+    ageDays: Optional[int] = None      # 계약일로부터 경과 일수 (계약일 없으면 None)
+    agingBucket: str = "unknown"       # "0-30" | "31-60" | "61-90" | "90+" | "unknown"
+
+
+class AgingBucket(BaseModel):
+    bucket: str
+    count: int
+    amount: float
 
 
 class DashboardSummary(BaseModel):
@@ -59,6 +82,13 @@ class DashboardSummary(BaseModel):
     recentActivities: List[ActivityItem]
 
 
+class RevenuePoint(BaseModel):
+    bucket: str                  # day/week: YYYY-MM-DD (week 은 월요일), month: YYYY-MM
+    group: Optional[str] = None  # groupBy 지정 시 결제수단 또는 담당자
+    amount: float
+    count: int
+
+
 class PaymentRow(BaseModel):
     paymentId: int
     contractId: int
@@ -74,10 +104,6 @@ class PaymentRow(BaseModel):
 
 # ── 헬퍼 ──
 
-def _month_key(dt: datetime) -> str:
-    return dt.strftime("%Y-%m")
-
-
 def _last_n_month_keys(n: int = 12) -> List[str]:
     """현재 달 포함 최근 n개월 키, 오름차순"""
     today = datetime.now(timezone.utc)
@@ -92,6 +118,19 @@ def _last_n_month_keys(n: int = 12) -> List[str]:
     return list(reversed(keys))
 
 
+def _parse_date_param(value: str, name: str, end: bool = False) -> date:
+    """YYYY-MM-DD 또는 YYYY-MM (end=True 면 그 달의 말일)."""
+    try:
+        if len(value) == 7:
+            d = datetime.strptime(value + "-01", "%Y-%m-%d").date()
+            if end:
+                d = (d.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            return d
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"잘못된 날짜 형식 ({name}): {value}")
+
+
 def _start_of_month(dt: datetime) -> datetime:
     return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
@@ -103,187 +142,160 @@ def _start_of_prev_month(dt: datetime) -> datetime:
     return first.replace(month=first.month - 1)
 
 
-# ── 엔드포인트 ──
+def _activity_item(e: ActivityEvent, customer_name: str) -> ActivityItem:
+    return ActivityItem(
+        type=e.event_type,
+        at=e.occurred_at.isoformat(),
+        customerId=e.customer_id,
+        customerName=customer_name or "",
+        amount=e.amount,
+        description=e.description,
+    )
 
-@router.get("/summary", response_model=DashboardSummary)
-async def get_summary(db: Session = Depends(get_db)):
-    now = datetime.now(timezone.utc)
-    this_month_start = _start_of_month(now)
-    last_month_start = _start_of_prev_month(now)
-
-    # 이번/지난달/전체 매출
-    this_month_revenue = (
-        db.query(func.coalesce(func.sum(Payment.amount), 0))
-        .filter(Payment.paid_at >= this_month_start)
-        .scalar()
-        or 0
+
+def _stats_group(stats: Dict[str, float], prefix: str) -> Dict[str, int]:
+    """스냅샷에서 "<prefix>:<값>" 키들을 {값: 개수} 로 (0 인 항목 제외)."""
+    head = prefix + ":"
+    return {k[len(head):]: int(v) for k, v in stats.items() if k.startswith(head) and v}
+
+
+def _age_days_expr(db: Session):
+    """계약일(YYYY-MM-DD 문자열)로부터 오늘까지 경과 일수 — DB 에서 계산, 형식이 안 맞으면 NULL."""
+    if db.get_bind().dialect.name == "postgresql":
+        return case(
+            (
+                Contract.contract_date.op("~")(r"^\d{4}-\d{2}-\d{2}$"),
+                func.current_date() - cast(Contract.contract_date, Date),
+            ),
+            else_=None,
+        )
+    return cast(
+        func.julianday("now") - func.julianday(func.nullif(Contract.contract_date, "")),
+        Integer,
     )
-    last_month_revenue = (
-        db.query(func.coalesce(func.sum(Payment.amount), 0))
-        .filter(Payment.paid_at >= last_month_start, Payment.paid_at < this_month_start)
-        .scalar()
-        or 0
+
+
+def _aging_bucket_expr(age):
+    return case(
+        (age.is_(None), "unknown"),
+        (age <= 30, "0-30"),
+        (age <= 60, "31-60"),
+        (age <= 90, "61-90"),
+        else_="90+",
     )
-    total_revenue = (
-        db.query(func.coalesce(func.sum(Payment.amount), 0)).scalar() or 0
+
+
+def _outstanding_query(db: Session):
+    """활성 계약 ⟕ 입금 합계, 미수금 > 0 인 것만 — 한 번의 GROUP BY/HAVING 쿼리."""
+    paid = func.coalesce(func.sum(Payment.amount), 0)
+    remaining = func.coalesce(Contract.contract_amount, 0) - paid
+    age = _age_days_expr(db)
+    q = (
+        db.query(
+            Contract.id.label("contract_id"),
+            Contract.customer_id,
+            Customer.name.label("customer_name"),
+            Contract.title,
+            Contract.contract_amount,
+            Contract.contract_date,
+            paid.label("paid"),
+            remaining.label("remaining"),
+            age.label("age_days"),
+            _aging_bucket_expr(age).label("aging_bucket"),
+        )
+        .outerjoin(Payment, Payment.contract_id == Contract.id)
+        .outerjoin(Customer, Customer.id == Contract.customer_id)
+        .filter(Contract.state == "active")
+        .group_by(Contract.id, Customer.id)
+        .having(remaining > 0)
     )
+    return q, remaining
+
+
+def _outstanding_items(
+    db: Session, limit: Optional[int] = None, after: Optional[tuple] = None
+) -> List[OutstandingItem]:
+    """미수금 있는 활성 계약 (큰 순). after=(미수금, 계약 id) 이면 그 다음부터."""
+    q, remaining = _outstanding_query(db)
+    if after is not None:
+        q = q.having(tuple_(remaining, Contract.id) < tuple_(*after))
+    q = q.order_by(remaining.desc(), Contract.id.desc())
+    if limit is not None:
+        q = q.limit(limit)
+    return [
+        OutstandingItem(
+            contractId=r.contract_id,
+            customerId=r.customer_id,
+            customerName=r.customer_name or "",
+            contractTitle=r.title or "",
+            contractAmount=r.contract_amount or 0,
+            paidAmount=r.paid or 0,
+            remainingAmount=r.remaining,
+            contractDate=r.contract_date or "",
+            ageDays=r.age_days,
+            agingBucket=r.aging_bucket,
+        )
+        for r in q.all()
+    ]
 
-    # 미수금 = sum(contract.contract_amount) - sum(payment.amount), 계약별 음수 0 처리
-    contracts = db.query(Contract).all()
-    paid_per_contract = dict(
-        db.query(Payment.contract_id, func.coalesce(func.sum(Payment.amount), 0))
-        .group_by(Payment.contract_id)
+
+def _aging_summary(db: Session) -> List[AgingBucket]:
+    q, _ = _outstanding_query(db)
+    sub = q.subquery()
+    rows = (
+        db.query(sub.c.aging_bucket, func.count(), func.sum(sub.c.remaining))
+        .group_by(sub.c.aging_bucket)
         .all()
     )
-    total_outstanding = 0.0
-    active_contracts = 0
-    completed_contracts = 0
-    contracts_by_state: Dict[str, int] = {}
-    for c in contracts:
-        contracts_by_state[c.state] = contracts_by_state.get(c.state, 0) + 1
-        if c.state == "active":
-            active_contracts += 1
-            paid = paid_per_contract.get(c.id, 0) or 0
-            remain = max(0, (c.contract_amount or 0) - paid)
-            total_outstanding += remain
-        elif c.state == "completed":
-            completed_contracts += 1
-
-    # 고객 통계
-    customers = db.query(Customer).all()
-    total_customers = len(customers)
-    new_customers_this_month = sum(
-        1 for c in customers if c.created_at and c.created_at >= this_month_start
+    totals = {b: (count, amount or 0) for b, count, amount in rows}
+    return [
+        AgingBucket(bucket=b, count=totals.get(b, (0, 0))[0], amount=totals.get(b, (0, 0))[1])
+        for b in ("0-30", "31-60", "61-90", "90+", "unknown")
+        if b != "unknown" or b in totals
+    ]
+
+
+# ── 엔드포인트 ──
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_summary(db: Session = Depends(get_db)):
+    return response_cache.get_or_compute(
+        db, response_cache.DASHBOARD, ("summary",), lambda: _build_summary(db)
     )
-    customers_by_status: Dict[str, int] = {}
-    customers_by_source: Dict[str, int] = {}
-    for c in customers:
-        customers_by_status[c.contract_status] = customers_by_status.get(c.contract_status, 0) + 1
-        customers_by_source[c.inquiry_source] = customers_by_source.get(c.inquiry_source, 0) + 1
 
-    # 월별 매출 (최근 12개월)
+
+def _build_summary(db: Session) -> DashboardSummary:
+    now = datetime.now(timezone.utc)
+    this_month = dashboard_stats.month_key(now)
+    last_month = dashboard_stats.month_key(_start_of_prev_month(now))
+
+    # 매출/미수금/상태별 개수는 dashboard_stats 스냅샷 한 번 읽기로
+    stats = dashboard_stats.read(db)
+    contracts_by_state = _stats_group(stats, "contracts_by_state")
+
+    # 월별 매출 (최근 12개월) — revenue_by_month 롤업
     monthly_keys = _last_n_month_keys(12)
-    monthly_amounts: Dict[str, float] = {k: 0.0 for k in monthly_keys}
-    twelve_months_ago = datetime.strptime(monthly_keys[0] + "-01", "%Y-%m-%d").replace(tzinfo=timezone.utc)
-    payments_recent = (
-        db.query(Payment).filter(Payment.paid_at >= twelve_months_ago).all()
-    )
-    for p in payments_recent:
-        if p.paid_at:
-            key = _month_key(p.paid_at)
-            if key in monthly_amounts:
-                monthly_amounts[key] += p.amount or 0
-    monthly_revenue = [MonthlyRevenue(month=k, amount=monthly_amounts[k]) for k in monthly_keys]
-
-    # 미수금 TOP (활성 계약만, 미수금 큰 순)
-    customer_name_by_id = {c.id: c.name for c in customers}
-    outstanding_items: List[OutstandingItem] = []
-    for c in contracts:
-        if c.state != "active":
-            continue
-        paid = paid_per_contract.get(c.id, 0) or 0
-        remain = (c.contract_amount or 0) - paid
-        if remain <= 0:
-            continue
-        outstanding_items.append(
-            OutstandingItem(
-                contractId=c.id,
-                customerId=c.customer_id,
-                customerName=customer_name_by_id.get(c.customer_id, ""),
-                contractTitle=c.title or "",
-                contractAmount=c.contract_amount or 0,
-                paidAmount=paid,
-                remainingAmount=remain,
-                contractDate=c.contract_date or "",
-            )
-        )
-    outstanding_items.sort(key=lambda x: x.remainingAmount, reverse=True)
-    outstanding_top = outstanding_items[:10]
+    monthly_amounts = revenue_rollup.monthly_totals(db, monthly_keys[0], monthly_keys[-1])
+    monthly_revenue = [
+        MonthlyRevenue(month=k, amount=monthly_amounts.get(k, 0.0)) for k in monthly_keys
+    ]
 
-    # 최근 활동 (최근 30개)
-    activities: List[ActivityItem] = []
+    outstanding_top = _outstanding_items(db, limit=10)
 
-    # 최근 고객 등록
-    recent_customers = (
-        db.query(Customer).order_by(Customer.created_at.desc()).limit(20).all()
-    )
-    for c in recent_customers:
-        if c.created_at:
-            activities.append(
-                ActivityItem(
-                    type="customer_created",
-                    at=c.created_at.isoformat(),
-                    customerId=c.id,
-                    customerName=c.name,
-                )
-            )
-
-    # 최근 컨택
-    recent_contacts = (
-        db.query(Contact).order_by(Contact.contacted_at.desc()).limit(20).all()
-    )
-    for ct in recent_contacts:
-        if ct.contacted_at:
-            activities.append(
-                ActivityItem(
-                    type="contact_logged",
-                    at=ct.contacted_at.isoformat(),
-                    customerId=ct.customer_id,
-                    customerName=customer_name_by_id.get(ct.customer_id, ""),
-                    description=f"{ct.sequence}차 컨택",
-                )
-            )
-
-    # 최근 계약
-    recent_contracts = (
-        db.query(Contract).order_by(Contract.created_at.desc()).limit(20).all()
-    )
-    for c in recent_contracts:
-        if c.created_at:
-            activities.append(
-                ActivityItem(
-                    type="contract_created",
-                    at=c.created_at.isoformat(),
-                    customerId=c.customer_id,
-                    customerName=customer_name_by_id.get(c.customer_id, ""),
-                    amount=c.contract_amount,
-                    description=c.title or "",
-                )
-            )
-
-    # 최근 입금
-    recent_payments = (
-        db.query(Payment).order_by(Payment.paid_at.desc()).limit(20).all()
-    )
-    contract_to_customer = {c.id: c.customer_id for c in contracts}
-    for p in recent_payments:
-        if p.paid_at:
-            cust_id = contract_to_customer.get(p.contract_id)
-            activities.append(
-                ActivityItem(
-                    type="payment_received",
-                    at=p.paid_at.isoformat(),
-                    customerId=cust_id,
-                    customerName=customer_name_by_id.get(cust_id or 0, ""),
-                    amount=p.amount,
-                    description=p.method,
-                )
-            )
-
-    activities.sort(key=lambda a: a.at, reverse=True)
-    activities = activities[:30]
+    # 최근 활동 (최근 30개) — activity_events 인덱스 범위 스캔 한 번
+    activities = [_activity_item(e, name) for e, name in activity_log.page(db, None, 30)]
 
     return DashboardSummary(
-        thisMonthRevenue=this_month_revenue,
-        lastMonthRevenue=last_month_revenue,
-        totalRevenue=total_revenue,
-        totalOutstanding=total_outstanding,
-        activeContracts=active_contracts,
-        completedContracts=completed_contracts,
-        totalCustomers=total_customers,
-        newCustomersThisMonth=new_customers_this_month,
-        customersByStatus=customers_by_status,
-        customersBySource=customers_by_source,
+        thisMonthRevenue=monthly_amounts.get(this_month, 0.0),
+        lastMonthRevenue=monthly_amounts.get(last_month, 0.0),
+        totalRevenue=stats.get("total_revenue", 0.0),
+        totalOutstanding=stats.get("total_outstanding", 0.0),
+        activeContracts=contracts_by_state.get("active", 0),
+        completedContracts=contracts_by_state.get("completed", 0),
+        totalCustomers=int(stats.get("total_customers", 0)),
+        newCustomersThisMonth=int(stats.get(f"new_customers:{this_month}", 0)),
+        customersByStatus=_stats_group(stats, "customers_by_status"),
+        customersBySource=_stats_group(stats, "customers_by_source"),
         contractsByState=contracts_by_state,
         monthlyRevenue=monthly_revenue,
         outstandingTop=outstanding_top,
@@ -291,14 +303,69 @@ async def get_summary(db: Session = Depends(get_db)):
     )
 
 
-@router.get("/payments", response_model=List[PaymentRow])
-async def list_all_payments(
+@router.get("/activity", response_model=ActivityPage)
+async def list_activity(
     db: Session = Depends(get_db),
-    fromMonth: Optional[str] = Query(None, description="YYYY-MM 이상"),
-    toMonth: Optional[str] = Query(None, description="YYYY-MM 이하"),
-    method: Optional[str] = Query(None),
+    before: Optional[str] = Query(None, description="이전 응답의 nextCursor"),
+    limit: int = Query(30, ge=1, le=100),
+):
+    """활동 피드 (최신순). nextCursor 를 before 로 넘기면 계속 과거로 스크롤."""
+    position = None
+    if before:
+        position = tuple(parse_cursor(before, parse_datetime, int))
+    rows = activity_log.page(db, position, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.occurred_at, last.id)
+    return ActivityPage(items=[_activity_item(e, name) for e, name in rows], nextCursor=next_cursor)
+
+
+@router.get("/revenue", response_model=List[RevenuePoint])
+async def get_revenue_series(
+    db: Session = Depends(get_db),
+    from_: Optional[str] = Query(None, alias="from", description="YYYY-MM-DD 또는 YYYY-MM (기본: 12개월 전)"),
+    to: Optional[str] = Query(None, description="YYYY-MM-DD 또는 YYYY-MM (기본: 오늘)"),
+    bucket: str = Query("month", pattern="^(day|week|month)$"),
+    groupBy: Optional[str] = Query(None, pattern="^(method|handler)$"),
 ):
-    q = db.query(Payment, Contract, Customer).join(
+    """기간별 매출 시계열. 월 단위는 revenue_by_month 롤업만 읽으므로 기간 제한 없음."""
+    today = datetime.now(timezone.utc).date()
+    end = _parse_date_param(to, "to", end=True) if to else today
+    if from_:
+        start = _parse_date_param(from_, "from")
+    else:
+        start = datetime.strptime(_last_n_month_keys(12)[0] + "-01", "%Y-%m-%d").date()
+    if start > end:
+        raise HTTPException(status_code=400, detail="from 이 to 보다 늦습니다")
+    return [
+        RevenuePoint(bucket=b, group=g, amount=amount, count=count)
+        for b, g, amount, count in revenue_rollup.series(db, start, end, bucket, groupBy)
+    ]
+
+
+def _payments_query(
+    db: Session,
+    fromMonth: Optional[str],
+    toMonth: Optional[str],
+    method: Optional[str],
+    after: Optional[tuple] = None,
+):
+    """입금 ⋈ 계약 ⋈ 고객 — 필요한 컬럼만, (paid_at, id) 내림차순."""
+    q = db.query(
+        Payment.id.label("payment_id"),
+        Contract.id.label("contract_id"),
+        Customer.id.label("customer_id"),
+        Customer.name.label("customer_name"),
+        Contract.title,
+        Payment.amount,
+        Payment.paid_at,
+        Payment.method,
+        Payment.memo,
+        Payment.handler,
+    ).join(
         Contract, Payment.contract_id == Contract.id
     ).join(
         Customer, Contract.customer_id == Customer.id
@@ -322,54 +389,137 @@ async def list_all_payments(
             pass
     if method:
         q = q.filter(Payment.method == method)
+    if after is not None:
+        q = q.filter(pagination.before(db, [Payment.paid_at, Payment.id], after))
+
+    return q.order_by(Payment.paid_at.desc(), Payment.id.desc())
+
+
+def _payment_row(r) -> PaymentRow:
+    return PaymentRow(
+        paymentId=r.payment_id,
+        contractId=r.contract_id,
+        customerId=r.customer_id,
+        customerName=r.customer_name,
+        contractTitle=r.title or "",
+        amount=r.amount or 0,
+        paidAt=r.paid_at.isoformat() if r.paid_at else "",
+        method=r.method,
+        memo=r.memo or "",
+        handler=r.handler or "",
+    )
 
-    rows = q.order_by(Payment.paid_at.desc()).all()
-    return [
-        PaymentRow(
-            paymentId=p.id,
-            contractId=c.id,
-            customerId=cust.id,
-            customerName=cust.name,
-            contractTitle=c.title or "",
-            amount=p.amount or 0,
-            paidAt=p.paid_at.isoformat() if p.paid_at else "",
-            method=p.method,
-            memo=p.memo or "",
-            handler=p.handler or "",
+
+_CSV_COLUMNS = [
+    ("paidAt", "입금일시"),
+    ("customerName", "고객명"),
+    ("contractTitle", "계약명"),
+    ("amount", "금액"),
+    ("method", "결제수단"),
+    ("handler", "담당자"),
+    ("memo", "메모"),
+    ("paymentId", "입금ID"),
+    ("contractId", "계약ID"),
+    ("customerId", "고객ID"),
+]
+
+
+def _stream_payments(fmt: str, fromMonth, toMonth, method, after, limit) -> Iterator[str]:
+    """서버 측 커서(yield_per)로 한 묶음씩 읽어 바로 내보냄 — 전체 건수와 무관하게 메모리 일정.
+    응답 스트리밍 도중에도 쓸 수 있도록 요청 세션과 별개의 세션을 사용."""
+    db = SessionLocal()
+    try:
+        q = _payments_query(db, fromMonth, toMonth, method, after)
+        if limit:
+            q = q.limit(limit)
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow([label for _, label in _CSV_COLUMNS])
+            yield "\ufeff" + buf.getvalue()  # 엑셀 한글 인식용 BOM
+        for r in q.yield_per(_STREAM_BATCH):
+            row = _payment_row(r)
+            if fmt == "csv":
+                buf.seek(0)
+                buf.truncate()
+                data = row.model_dump()
+                writer.writerow([data[key] for key, _ in _CSV_COLUMNS])
+                yield buf.getvalue()
+            else:
+                yield row.model_dump_json() + "\n"
+    finally:
+        db.close()
+
+
+@router.get("/payments", response_model=List[PaymentRow])
+async def list_all_payments(
+    response: Response,
+    db: Session = Depends(get_db),
+    fromMonth: Optional[str] = Query(None, description="YYYY-MM 이상"),
+    toMonth: Optional[str] = Query(None, description="YYYY-MM 이하"),
+    method: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="없으면 전체"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$", description="ndjson/csv 는 스트리밍"),
+):
+    """입금 원장 (최신순). json 은 limit/cursor 로 페이지 단위, ndjson/csv 는 전체를 스트리밍."""
+    after = None
+    if cursor:
+        after = tuple(parse_cursor(cursor, parse_datetime, int))
+
+    if format != "json":
+        media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+        headers = {}
+        if format == "csv":
+            filename = f"입금내역_{fromMonth or '전체'}_{toMonth or datetime.now().strftime('%Y-%m')}.csv"
+            headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+        return StreamingResponse(
+            _stream_payments(format, fromMonth, toMonth, method, after, limit),
+            media_type=media_type,
+            headers=headers,
         )
-        for p, c, cust in rows
-    ]
+
+    q = _payments_query(db, fromMonth, toMonth, method, after)
+    if limit:
+        q = q.limit(limit + 1)
+    rows = q.all()
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].paid_at, rows[-1].payment_id)
+    return [_payment_row(r) for r in rows]
 
 
 @router.get("/outstanding", response_model=List[OutstandingItem])
-async def list_outstanding(db: Session = Depends(get_db)):
-    """미수금 있는 활성 계약 전체 (큰 순)"""
-    contracts = db.query(Contract).filter(Contract.state == "active").all()
-    paid_per_contract = dict(
-        db.query(Payment.contract_id, func.coalesce(func.sum(Payment.amount), 0))
-        .group_by(Payment.contract_id)
-        .all()
-    )
-    customer_name_by_id = dict(
-        db.query(Customer.id, Customer.name).all()
+async def list_outstanding(
+    response: Response,
+    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="없으면 전체"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+):
+    """미수금 있는 활성 계약 (큰 순). 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 전달."""
+    after = None
+    if cursor:
+        after = tuple(parse_cursor(cursor, float, int))
+
+    def compute():
+        items = _outstanding_items(db, limit + 1 if limit else None, after)
+        next_cursor = None
+        if limit and len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].remainingAmount, items[-1].contractId)
+        return items, next_cursor
+
+    items, next_cursor = response_cache.get_or_compute(
+        db, response_cache.DASHBOARD, ("outstanding", limit, cursor), compute
     )
-    items: List[OutstandingItem] = []
-    for c in contracts:
-        paid = paid_per_contract.get(c.id, 0) or 0
-        remain = (c.contract_amount or 0) - paid
-        if remain <= 0:
-            continue
-        items.append(
-            OutstandingItem(
-                contractId=c.id,
-                customerId=c.customer_id,
-                customerName=customer_name_by_id.get(c.customer_id, ""),
-                contractTitle=c.title or "",
-                contractAmount=c.contract_amount or 0,
-                paidAmount=paid,
-                remainingAmount=remain,
-                contractDate=c.contract_date or "",
-            )
-        )
-    items.sort(key=lambda x: x.remainingAmount, reverse=True)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return items
+
+
+@router.get("/outstanding/aging", response_model=List[AgingBucket])
+async def get_outstanding_aging(db: Session = Depends(get_db)):
+    """미수금 연령 구간별 (계약일 기준 0-30/31-60/61-90/90+일) 건수·금액."""
+    return response_cache.get_or_compute(
+        db, response_cache.DASHBOARD, ("outstanding_aging",), lambda: _aging_summary(db)
+    )
@@ -1,28 +1,55 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import distinct
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models.customer import Contact
-from models.contract import Payment
+from services import handler_index, handler_stats
 
 router = APIRouter(prefix="/api/handlers", tags=["handlers"])
 
 
 @router.get("", response_model=List[str])
-async def list_handlers(db: Session = Depends(get_db)):
-    """컨택/입금에서 사용된 모든 담당자 이름 (자동완성용)."""
-    contact_handlers = db.query(distinct(Contact.handler)).filter(Contact.handler != "").all()
-    payment_handlers = db.query(distinct(Payment.handler)).filter(Payment.handler != "").all()
-
-    names = set()
-    for (h,) in contact_handlers:
-        if h:
-            names.add(h.strip())
-    for (h,) in payment_handlers:
-        if h:
-            names.add(h.strip())
-
-    return sorted(names)
+async def list_handlers(
+    request: Request,
+    response: Response,
+    prefix: str = Query("", max_length=100, description="입력 중인 앞부분"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="없으면 전체"),
+    db: Session = Depends(get_db),
+):
+    """컨택/입금에서 사용된 담당자 이름 (자동완성용) — prefix 로 시작하는 이름을 사용 횟수순으로.
+    ETag 는 담당자 사전의 세대 번호라 바뀐 게 없으면 If-None-Match 에 304."""
+    generation, names = handler_index.suggest(db, prefix, limit)
+    etag = f'W/"handlers-{generation}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    # 브라우저가 캐시해 두되 매번 ETag 로 재검증
+    response.headers["Cache-Control"] = "no-cache"
+    return names
+
+
+_MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+class HandlerStats(BaseModel):
+    handler: str                               # 미지정은 ""
+    contacts: int                              # 컨택 수
+    leads: int                                 # 첫 컨택을 맡은 고객 수
+    conversions: int                           # 그 중 계약 완료 이후 상태인 고객 수
+    conversionRate: Optional[float] = None     # conversions / leads
+    avgContactGapDays: Optional[float] = None  # 직전 컨택과의 평균 간격(일)
+    payments: int                              # 입금 건수
+    paymentAmount: float                       # 입금 합계
+
+
+@router.get("/stats", response_model=List[HandlerStats])
+async def handler_stats_summary(
+    from_month: Optional[str] = Query(None, alias="fromMonth", pattern=_MONTH_PATTERN),
+    to_month: Optional[str] = Query(None, alias="toMonth", pattern=_MONTH_PATTERN),
+    db: Session = Depends(get_db),
+):
+    """담당자별 컨택/전환/입금 실적 (YYYY-MM 월 범위, 없으면 전체 기간).
+    담당자 × 월 카운터와 월별 매출 롤업만 읽음 — 컨택은 컨택 일시, 입금은 입금일 기준 월."""
+    return handler_stats.summary(db, from_month, to_month)
@@ -1,58 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from database import get_db
 from models.schemas.material import (
     MaterialCreate, MaterialUpdate, MaterialResponse, MaterialListResponse,
-    BrandResponse, CategoryResponse, WorkTypeResponse,
     LaborRateCreate, LaborRateResponse, LaborRateListResponse,
     MiscItemCreate, MiscItemResponse, MiscItemListResponse,
 )
+from services import material_catalog
 from services.material_service import MaterialService
 
 router = APIRouter(prefix="/api", tags=["materials"])
 
 
+def _catalog(db: Session, request: Request, response: Response, field: str):
+    """메모리 카탈로그 스냅샷의 field — ETag 는 카탈로그 세대 번호라 바뀐 게 없으면 304."""
+    catalog = material_catalog.load(db)
+    etag = f'W/"catalog-{catalog.generation}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    # 브라우저가 캐시해 두되 매번 ETag 로 재검증
+    response.headers["Cache-Control"] = "no-cache"
+    return getattr(catalog, field)
+
+
 # ── 통계 ──
 
 @router.get("/stats")
-async def get_stats(db: Session = Depends(get_db)):
-    service = MaterialService(db)
-    return service.get_stats()
+async def get_stats(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _catalog(db, request, response, "stats")
 
 
 # ── Brands ──
 
 @router.get("/brands")
-async def list_brands(db: Session = Depends(get_db)):
-    service = MaterialService(db)
-    brands = service.list_brands()
-    return [BrandResponse.model_validate(b) for b in brands]
+async def list_brands(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _catalog(db, request, response, "brands")
 
 
 # ── Categories ──
 
 @router.get("/categories")
-async def list_categories(db: Session = Depends(get_db)):
-    service = MaterialService(db)
-    cats = service.list_categories()
-    return [CategoryResponse.model_validate(c) for c in cats]
+async def list_categories(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _catalog(db, request, response, "categories")
 
 
 @router.get("/categories/level1")
-async def list_category_level1(db: Session = Depends(get_db)):
-    service = MaterialService(db)
-    return service.get_category_level1_list()
+async def list_category_level1(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _catalog(db, request, response, "level1")
 
 
 # ── Work Types ──
 
 @router.get("/work-types")
-async def list_work_types(db: Session = Depends(get_db)):
-    service = MaterialService(db)
-    wts = service.list_work_types()
-    return [WorkTypeResponse.model_validate(w) for w in wts]
+async def list_work_types(request: Request, response: Response, db: Session = Depends(get_db)):
+    return _catalog(db, request, response, "work_types")
 
 
 # ── Materials ──
@@ -65,6 +69,7 @@ async def list_materials(
     search: Optional[str] = None,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=1000),
+    include_total: bool = Query(default=True, description="false 면 전체 건수 계산 생략"),
     db: Session = Depends(get_db),
 ):
     service = MaterialService(db)
@@ -75,6 +80,7 @@ async def list_materials(
         search=search,
         skip=skip,
         limit=limit,
+        include_total=include_total,
     )
     return MaterialListResponse(
         materials=[MaterialResponse(**m) for m in materials],
@@ -143,11 +149,16 @@ async def list_labor_rates(
     search: Optional[str] = None,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=1000),
+    include_total: bool = Query(default=True, description="false 면 전체 건수 계산 생략"),
     db: Session = Depends(get_db),
 ):
     service = MaterialService(db)
     items, total = service.list_labor_rates(
-        work_type_name=work_type, search=search, skip=skip, limit=limit
+        work_type_name=work_type,
+        search=search,
+        skip=skip,
+        limit=limit,
+        include_total=include_total,
     )
     return LaborRateListResponse(
         labor_rates=[LaborRateResponse(**i) for i in items],
@@ -170,11 +181,16 @@ async def list_misc_items(
     search: Optional[str] = None,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=1000),
+    include_total: bool = Query(default=True, description="false 면 전체 건수 계산 생략"),
     db: Session = Depends(get_db),
 ):
     service = MaterialService(db)
     items, total = service.list_misc_items(
-        work_type_name=work_type, search=search, skip=skip, limit=limit
+        work_type_name=work_type,
+        search=search,
+        skip=skip,
+        limit=limit,
+        include_total=include_total,
     )
     return MiscItemListResponse(
         misc_items=[MiscItemResponse(**i) for i in items],
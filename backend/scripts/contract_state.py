@@ -0,0 +1,54 @@
+"""
+계약 입금 합계(paid_total) 재계산 + 완납된 진행 중 계약을 완료로 일괄 전환하는 스크립트
+신규 입금은 저장 시 자동으로 전환되므로, 도입 이전 데이터에 한 번만 실행.
+사용법: cd backend && python -m scripts.contract_state [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+# backend 디렉토리를 path에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from database import SessionLocal, engine, Base
+import models.customer  # noqa: F401
+import models.contract  # noqa: F401
+import models.saved_estimate  # noqa: F401
+import models.dashboard  # noqa: F401
+from models.contract import Contract
+from services import contract_state, customer_finance, dashboard_stats, response_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="계약 상태 일괄 정리")
+    parser.add_argument("--dry-run", action="store_true", help="바뀔 계약만 출력하고 저장하지 않음")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        changed = contract_state.reconcile(db)
+        for contract_id, old, new in changed:
+            print(f"  - 계약 {contract_id}: {old} → {new}")
+        if args.dry_run:
+            db.rollback()
+            print(f"완료 전환 대상 {len(changed)}건 (dry-run, 저장 안 함)")
+            return
+        if changed:
+            # 상태별 계약 수·미수금 집계를 다시 계산
+            ids = [contract_id for contract_id, _, _ in changed]
+            customer_ids = {
+                customer_id
+                for (customer_id,) in db.query(Contract.customer_id).filter(Contract.id.in_(ids))
+            }
+            dashboard_stats.rebuild(db)
+            customer_finance.recompute(db, list(customer_ids))
+            response_cache.bump(db, response_cache.DASHBOARD)
+        db.commit()
+        print(f"완료 전환 {len(changed)}건")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+중복 고객 후보(customer_duplicates) 일괄 탐지 스크립트
+신규/수정 고객은 저장 시 자동으로 탐지되므로, 기존 데이터나 기준 변경 후에만 실행.
+사용법: cd backend && python -m scripts.customer_dedup
+"""
+import os
+import sys
+
+# backend 디렉토리를 path에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from database import SessionLocal, engine, Base
+import models.customer  # noqa: F401
+import models.contract  # noqa: F401
+import models.saved_estimate  # noqa: F401
+import models.activity  # noqa: F401
+from services import customer_dedup
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = customer_dedup.rebuild(db)
+        db.commit()
+        print(f"중복 후보 {count}쌍")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
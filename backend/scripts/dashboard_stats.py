@@ -0,0 +1,80 @@
+"""
+대시보드 통계 스냅샷(dashboard_stats)·월별 매출 롤업(revenue_by_month)·고객별 재무 집계 컬럼·계약 입금 합계·고객/자재 검색 색인·담당자 사전·담당자 월간 통계 재계산 / 정합성 검사 스크립트
+사용법: cd backend && python -m scripts.dashboard_stats rebuild
+        cd backend && python -m scripts.dashboard_stats check
+"""
+import argparse
+import os
+import sys
+
+# backend 디렉토리를 path에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from database import SessionLocal, engine, Base
+import models.customer  # noqa: F401
+import models.contract  # noqa: F401
+import models.saved_estimate  # noqa: F401
+import models.dashboard  # noqa: F401
+import models.handler  # noqa: F401
+import models.material  # noqa: F401
+from services import (
+    contract_state,
+    customer_finance,
+    customer_search,
+    dashboard_stats,
+    handler_index,
+    handler_stats,
+    material_search,
+    revenue_rollup,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 통계 스냅샷 관리")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            paid_count = contract_state.recompute_paid(db)
+            count = dashboard_stats.rebuild(db)
+            rollup_count = revenue_rollup.rebuild(db)
+            customer_count = customer_finance.recompute(db)
+            gram_count = customer_search.rebuild(db)
+            handler_count = handler_index.rebuild(db)
+            handler_stat_count = handler_stats.rebuild(db)
+            material_gram_count = material_search.rebuild(db)
+            db.commit()
+            print(
+                f"스냅샷 재계산 완료: {count}개 항목, 월별 매출 롤업 {rollup_count}행, "
+                f"고객 재무 집계 {customer_count}명, 계약 입금 합계 {paid_count}건 보정, "
+                f"검색 색인 {gram_count}개, 자재 검색 색인 {material_gram_count}개, "
+                f"담당자 {handler_count}명, 담당자 월간 통계 {handler_stat_count}행"
+            )
+            return
+
+        diffs = (
+            dashboard_stats.check(db)
+            + revenue_rollup.check(db)
+            + customer_finance.check(db)
+            + contract_state.check(db)
+            + customer_search.check(db)
+            + handler_index.check(db)
+            + handler_stats.check(db)
+            + material_search.check(db)
+        )
+        if not diffs:
+            print("스냅샷 일치 ✓")
+            return
+        print(f"불일치 {len(diffs)}건 (key: 저장값 → 재계산값)")
+        for key, stored, expected in diffs:
+            print(f"  - {key}: {stored:,.0f} → {expected:,.0f}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""대시보드 활동 피드 (activity_events 테이블).
+
+고객 등록, 컨택 기록, 계약 생성, 입금이 생길 때 services/write_hooks.py 에서 한 행씩 추가한다.
+조회는 (occurred_at, id) 인덱스를 따라 내려가는 keyset 범위 스캔 한 번.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from models.activity import ActivityEvent
+from models.customer import Customer, Contact
+from models.contract import Contract, Payment
+from services import pagination
+
+
+def _customer_name(db: Session, customer_id: Optional[int]) -> str:
+    if customer_id is None:
+        return ""
+    return db.query(Customer.name).filter(Customer.id == customer_id).scalar() or ""
+
+
+def customer_created(db: Session, customer: Customer) -> None:
+    db.add(ActivityEvent(
+        event_type="customer_created",
+        occurred_at=customer.created_at or datetime.utcnow(),
+        customer_id=customer.id,
+        customer_name=customer.name or "",
+    ))
+
+
+def customers_created(db: Session, customers) -> None:
+    """대량 가져오기로 생긴 고객들 — INSERT 한 번(executemany)."""
+    rows = [
+        {
+            "event_type": "customer_created",
+            "occurred_at": c.created_at or datetime.utcnow(),
+            "customer_id": c.id,
+            "customer_name": c.name or "",
+        }
+        for c in customers
+    ]
+    if rows:
+        db.execute(insert(ActivityEvent), rows)
+
+
+def contact_logged(db: Session, contact: Contact) -> None:
+    db.add(ActivityEvent(
+        event_type="contact_logged",
+        occurred_at=contact.contacted_at or datetime.utcnow(),
+        customer_id=contact.customer_id,
+        customer_name=_customer_name(db, contact.customer_id),
+        description=f"{contact.sequence}차 컨택",
+    ))
+
+
+def contract_created(db: Session, contract: Contract) -> None:
+    db.add(ActivityEvent(
+        event_type="contract_created",
+        occurred_at=contract.created_at or datetime.utcnow(),
+        customer_id=contract.customer_id,
+        customer_name=_customer_name(db, contract.customer_id),
+        amount=contract.contract_amount,
+        description=contract.title or "",
+    ))
+
+
+def payment_received(db: Session, contract: Contract, payment: Payment) -> None:
+    db.add(ActivityEvent(
+        event_type="payment_received",
+        occurred_at=payment.paid_at or datetime.utcnow(),
+        customer_id=contract.customer_id,
+        customer_name=_customer_name(db, contract.customer_id),
+        amount=payment.amount,
+        description=payment.method,
+    ))
+
+
+def payments_received(db: Session, contracts: Dict[int, Contract], payments) -> None:
+    """대량 입금 등록(은행 내역 대사) — 고객명 조회 한 번, INSERT 한 번(executemany)."""
+    customer_ids = {contracts[p.contract_id].customer_id for p in payments}
+    names = dict(
+        db.query(Customer.id, Customer.name).filter(Customer.id.in_(customer_ids)).all()
+    ) if customer_ids else {}
+    rows = [
+        {
+            "event_type": "payment_received",
+            "occurred_at": p.paid_at or datetime.utcnow(),
+            "customer_id": contracts[p.contract_id].customer_id,
+            "customer_name": names.get(contracts[p.contract_id].customer_id) or "",
+            "amount": p.amount,
+            "description": p.method,
+        }
+        for p in payments
+    ]
+    if rows:
+        db.execute(insert(ActivityEvent), rows)
+
+
+def page(
+    db: Session, before: Optional[Tuple[datetime, int]], limit: int
+) -> List[Tuple[ActivityEvent, str]]:
+    """before (occurred_at, id) 보다 이전 이벤트 limit 개, 최신순. (이벤트, 현재 고객명)"""
+    q = db.query(
+        ActivityEvent,
+        func.coalesce(Customer.name, ActivityEvent.customer_name),
+    ).outerjoin(Customer, Customer.id == ActivityEvent.customer_id)
+    if before is not None:
+        q = q.filter(pagination.before(db, [ActivityEvent.occurred_at, ActivityEvent.id], before))
+    return (
+        q.order_by(ActivityEvent.occurred_at.desc(), ActivityEvent.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def backfill(db: Session) -> int:
+    """로그 도입 이전 데이터로 피드를 채움 (테이블이 비어 있을 때 한 번). 추가한 행 수 반환."""
+    names = dict(db.query(Customer.id, Customer.name).all())
+    contract_customer = dict(db.query(Contract.id, Contract.customer_id).all())
+    events: List[ActivityEvent] = []
+    for c in db.query(Customer.id, Customer.name, Customer.created_at).all():
+        if c.created_at:
+            events.append(ActivityEvent(
+                event_type="customer_created", occurred_at=c.created_at,
+                customer_id=c.id, customer_name=c.name or "",
+            ))
+    for ct in db.query(Contact.customer_id, Contact.sequence, Contact.contacted_at).all():
+        if ct.contacted_at:
+            events.append(ActivityEvent(
+                event_type="contact_logged", occurred_at=ct.contacted_at,
+                customer_id=ct.customer_id, customer_name=names.get(ct.customer_id, ""),
+                description=f"{ct.sequence}차 컨택",
+            ))
+    for c in db.query(
+        Contract.customer_id, Contract.created_at, Contract.contract_amount, Contract.title
+    ).all():
+        if c.created_at:
+            events.append(ActivityEvent(
+                event_type="contract_created", occurred_at=c.created_at,
+                customer_id=c.customer_id, customer_name=names.get(c.customer_id, ""),
+                amount=c.contract_amount, description=c.title or "",
+            ))
+    for p in db.query(Payment.contract_id, Payment.paid_at, Payment.amount, Payment.method).all():
+        if p.paid_at:
+            cust_id = contract_customer.get(p.contract_id)
+            events.append(ActivityEvent(
+                event_type="payment_received", occurred_at=p.paid_at,
+                customer_id=cust_id, customer_name=names.get(cust_id, ""),
+                amount=p.amount, description=p.method,
+            ))
+    events.sort(key=lambda e: e.occurred_at)
+    db.add_all(events)
+    db.flush()
+    return len(events)
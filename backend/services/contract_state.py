@@ -0,0 +1,117 @@
+"""계약 입금 합계(contracts.paid_total)와 입금에 따른 상태 자동 전환.
+
+입금이 추가/수정/삭제될 때 services/write_hooks.py 에서 add_paid() 로 변경분만큼
+UPDATE ... SET paid_total = paid_total + :delta RETURNING paid_total (합계를 다시 세지 않음).
+    - 진행 중(active) 계약이 완납되면 → completed
+    - 완납 상태였던 완료(completed) 계약이 입금 삭제/감액으로 미납이 되면 → active
+      (입금과 무관하게 직접 완료 처리한 계약은 그대로)
+기존 데이터는 reconcile() (python -m scripts.contract_state) 로 한 번 맞춘다.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.contract import Contract, Payment
+
+# 원 단위 반올림 오차
+_TOLERANCE = 0.5
+
+
+def fully_paid(amount: float, paid: float) -> bool:
+    return (amount or 0) > 0 and (paid or 0) >= (amount or 0) - _TOLERANCE
+
+
+def next_state(state: str, amount: float, paid_before: float, paid_after: float) -> Optional[str]:
+    """입금 합계 변화에 따른 새 상태 (바뀌지 않으면 None)."""
+    if state == "active" and fully_paid(amount, paid_after):
+        return "completed"
+    if state == "completed" and fully_paid(amount, paid_before) and not fully_paid(amount, paid_after):
+        return "active"
+    return None
+
+
+def add_paid(db: Session, contract: Contract, delta: float) -> Tuple[float, float]:
+    """입금 합계에 delta 를 더하고 필요하면 상태를 바꿈. (변경 전 합계, 변경 후 합계) 반환.
+    호출 전에 flush 되어 있어야 함."""
+    if delta:
+        paid_after, version = db.execute(
+            update(Contract)
+            .where(Contract.id == contract.id)
+            # 합계 변경은 계약 수정이 아니므로 updated_at(onupdate) 은 그대로 둠 (version 은 증가)
+            .values(paid_total=Contract.paid_total + delta, updated_at=Contract.updated_at)
+            .returning(Contract.paid_total, Contract.version)
+            .execution_options(synchronize_session=False)
+        ).one()
+        set_committed_value(contract, "paid_total", paid_after)
+        set_committed_value(contract, "version", version)
+    else:
+        paid_after = contract.paid_total or 0
+    paid_before = paid_after - delta
+    state = next_state(contract.state, contract.contract_amount, paid_before, paid_after)
+    if state is not None:
+        contract.state = state
+    return paid_before, paid_after
+
+
+# ── 재계산 / 일괄 정리 ──
+
+def compute(db: Session) -> Dict[int, float]:
+    """계약별 입금 합계 (원본 테이블에서)."""
+    return dict(
+        db.query(Payment.contract_id, func.sum(Payment.amount))
+        .group_by(Payment.contract_id)
+        .all()
+    )
+
+
+def recompute_paid(db: Session) -> int:
+    """paid_total 을 원본에서 다시 채움 (상태는 그대로). 값이 바뀐 계약 수 반환."""
+    computed = compute(db)
+    count = 0
+    for contract_id, stored in db.query(Contract.id, Contract.paid_total).all():
+        expected = computed.get(contract_id) or 0
+        if abs((stored or 0) - expected) > 0.01:
+            db.execute(
+                update(Contract)
+                .where(Contract.id == contract_id)
+                .values(paid_total=expected, updated_at=Contract.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            count += 1
+    db.flush()
+    return count
+
+
+def reconcile(db: Session) -> List[Tuple[int, str, str]]:
+    """입금 합계를 맞추고 완납된 진행 중 계약을 completed 로. (계약 id, 이전 상태, 새 상태) 목록.
+    완료 → 진행 중 되돌리기는 하지 않음 (직접 완료 처리한 계약일 수 있음).
+    대시보드/고객 집계 재계산은 호출자가 (scripts.contract_state)."""
+    recompute_paid(db)
+    rows = (
+        db.query(Contract.id, Contract.contract_amount, Contract.paid_total)
+        .filter(Contract.state == "active")
+        .all()
+    )
+    changed = [r.id for r in rows if fully_paid(r.contract_amount, r.paid_total)]
+    for i in range(0, len(changed), 500):
+        db.execute(
+            update(Contract)
+            .where(Contract.id.in_(changed[i:i + 500]))
+            .values(state="completed")
+            .execution_options(synchronize_session=False)
+        )
+    db.flush()
+    return [(contract_id, "active", "completed") for contract_id in changed]
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """(key, 저장값, 재계산값) — paid_total 이 원본과 다른 계약 목록."""
+    computed = compute(db)
+    diffs = []
+    for contract_id, stored in db.query(Contract.id, Contract.paid_total).all():
+        expected = computed.get(contract_id) or 0
+        if abs((stored or 0) - expected) > 0.01:
+            diffs.append((f"contract:{contract_id} paid_total", stored or 0, expected))
+    return diffs
@@ -0,0 +1,23 @@
+from typing import Any, Dict
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def increment(db: Session, model, keys: Dict[str, Any], deltas: Dict[str, float]) -> None:
+    """집계 테이블에서 keys 로 식별되는 행의 컬럼에 deltas 를 더함 (행이 없으면 생성).
+
+    UPSERT 한 문장으로 처리하므로 여러 워커가 동시에 같은 행을 갱신해도 값이 유실되지 않음.
+    keys 컬럼에는 PK 또는 UNIQUE 제약이 있어야 함.
+    """
+    if not any(deltas.values()):
+        return
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    table = model.__table__
+    stmt = insert(table).values(**keys, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + stmt.excluded[name] for name in deltas},
+    )
+    db.execute(stmt)
@@ -0,0 +1,256 @@
+"""중복 고객 탐지 / 병합 (customer_duplicates 테이블).
+
+전체 쌍을 비교(O(n²))하지 않고 블로킹 키가 같은 고객끼리만 점수를 매긴다.
+    - 연락처 숫자 (8자리 이상)
+    - 이메일 (대소문자 무시)
+    - 이름 (회사명은 점수에서 비교)
+고객이 생기거나 이름/연락처/이메일이 바뀌면 services/write_hooks.py 에서 그 고객만 detect(),
+기존 데이터 전체는 rebuild() (python -m scripts.customer_dedup).
+"""
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from models.activity import ActivityEvent
+from models.customer import Customer, Contact, CustomerDuplicate
+from models.contract import Contract
+from models.saved_estimate import SavedEstimate
+from services.customer_search import digits, normalize
+
+# 이 점수 이상이면 중복 후보로 저장
+THRESHOLD = 0.5
+
+_MIN_PHONE_DIGITS = 8
+
+# 블록이 너무 크면 (흔한 이름 등) 일괄 탐지에서 건너뜀
+_MAX_BLOCK = 200
+
+# 병합 시 대상 고객이 비어 있으면 원본 값으로 채우는 필드
+_FILL_FIELDS = ("company_name", "phone", "email", "address", "manager")
+
+KEY_FIELDS = ("name", "company_name", "phone", "email")
+
+
+def key_changed(before, after) -> bool:
+    return any(getattr(before, f) != getattr(after, f) for f in KEY_FIELDS)
+
+
+def blocking_keys(c) -> Set[str]:
+    out = set()
+    phone = digits(c.phone)
+    if len(phone) >= _MIN_PHONE_DIGITS:
+        out.add(f"phone:{phone}")
+    email = normalize(c.email).strip()
+    if email:
+        out.add(f"email:{email}")
+    if c.name:
+        out.add(f"name:{c.name}")
+    return out
+
+
+def _similarity(a: str, b: str) -> float:
+    a, b = normalize(a).strip(), normalize(b).strip()
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def score(a, b) -> Tuple[float, List[str]]:
+    """(0~1 점수, 일치 항목). 연락처/이메일 일치가 가장 강한 신호."""
+    total = 0.0
+    reasons = []
+    phone = digits(a.phone)
+    if len(phone) >= _MIN_PHONE_DIGITS and phone == digits(b.phone):
+        total += 0.5
+        reasons.append("phone")
+    email = normalize(a.email).strip()
+    if email and email == normalize(b.email).strip():
+        total += 0.5
+        reasons.append("email")
+    name = _similarity(a.name, b.name)
+    total += 0.3 * name
+    if name == 1.0:
+        reasons.append("name")
+    company = _similarity(a.company_name, b.company_name)
+    total += 0.2 * company
+    if company == 1.0:
+        reasons.append("company")
+    return min(total, 1.0), reasons
+
+
+# ── 탐지 ──
+
+def _save_pair(db: Session, a, b, existing: Dict[Tuple[int, int], CustomerDuplicate]) -> bool:
+    value, reasons = score(a, b)
+    key = (min(a.id, b.id), max(a.id, b.id))
+    row = existing.get(key)
+    if value < THRESHOLD:
+        if row is not None and not row.dismissed:
+            db.delete(row)
+        return False
+    if row is None:
+        row = CustomerDuplicate(customer_id=key[0], duplicate_id=key[1])
+        db.add(row)
+        existing[key] = row
+    row.score = round(value, 3)
+    row.reasons = ",".join(reasons)
+    return True
+
+
+def detect(db: Session, customer: Customer) -> int:
+    """고객 한 명의 중복 후보 갱신 — 블로킹 키별 인덱스 조회. 저장한 후보 수 반환."""
+    criteria = []
+    phone = digits(customer.phone)
+    if len(phone) >= _MIN_PHONE_DIGITS:
+        criteria.append(Customer.phone_digits == phone)
+    email = normalize(customer.email).strip()
+    if email:
+        criteria.append(func.lower(Customer.email) == email)
+    if customer.name:
+        criteria.append(Customer.name == customer.name)
+
+    existing = {
+        (r.customer_id, r.duplicate_id): r
+        for r in db.query(CustomerDuplicate).filter(
+            or_(
+                CustomerDuplicate.customer_id == customer.id,
+                CustomerDuplicate.duplicate_id == customer.id,
+            )
+        )
+    }
+    candidates = []
+    if criteria:
+        candidates = (
+            db.query(Customer)
+            .filter(or_(*criteria), Customer.id != customer.id)
+            .limit(_MAX_BLOCK)
+            .all()
+        )
+    found = 0
+    seen = set()
+    for other in candidates:
+        seen.add((min(customer.id, other.id), max(customer.id, other.id)))
+        found += _save_pair(db, customer, other, existing)
+    # 키가 바뀌어 더 이상 같은 블록이 아닌 기존 후보 정리
+    for key, row in existing.items():
+        if key not in seen and not row.dismissed:
+            db.delete(row)
+    return found
+
+
+def rebuild(db: Session) -> int:
+    """전체 고객 일괄 탐지 — 한 번 읽어서 블로킹 키별로 묶은 뒤 블록 안에서만 비교.
+    "중복 아님" 처리한 쌍은 유지. 저장한 후보 수 반환 (commit 은 호출자가)."""
+    rows = db.query(
+        Customer.id, Customer.name, Customer.company_name, Customer.phone, Customer.email
+    ).all()
+    blocks: Dict[str, List] = defaultdict(list)
+    for r in rows:
+        for key in blocking_keys(r):
+            blocks[key].append(r)
+
+    existing = {(r.customer_id, r.duplicate_id): r for r in db.query(CustomerDuplicate)}
+    found: Set[Tuple[int, int]] = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > _MAX_BLOCK:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                key = (min(a.id, b.id), max(a.id, b.id))
+                if key in found:
+                    continue
+                if _save_pair(db, a, b, existing):
+                    found.add(key)
+    for key, row in existing.items():
+        if key not in found and not row.dismissed:
+            db.delete(row)
+    db.flush()
+    return len(found)
+
+
+def pairs(
+    db: Session, min_score: float = THRESHOLD, limit: int = 50
+) -> List[Tuple[CustomerDuplicate, Customer, Customer]]:
+    """점수순 중복 후보 (처리 안 된 것만)."""
+    rows = (
+        db.query(CustomerDuplicate)
+        .filter(CustomerDuplicate.dismissed == False, CustomerDuplicate.score >= min_score)  # noqa: E712
+        .order_by(CustomerDuplicate.score.desc(), CustomerDuplicate.customer_id)
+        .limit(limit)
+        .all()
+    )
+    ids = {r.customer_id for r in rows} | {r.duplicate_id for r in rows}
+    customers = {c.id: c for c in db.query(Customer).filter(Customer.id.in_(ids))} if ids else {}
+    return [(r, customers[r.customer_id], customers[r.duplicate_id]) for r in rows]
+
+
+def dismiss(db: Session, customer_id: int, duplicate_id: int) -> Optional[CustomerDuplicate]:
+    key = (min(customer_id, duplicate_id), max(customer_id, duplicate_id))
+    row = db.get(CustomerDuplicate, key)
+    if row is not None:
+        row.dismissed = True
+    return row
+
+
+# ── 병합 ──
+
+def merge(db: Session, target: Customer, source_ids: Iterable[int]) -> List[int]:
+    """원본 고객들의 컨택/계약/저장 견적/활동 로그를 target 으로 옮기고,
+    target 의 빈 연락처 정보를 채움. 원본 고객 삭제와 파생 데이터 반영은 호출자가
+    (write_hooks.customers_merged). 실제로 옮긴 원본 id 목록 반환."""
+    sources = (
+        db.query(Customer)
+        .filter(Customer.id.in_(list(source_ids)), Customer.id != target.id)
+        .order_by(Customer.created_at, Customer.id)
+        .all()
+    )
+    ids = [s.id for s in sources]
+    if not ids:
+        return []
+
+    for field in _FILL_FIELDS:
+        if not getattr(target, field):
+            value = next((getattr(s, field) for s in sources if getattr(s, field)), "")
+            setattr(target, field, value)
+    memos = [s.memo for s in sources if s.memo and s.memo != target.memo]
+    if memos:
+        target.memo = "\n\n".join([target.memo or ""] + memos).strip()
+
+    # 컨택은 target 의 마지막 차수 뒤로 시간순 재번호
+    max_seq = (
+        db.query(func.max(Contact.sequence)).filter(Contact.customer_id == target.id).scalar()
+        or 0
+    )
+    moved = (
+        db.query(Contact.id)
+        .filter(Contact.customer_id.in_(ids))
+        .order_by(Contact.contacted_at, Contact.id)
+        .all()
+    )
+    for offset, (contact_id,) in enumerate(moved, start=1):
+        db.execute(
+            update(Contact)
+            .where(Contact.id == contact_id)
+            .values(customer_id=target.id, sequence=max_seq + offset)
+            .execution_options(synchronize_session=False)
+        )
+    for model in (Contract, SavedEstimate, ActivityEvent):
+        db.execute(
+            update(model)
+            .where(model.customer_id.in_(ids))
+            .values(customer_id=target.id)
+            .execution_options(synchronize_session=False)
+        )
+    db.query(CustomerDuplicate).filter(
+        or_(
+            CustomerDuplicate.customer_id.in_(ids),
+            CustomerDuplicate.duplicate_id.in_(ids),
+        )
+    ).delete(synchronize_session=False)
+    # 원본 ORM 객체의 relationship(contacts) 이 delete cascade 로 옮긴 컨택을 지우지 않도록
+    for s in sources:
+        db.expunge(s)
+    return ids
@@ -0,0 +1,142 @@
+"""고객별 재무/컨택 집계 컬럼 (customers.contract_total, outstanding_total, contact_count 등).
+
+계약·입금·컨택이 바뀔 때 services/write_hooks.py 에서 변경 전/후 기여분 차이만큼
+UPDATE ... SET col = col + :delta 로 같은 트랜잭션 안에서 갱신한다.
+recompute() 는 원본 테이블에서 다시 계산하고, check() 는 저장값과 비교한다.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, update
+from sqlalchemy.orm import Session
+
+from models.customer import Customer, Contact
+from models.contract import Contract, Payment
+from services.dashboard_stats import merge
+
+Delta = Dict[str, float]
+
+FIELDS = [
+    "contract_count",
+    "contract_total",
+    "paid_total",
+    "outstanding_total",
+    "tax_pending_count",
+    "contact_count",
+]
+
+_TOLERANCE = 0.01
+
+
+def contract_delta(c, paid: float, sign: int = 1) -> Delta:
+    """계약 하나가 고객 집계에 기여하는 값. 취소된 계약은 미수금/세금계산서 집계 제외."""
+    amount = c.contract_amount or 0
+    d: Delta = {
+        "contract_count": sign,
+        "contract_total": sign * amount,
+        "paid_total": sign * (paid or 0),
+    }
+    if c.state != "cancelled":
+        d["outstanding_total"] = sign * max(0, amount - (paid or 0))
+        if not c.tax_invoice_issued:
+            d["tax_pending_count"] = sign
+    return d
+
+
+def apply(db: Session, customer_id: int, deltas: Iterable[Delta]) -> None:
+    values = {k: getattr(Customer, k) + v for k, v in merge(deltas).items()}
+    if not values:
+        return
+    # 집계 변경은 고객 정보 수정이 아니므로 updated_at(onupdate) 은 그대로 둠
+    values["updated_at"] = Customer.updated_at
+    db.execute(
+        update(Customer)
+        .where(Customer.id == customer_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ── 재계산 / 검증 ──
+
+def compute(db: Session, customer_ids=None) -> Dict[int, Dict[str, Any]]:
+    """원본 테이블에서 고객별 집계 — 계약별 입금 합계를 구한 뒤 고객별로 한 번 더 묶는 SQL.
+    customer_ids 는 id 목록 또는 서브쿼리 (None 이면 전체). 계약/컨택이 없는 고객은 빠짐."""
+    per_contract = (
+        db.query(
+            Contract.customer_id.label("customer_id"),
+            Contract.state.label("state"),
+            Contract.tax_invoice_issued.label("tax_invoice_issued"),
+            func.coalesce(Contract.contract_amount, 0).label("amount"),
+            func.coalesce(func.sum(Payment.amount), 0).label("paid"),
+        )
+        .outerjoin(Payment, Payment.contract_id == Contract.id)
+        .group_by(Contract.id)
+    )
+    contacts = db.query(Contact.customer_id, func.count(Contact.id)).group_by(Contact.customer_id)
+    if customer_ids is not None:
+        per_contract = per_contract.filter(Contract.customer_id.in_(customer_ids))
+        contacts = contacts.filter(Contact.customer_id.in_(customer_ids))
+    per_contract = per_contract.subquery()
+
+    live = per_contract.c.state != "cancelled"
+    remaining = per_contract.c.amount - per_contract.c.paid
+    rows = (
+        db.query(
+            per_contract.c.customer_id,
+            func.count(),
+            func.sum(per_contract.c.amount),
+            func.sum(per_contract.c.paid),
+            func.sum(case((and_(live, remaining > 0), remaining), else_=0)),
+            func.sum(case((and_(live, per_contract.c.tax_invoice_issued == False), 1), else_=0)),  # noqa: E712
+        )
+        .group_by(per_contract.c.customer_id)
+        .all()
+    )
+    out: Dict[int, Dict[str, Any]] = {}
+    for customer_id, count, contract_total, paid_total, outstanding, tax_pending in rows:
+        out[customer_id] = {
+            "contract_count": count,
+            "contract_total": contract_total or 0.0,
+            "paid_total": paid_total or 0.0,
+            "outstanding_total": outstanding or 0.0,
+            "tax_pending_count": int(tax_pending or 0),
+            "contact_count": 0,
+        }
+    for customer_id, count in contacts.all():
+        out.setdefault(customer_id, {f: 0 for f in FIELDS})["contact_count"] = count
+    return out
+
+
+def recompute(db: Session, customer_ids: Optional[List[int]] = None) -> int:
+    """집계 컬럼을 원본에서 다시 채움 (commit 은 호출자가). 갱신한 고객 수 반환."""
+    computed = compute(db, customer_ids)
+    q = db.query(Customer.id)
+    if customer_ids is not None:
+        q = q.filter(Customer.id.in_(customer_ids))
+    zero = {f: 0 for f in FIELDS}
+    count = 0
+    for (customer_id,) in q.all():
+        values = computed.get(customer_id, zero)
+        db.execute(
+            update(Customer)
+            .where(Customer.id == customer_id)
+            .values(updated_at=Customer.updated_at, **values)
+            .execution_options(synchronize_session=False)
+        )
+        count += 1
+    db.flush()
+    return count
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """(key, 저장값, 재계산값) — 집계 컬럼이 원본과 다른 고객 목록."""
+    computed = compute(db)
+    zero = {f: 0 for f in FIELDS}
+    diffs = []
+    for row in db.query(Customer.id, *[getattr(Customer, f) for f in FIELDS]).all():
+        expected = computed.get(row.id, zero)
+        for f in FIELDS:
+            a, b = getattr(row, f) or 0, expected[f] or 0
+            if abs(a - b) > _TOLERANCE:
+                diffs.append((f"customer:{row.id} {f}", a, b))
+    return diffs
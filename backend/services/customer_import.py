@@ -0,0 +1,330 @@
+"""고객 대량 가져오기 (CSV / XLSX).
+
+파일을 한 행씩 읽어(csv.reader / openpyxl read_only) CustomerInput 으로 검증하고,
+BATCH_SIZE 행마다 INSERT 한 번(executemany)으로 넣는다. 전체가 한 트랜잭션이라
+commit/rollback 은 호출자가 한다. 진행 상황은 배치마다 dict 로 yield.
+"""
+import codecs
+import csv
+import io
+import zipfile
+from types import SimpleNamespace
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from models.customer import Customer, INQUIRY_SOURCES, CONTRACT_STATUSES
+from models.customer_schemas import CustomerInput
+from services import customer_search
+
+BATCH_SIZE = 500
+
+# 응답에 담는 행 오류 최대 개수 (건수는 전부 셈)
+MAX_REPORTED_ERRORS = 1000
+
+# 헤더 → CustomerInput 필드 (한글/영문 모두 지원)
+COLUMN_MAP = {
+    "이름": "name",
+    "고객명": "name",
+    "성함": "name",
+    "name": "name",
+    "회사": "companyName",
+    "회사명": "companyName",
+    "상호": "companyName",
+    "companyname": "companyName",
+    "company": "companyName",
+    "연락처": "phone",
+    "전화번호": "phone",
+    "휴대폰": "phone",
+    "phone": "phone",
+    "이메일": "email",
+    "email": "email",
+    "주소": "address",
+    "address": "address",
+    "담당자": "manager",
+    "manager": "manager",
+    "메모": "memo",
+    "비고": "memo",
+    "문의내용": "memo",
+    "memo": "memo",
+    "문의 경로": "inquirySource",
+    "문의경로": "inquirySource",
+    "유입경로": "inquirySource",
+    "inquirysource": "inquirySource",
+    "계약 상태": "contractStatus",
+    "계약상태": "contractStatus",
+    "상태": "contractStatus",
+    "contractstatus": "contractStatus",
+}
+
+# 화면 표시명 → 코드 (프론트 types/customer.ts 라벨과 동일)
+_SOURCE_LABELS = {
+    "인스타그램": "instagram",
+    "유튜브": "youtube",
+    "블로그": "blog",
+    "네이버 검색": "naver",
+    "네이버": "naver",
+    "지인 추천": "referral",
+    "ai 검색": "ai",
+    "문자 광고": "sms",
+    "외주 사이트": "outsourcing",
+    "홈페이지": "website",
+    "당근": "danggn",
+    "메일 광고": "email",
+    "기타": "other",
+}
+_STATUS_LABELS = {
+    "상담 전": "pre_consultation",
+    "상담 진행 중": "in_consultation",
+    "견적 안내": "estimate_sent",
+    "계약 완료": "contract_signed",
+    "작업 진행": "in_progress",
+    "작업 완료": "completed",
+    "취소": "cancelled",
+}
+
+# 헤더 행을 찾아볼 최대 행 수
+_HEADER_SCAN = 20
+
+# 엑셀에서 흔한 인코딩 — UTF-8(BOM 포함) 이 아니면 CP949 로 읽음
+_SNIFF_BYTES = 64 * 1024
+
+
+# ── 파일 읽기 ──
+
+def _map_headers(
+    cells, column_map: Dict[str, str], required: Tuple[str, ...]
+) -> Tuple[List[Optional[str]], List[str]]:
+    """(열별 필드, 빠진 필수 필드)."""
+    headers = [column_map.get(str(v or "").strip().lower()) for v in cells]
+    return headers, [f for f in required if f not in headers]
+
+
+def _missing_message(column_map: Dict[str, str], missing: List[str]) -> str:
+    # 필드마다 대표 한글 헤더 하나 + 영문 필드명 — '이름' 또는 'name'
+    names = []
+    for field in missing:
+        alias = next((k for k, v in column_map.items() if v == field), field)
+        names.append(f"'{alias}' 또는 '{field}'" if alias != field else f"'{field}'")
+    return ", ".join(names) + " 열이 필요합니다."
+
+
+def _csv_encoding(fileobj: IO[bytes]) -> str:
+    head = fileobj.read(_SNIFF_BYTES)
+    fileobj.seek(0)
+    try:
+        # 잘린 마지막 글자는 무시 (final=False)
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+def _read_csv(fileobj: IO[bytes]) -> Iterator[Tuple[int, List[Any]]]:
+    text = io.TextIOWrapper(fileobj, encoding=_csv_encoding(fileobj), newline="")
+    try:
+        for line_no, row in enumerate(csv.reader(text), start=1):
+            yield line_no, row
+    except csv.Error as e:
+        raise ValueError(f"CSV 형식 오류: {e}")
+    finally:
+        if not fileobj.closed:
+            text.detach()  # 원본 파일 객체는 호출자가 닫음
+
+
+def _read_xlsx(fileobj: IO[bytes]) -> Iterator[Tuple[int, List[Any]]]:
+    try:
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError):
+        raise ValueError("XLSX 파일을 읽을 수 없습니다.")
+    try:
+        for line_no, row in enumerate(wb.active.iter_rows(values_only=True), start=1):
+            yield line_no, list(row)
+    finally:
+        wb.close()
+
+
+def read_rows(
+    filename: str,
+    fileobj: IO[bytes],
+    column_map: Dict[str, str] = COLUMN_MAP,
+    required: Tuple[str, ...] = ("name",),
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(행 번호, {필드: 값}) — 필수 열이 모두 있는 첫 행이 헤더, 빈 행은 건너뜀.
+    은행 내역처럼 위에 계좌 정보 등이 붙은 파일은 _HEADER_SCAN 행 안에서 헤더를 찾음."""
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        rows = _read_xlsx(fileobj)
+    elif name.endswith(".csv"):
+        rows = _read_csv(fileobj)
+    else:
+        raise ValueError("CSV 또는 XLSX 파일만 가져올 수 있습니다.")
+
+    headers = None
+    first_missing = None
+    for line_no, cells in rows:
+        if headers is None:
+            mapped, missing = _map_headers(cells, column_map, required)
+            if missing:
+                if first_missing is None:
+                    first_missing = missing
+                if line_no < _HEADER_SCAN:
+                    continue
+                raise ValueError(_missing_message(column_map, first_missing))
+            headers = mapped
+            continue
+        data = {
+            headers[i]: v
+            for i, v in enumerate(cells)
+            if i < len(headers) and headers[i] and v not in (None, "")
+        }
+        if data:
+            yield line_no, data
+    if headers is None:
+        if first_missing is not None:
+            raise ValueError(_missing_message(column_map, first_missing))
+        raise ValueError("빈 파일입니다.")
+
+
+# ── 검증 ──
+
+def validate(data: Dict[str, Any]) -> CustomerInput:
+    """행 하나를 CustomerInput 으로. 문의 경로/계약 상태는 코드나 화면 표시명 모두 허용."""
+    values = {k: str(v).strip() for k, v in data.items()}
+    source = values.get("inquirySource")
+    if source:
+        values["inquirySource"] = _SOURCE_LABELS.get(source.lower(), source)
+        if values["inquirySource"] not in INQUIRY_SOURCES:
+            raise ValueError(f"잘못된 문의 경로: {source}")
+    status = values.get("contractStatus")
+    if status:
+        values["contractStatus"] = _STATUS_LABELS.get(status, status)
+        if values["contractStatus"] not in CONTRACT_STATUSES:
+            raise ValueError(f"잘못된 계약 상태: {status}")
+    try:
+        return CustomerInput(**values)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        ))
+
+
+def _dedupe_keys(item: CustomerInput, mode: str) -> Set[str]:
+    keys = set()
+    if mode in ("phone", "phone_or_email"):
+        phone = customer_search.digits(item.phone)
+        if phone:
+            keys.add(f"phone:{phone}")
+    if mode in ("email", "phone_or_email"):
+        email = item.email.strip().lower()
+        if email:
+            keys.add(f"email:{email}")
+    return keys
+
+
+def _existing_keys(db: Session, keys: Set[str]) -> Set[str]:
+    """배치의 중복 키 중 이미 DB 에 있는 것 — 키 종류별 IN 조회 한 번씩."""
+    phones = [k[6:] for k in keys if k.startswith("phone:")]
+    emails = [k[6:] for k in keys if k.startswith("email:")]
+    found = set()
+    if phones:
+        found |= {
+            f"phone:{p}"
+            for (p,) in db.query(Customer.phone_digits).filter(Customer.phone_digits.in_(phones))
+        }
+    if emails:
+        found |= {
+            f"email:{e}"
+            for (e,) in db.query(func.lower(Customer.email)).filter(
+                func.lower(Customer.email).in_(emails)
+            )
+        }
+    return found
+
+
+# ── 가져오기 ──
+
+def _row_values(item: CustomerInput) -> Dict[str, Any]:
+    row = SimpleNamespace(
+        name=item.name,
+        company_name=item.companyName,
+        phone=item.phone,
+        email=item.email,
+        address=item.address,
+        manager=item.manager,
+        memo=item.memo,
+        inquiry_source=item.inquirySource,
+        contract_status=item.contractStatus,
+    )
+    customer_search.normalize_fields(row)
+    return {**vars(row), **customer_search.keys(row)}
+
+
+def _insert(db: Session, batch: List[Dict[str, Any]]) -> List[int]:
+    result = db.execute(
+        insert(Customer).returning(Customer.id, sort_by_parameter_order=True), batch
+    )
+    return [r[0] for r in result]
+
+
+def run(
+    db: Session,
+    rows: Iterator[Tuple[int, Dict[str, Any]]],
+    dedupe: str = "none",
+) -> Iterator[Dict[str, Any]]:
+    """배치마다 진행 상황을, 마지막에 {"done": True, ...} 요약을 yield.
+    새 고객 id 는 summary["ids"] 로 (파생 데이터 반영은 호출자가 write_hooks.customers_imported)."""
+    summary: Dict[str, Any] = {
+        "done": False,
+        "processed": 0,
+        "inserted": 0,
+        "skipped": 0,
+        "failed": 0,
+        "errors": [],
+        "ids": [],
+    }
+    seen: Set[str] = set()
+    batch: List[Dict[str, Any]] = []
+    batch_keys: List[Set[str]] = []
+
+    def flush():
+        if dedupe != "none":
+            existing = _existing_keys(db, set().union(*batch_keys))
+            kept = [(v, k) for v, k in zip(batch, batch_keys) if not (k & existing)]
+            summary["skipped"] += len(batch) - len(kept)
+            values = [v for v, _ in kept]
+        else:
+            values = batch
+        if values:
+            summary["ids"].extend(_insert(db, values))
+            summary["inserted"] += len(values)
+        batch.clear()
+        batch_keys.clear()
+
+    for line_no, data in rows:
+        summary["processed"] += 1
+        try:
+            item = validate(data)
+        except ValueError as e:
+            summary["failed"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append({"row": line_no, "message": str(e)})
+            continue
+        keys = _dedupe_keys(item, dedupe) if dedupe != "none" else set()
+        if keys & seen:
+            # 같은 파일 안의 중복
+            summary["skipped"] += 1
+            continue
+        seen |= keys
+        batch.append(_row_values(item))
+        batch_keys.append(keys)
+        if len(batch) >= BATCH_SIZE:
+            flush()
+            yield {k: v for k, v in summary.items() if k not in ("errors", "ids")}
+    flush()
+    summary["done"] = True
+    yield summary
@@ -0,0 +1,334 @@
+"""고객 검색 (customer_search_grams 역색인).
+
+이름/회사/연락처/이메일을 소문자·NFC 로 정규화한 뒤 1글자·2글자 조각(n-gram)으로 나눠 저장한다.
+검색어의 조각을 모두 가진 고객만 인덱스에서 골라낸 뒤 ILIKE 로 확인하므로
+'%x%' 로 테이블 전체를 훑지 않고, 한글 음절 단위·단어 일부 검색도 그대로 된다.
+고객 생성/수정 때 services/write_hooks.py 에서 같은 트랜잭션 안에서 다시 색인한다.
+(고객 삭제 시에는 FK ON DELETE CASCADE 로 함께 지워짐)
+
+자동완성은 customers 의 검색 키 컬럼(소문자 이름, 초성, 숫자만 남긴 연락처와 그 역순)에 대한
+앞부분 일치 범위 조회 한 번으로 끝난다. "ㄱㅁㅅ" → 김민수, "5678" → 010-1234-5678.
+"""
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, func, insert, or_, update
+from sqlalchemy.orm import Session
+
+from models.customer import Customer, CustomerSearchGram
+
+SEARCH_FIELDS = ("name", "company_name", "phone", "email")
+
+# 필드별 가중치 — 이름 일치가 가장 앞에 오도록
+_FIELD_WEIGHTS = {"name": 10, "company_name": 4, "phone": 2, "email": 1}
+
+# LIKE 패턴 이스케이프 문자 (검색어의 %, _ 를 글자 그대로 찾도록)
+LIKE_ESCAPE = "\\"
+
+
+def normalize(text: Optional[str]) -> str:
+    # macOS 등에서 들어오는 자모 분리형(NFD) 한글도 같은 조각이 되도록 NFC 로
+    return unicodedata.normalize("NFC", text or "").lower()
+
+
+def grams(text: Optional[str]) -> Set[str]:
+    t = normalize(text)
+    out = set(t)
+    out.update(t[i:i + 2] for i in range(len(t) - 1))
+    return out
+
+
+def customer_grams(c) -> Set[str]:
+    out: Set[str] = set()
+    for field in SEARCH_FIELDS:
+        out |= grams(getattr(c, field))
+    return out
+
+
+def query_grams(q: str) -> Set[str]:
+    t = normalize(q)
+    if len(t) == 1:
+        return {t}
+    return {t[i:i + 2] for i in range(len(t) - 1)}
+
+
+def escape_like(text: str) -> str:
+    """LIKE 패턴에 넣을 검색어 — 와일드카드(%, _)와 이스케이프 문자를 글자로 취급. escape=LIKE_ESCAPE 와 함께 사용."""
+    return (
+        text.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def text_changed(before, after) -> bool:
+    return any(getattr(before, f) != getattr(after, f) for f in SEARCH_FIELDS)
+
+
+# ── 검색 키 (초성 / 연락처 숫자) ──
+
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+_SYLLABLES_PER_CHOSUNG = 21 * 28
+
+# 범위 조회 상한용 (앞부분 일치: prefix <= col < prefix + _MAX_CHAR)
+_MAX_CHAR = "\U0010ffff"
+
+
+def chosung(text: Optional[str]) -> str:
+    """한글 음절은 초성으로, 나머지는 소문자 그대로. 공백은 제거."""
+    out = []
+    for ch in normalize(text):
+        code = ord(ch)
+        if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+            out.append(_CHOSUNG[(code - _HANGUL_FIRST) // _SYLLABLES_PER_CHOSUNG])
+        elif not ch.isspace():
+            out.append(ch)
+    return "".join(out)
+
+
+def digits(text: Optional[str]) -> str:
+    return "".join(ch for ch in (text or "") if ch.isdigit())
+
+
+def keys(c) -> Dict[str, str]:
+    phone = digits(c.phone)
+    return {
+        "name_key": normalize(c.name).strip(),
+        "name_chosung": chosung(c.name),
+        "company_chosung": chosung(c.company_name),
+        "phone_digits": phone,
+        "phone_digits_rev": phone[::-1],
+    }
+
+
+def normalize_fields(c) -> None:
+    """검색 대상 필드를 NFC 로 — 자모 분리형(NFD)으로 저장되면 색인(NFC)은 맞아도
+    ILIKE 확인/점수 계산에서 빠지므로 쓰기 때 원본 컬럼도 맞춤 (대소문자는 그대로)."""
+    for field in SEARCH_FIELDS:
+        value = getattr(c, field)
+        if value and not unicodedata.is_normalized("NFC", value):
+            setattr(c, field, unicodedata.normalize("NFC", value))
+
+
+def set_keys(c: Customer) -> None:
+    """검색 키 컬럼을 현재 이름/회사/연락처에 맞춤 (값이 같으면 UPDATE 안 나감)."""
+    for column, value in keys(c).items():
+        setattr(c, column, value)
+
+
+# ── 색인 ──
+
+def reindex(db: Session, customer: Customer) -> None:
+    db.query(CustomerSearchGram).filter(
+        CustomerSearchGram.customer_id == customer.id
+    ).delete(synchronize_session=False)
+    db.add_all(
+        CustomerSearchGram(gram=g, customer_id=customer.id) for g in customer_grams(customer)
+    )
+
+
+def index_many(db: Session, customers) -> None:
+    """새로 넣은 고객들 색인 (대량 가져오기) — INSERT 한 번(executemany)."""
+    rows = [{"gram": g, "customer_id": c.id} for c in customers for g in customer_grams(c)]
+    if rows:
+        db.execute(insert(CustomerSearchGram), rows)
+
+
+def rebuild(db: Session) -> int:
+    """색인과 검색 키를 처음부터 다시 만듦 (commit 은 호출자가). 저장한 조각 수 반환."""
+    db.query(CustomerSearchGram).delete(synchronize_session=False)
+    count = 0
+    for c in db.query(Customer.id, *[getattr(Customer, f) for f in SEARCH_FIELDS]).all():
+        rows = [CustomerSearchGram(gram=g, customer_id=c.id) for g in customer_grams(c)]
+        db.add_all(rows)
+        count += len(rows)
+    db.flush()
+    rebuild_keys(db)
+    return count
+
+
+def rebuild_keys(db: Session) -> int:
+    """검색 키 컬럼만 다시 채움. 갱신한 고객 수 반환."""
+    count = 0
+    for c in db.query(Customer.id, *[getattr(Customer, f) for f in SEARCH_FIELDS]).all():
+        # 검색 키 변경은 고객 정보 수정이 아니므로 updated_at(onupdate) 은 그대로 둠
+        db.execute(
+            update(Customer)
+            .where(Customer.id == c.id)
+            .values(updated_at=Customer.updated_at, **keys(c))
+            .execution_options(synchronize_session=False)
+        )
+        count += 1
+    db.flush()
+    return count
+
+
+def _unnormalized(db: Session) -> List:
+    return [
+        c for c in db.query(Customer.id, *[getattr(Customer, f) for f in SEARCH_FIELDS])
+        if any(v and not unicodedata.is_normalized("NFC", v) for v in c[1:])
+    ]
+
+
+def has_unnormalized(db: Session) -> bool:
+    """NFC 가 아닌 검색 필드가 남아 있는지 (쓰기 때 정규화 이전에 저장된 고객)."""
+    return bool(_unnormalized(db))
+
+
+def normalize_stored(db: Session) -> int:
+    """NFC 가 아닌 검색 필드를 NFC 로 고침 (commit 은 호출자가). 고친 고객 수 반환.
+    색인/검색 키는 원래 정규화한 값으로 만들므로 그대로."""
+    rows = _unnormalized(db)
+    for c in rows:
+        db.execute(
+            update(Customer)
+            .where(Customer.id == c.id)
+            .values(
+                updated_at=Customer.updated_at,
+                **{f: unicodedata.normalize("NFC", getattr(c, f) or "") for f in SEARCH_FIELDS},
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.flush()
+    return len(rows)
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """(key, 저장 조각 수, 기대 조각 수) — 색인이 원본과 다른 고객 목록 (NFC 가 아닌 검색 필드 포함)."""
+    stored: Dict[int, Set[str]] = {}
+    for gram, customer_id in db.query(CustomerSearchGram.gram, CustomerSearchGram.customer_id):
+        stored.setdefault(customer_id, set()).add(gram)
+    diffs = []
+    for c in db.query(Customer.id, *[getattr(Customer, f) for f in SEARCH_FIELDS]):
+        expected = customer_grams(c)
+        have = stored.pop(c.id, set())
+        if have != expected:
+            diffs.append((f"search:{c.id}", len(have), len(expected)))
+    diffs.extend((f"search:{cid}", len(g), 0) for cid, g in stored.items())
+    for c in db.query(Customer):
+        for column, value in keys(c).items():
+            if getattr(c, column) != value:
+                diffs.append((f"search:{c.id} {column}", 0, 1))
+    diffs.extend((f"search:{c.id} nfc", 0, 1) for c in _unnormalized(db))
+    return diffs
+
+
+# ── 조회 ──
+
+def match(db: Session, q: str):
+    """검색 조건 — 색인에서 조각을 모두 가진 고객으로 좁힌 뒤 ILIKE 로 확인.
+    (검색 필드는 쓰기 때 NFC 로 저장되므로 원본 컬럼에 바로 비교)"""
+    needed = query_grams(q)
+    candidates = (
+        db.query(CustomerSearchGram.customer_id)
+        .filter(CustomerSearchGram.gram.in_(needed))
+        .group_by(CustomerSearchGram.customer_id)
+        .having(func.count() == len(needed))
+        .scalar_subquery()
+    )
+    like = f"%{escape_like(normalize(q))}%"
+    return and_(
+        Customer.id.in_(candidates),
+        or_(*[getattr(Customer, f).ilike(like, escape=LIKE_ESCAPE) for f in SEARCH_FIELDS]),
+    )
+
+
+def score(q: str):
+    """관련도 점수 식 — rank() 와 같은 가중치를 SQL 로 계산해 LIMIT 전에 정렬."""
+    needle = normalize(q)
+    pattern = escape_like(needle)
+    total = None
+    for field in SEARCH_FIELDS:
+        text = func.lower(func.coalesce(getattr(Customer, field), ""))
+        weight = _FIELD_WEIGHTS[field]
+        term = case(
+            (text == needle, weight * 3),
+            (text.like(f"{pattern}%", escape=LIKE_ESCAPE), weight * 2),
+            (text.like(f"%{pattern}%", escape=LIKE_ESCAPE), weight),
+            else_=0,
+        )
+        total = term if total is None else total + term
+    return total
+
+
+def rank(c: Customer, q: str) -> Tuple[float, List[Dict]]:
+    """(점수, 강조 구간 목록). 필드별로 완전 일치 > 앞부분 일치 > 포함 순으로 가중치를 곱함."""
+    needle = normalize(q)
+    score = 0.0
+    highlights = []
+    for field in SEARCH_FIELDS:
+        text = normalize(getattr(c, field))
+        pos = text.find(needle)
+        if pos < 0:
+            continue
+        if text == needle:
+            score += _FIELD_WEIGHTS[field] * 3
+        elif pos == 0:
+            score += _FIELD_WEIGHTS[field] * 2
+        else:
+            score += _FIELD_WEIGHTS[field]
+        highlights.append({"field": field, "start": pos, "length": len(needle)})
+    return score, highlights
+
+
+def search(db: Session, q: str, limit: int) -> List[Tuple[Customer, float, List[Dict]]]:
+    """점수순 상위 limit 명. 동점은 최근 수정순. 순위는 DB 에서 매기고 강조 구간만 rank() 로."""
+    if not normalize(q):
+        return []
+    relevance = score(q).label("score")
+    rows = (
+        db.query(Customer, relevance)
+        .filter(match(db, q))
+        .order_by(relevance.desc(), Customer.updated_at.desc(), Customer.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [(c, float(points), rank(c, q)[1]) for c, points in rows]
+
+
+def _prefix(column, prefix: str):
+    # LIKE 'x%' 는 DB/콜레이션에 따라 인덱스를 못 타므로 범위 조건으로
+    # (검색 키 컬럼은 PostgreSQL 에서도 "C" 콜레이션이라 코드포인트 순서로 비교/정렬)
+    return and_(column >= prefix, column < prefix + _MAX_CHAR)
+
+
+def autocomplete(db: Session, q: str, limit: int) -> List[Customer]:
+    """앞부분 일치 자동완성 — 입력 형태에 맞는 검색 키 인덱스 하나만 조회.
+
+    - 한글 자음이 섞이면 초성 비교 ("ㄱㅁㅅ", "김ㅁ" → 이름 초성, 모자라면 회사명 초성으로 채움)
+    - 숫자/하이픈만이면 연락처: 0 으로 시작하면 앞자리, 아니면 뒷자리
+    - 그 외는 이름 앞부분 (소문자·NFC 이름 키)
+    """
+    text = normalize(q).strip()
+    if not text:
+        return []
+    if any(ch in _CHOSUNG for ch in text):
+        column, prefix = Customer.name_chosung, chosung(text)
+    elif all(ch.isdigit() or ch in "- " for ch in text):
+        number = digits(text)
+        if not number:
+            return []
+        if number.startswith("0"):
+            column, prefix = Customer.phone_digits, number
+        else:
+            column, prefix = Customer.phone_digits_rev, number[::-1]
+    else:
+        column, prefix = Customer.name_key, text
+    rows = (
+        db.query(Customer)
+        .filter(_prefix(column, prefix))
+        .order_by(column)
+        .limit(limit)
+        .all()
+    )
+    if column is Customer.name_chosung and len(rows) < limit:
+        seen = [r.id for r in rows]
+        rows += (
+            db.query(Customer)
+            .filter(_prefix(Customer.company_chosung, prefix), Customer.id.notin_(seen))
+            .order_by(Customer.company_chosung)
+            .limit(limit - len(rows))
+            .all()
+        )
+    return rows
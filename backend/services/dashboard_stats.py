@@ -0,0 +1,171 @@
+"""대시보드 통계 스냅샷 (dashboard_stats 테이블).
+
+고객/계약/입금이 바뀔 때 "변경 전 기여분을 빼고 변경 후 기여분을 더하는" 방식으로
+쓰기와 같은 트랜잭션 안에서 갱신한다 (호출은 services/write_hooks.py 에서).
+rebuild() 는 원본 테이블에서 처음부터 다시 계산하고, check() 는 둘을 비교한다.
+
+키 형식:
+    total_customers, total_revenue, total_outstanding
+    customers_by_status:<상태>, customers_by_source:<경로>, contracts_by_state:<상태>
+    new_customers:<YYYY-MM>
+(월별 매출은 revenue_by_month 롤업 — services/revenue_rollup.py)
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.customer import Customer
+from models.contract import Contract, Payment
+from models.dashboard import DashboardStat
+from services.counters import increment
+
+Delta = Dict[str, float]
+
+# 부동소수 누적 오차는 무시 (금액 단위: 원)
+_TOLERANCE = 0.01
+
+
+def month_key(dt: datetime) -> str:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m")
+
+
+# ── 행 단위 기여분 (ORM 객체, snapshot, 컬럼 Row 모두 허용) ──
+
+def customer_delta(c, sign: int = 1) -> Delta:
+    d: Delta = {
+        "total_customers": sign,
+        f"customers_by_status:{c.contract_status}": sign,
+        f"customers_by_source:{c.inquiry_source}": sign,
+    }
+    if c.created_at:
+        d[f"new_customers:{month_key(c.created_at)}"] = sign
+    return d
+
+
+def contract_delta(c, paid: float, sign: int = 1) -> Delta:
+    d: Delta = {f"contracts_by_state:{c.state}": sign}
+    # 미수금은 활성 계약만, 계약별 음수는 0 처리
+    if c.state == "active":
+        d["total_outstanding"] = sign * max(0, (c.contract_amount or 0) - (paid or 0))
+    return d
+
+
+def payment_delta(p, sign: int = 1) -> Delta:
+    return {"total_revenue": sign * (p.amount or 0)}
+
+
+def merge(deltas: Iterable[Delta]) -> Delta:
+    out: Delta = {}
+    for d in deltas:
+        for key, value in d.items():
+            out[key] = out.get(key, 0) + value
+    return {k: v for k, v in out.items() if v}
+
+
+def apply(db: Session, deltas: Iterable[Delta]) -> None:
+    for key, value in merge(deltas).items():
+        increment(db, DashboardStat, {"key": key}, {"value": value})
+
+
+# ── 조회 헬퍼 ──
+
+def _contract_rows(db: Session, customer_ids: List[int] = None):
+    """(state, contract_amount, paid) — 계약별 입금 합계를 한 번의 집계 조인으로."""
+    paid = (
+        db.query(Payment.contract_id, func.sum(Payment.amount).label("paid"))
+        .group_by(Payment.contract_id)
+        .subquery()
+    )
+    q = db.query(
+        Contract.state,
+        Contract.contract_amount,
+        func.coalesce(paid.c.paid, 0).label("paid"),
+    ).outerjoin(paid, paid.c.contract_id == Contract.id)
+    if customer_ids is not None:
+        q = q.filter(Contract.customer_id.in_(customer_ids))
+    return q.all()
+
+
+def customers_removal_delta(db: Session, customer_ids: List[int]) -> Delta:
+    """고객 삭제 시 빠지는 고객/계약 기여분 (DB cascade 로 함께 지워지는 계약 포함).
+    딸린 입금 기여분은 호출자가 payment_delta 로 따로 더함."""
+    deltas: List[Delta] = []
+    customers = (
+        db.query(Customer.contract_status, Customer.inquiry_source, Customer.created_at)
+        .filter(Customer.id.in_(customer_ids))
+        .all()
+    )
+    deltas.extend(customer_delta(c, -1) for c in customers)
+    deltas.extend(contract_delta(c, c.paid, -1) for c in _contract_rows(db, customer_ids))
+    return merge(deltas)
+
+
+def customers_change_delta(
+    db: Session,
+    customer_ids: List[int],
+    contract_status: Optional[str] = None,
+    inquiry_source: Optional[str] = None,
+) -> Delta:
+    """여러 고객의 계약 상태/문의 경로를 한꺼번에 바꿀 때의 기여분 — (상태, 경로) 별 건수 집계로."""
+    deltas: List[Delta] = []
+    groups = (
+        db.query(Customer.contract_status, Customer.inquiry_source, func.count())
+        .filter(Customer.id.in_(customer_ids))
+        .group_by(Customer.contract_status, Customer.inquiry_source)
+        .all()
+    )
+    for status, source, count in groups:
+        if contract_status is not None:
+            deltas.append({
+                f"customers_by_status:{status}": -count,
+                f"customers_by_status:{contract_status}": count,
+            })
+        if inquiry_source is not None:
+            deltas.append({
+                f"customers_by_source:{source}": -count,
+                f"customers_by_source:{inquiry_source}": count,
+            })
+    return merge(deltas)
+
+
+# ── 스냅샷 읽기 / 재계산 / 검증 ──
+
+def read(db: Session) -> Dict[str, float]:
+    return dict(db.query(DashboardStat.key, DashboardStat.value).all())
+
+
+def compute(db: Session) -> Dict[str, float]:
+    """원본 테이블에서 스냅샷을 처음부터 계산."""
+    deltas: List[Delta] = []
+    customers = db.query(
+        Customer.contract_status, Customer.inquiry_source, Customer.created_at
+    ).all()
+    deltas.extend(customer_delta(c) for c in customers)
+    deltas.extend(contract_delta(c, c.paid) for c in _contract_rows(db))
+    deltas.extend(payment_delta(p) for p in db.query(Payment.amount).all())
+    return merge(deltas)
+
+
+def rebuild(db: Session) -> int:
+    """스냅샷을 재계산해서 통째로 교체 (commit 은 호출자가). 저장한 key 수 반환."""
+    snapshot = compute(db)
+    db.query(DashboardStat).delete(synchronize_session=False)
+    db.add_all(DashboardStat(key=k, value=v) for k, v in snapshot.items())
+    db.flush()
+    return len(snapshot)
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """저장된 스냅샷과 재계산 값이 다른 key 목록: (key, 저장값, 재계산값)."""
+    stored = read(db)
+    expected = compute(db)
+    diffs = []
+    for key in sorted(set(stored) | set(expected)):
+        a, b = stored.get(key, 0), expected.get(key, 0)
+        if abs(a - b) > _TOLERANCE:
+            diffs.append((key, a, b))
+    return diffs
@@ -0,0 +1,129 @@
+"""담당자 자동완성 (handlers 테이블 + 프로세스 내 정렬 색인).
+
+컨택/입금이 쓰일 때 services/write_hooks.py 에서 담당자별 사용 횟수를 UPSERT 로 더하고
+캐시 세대(response_cache.HANDLERS)를 올린다. 조회는 세대가 바뀌었을 때만 테이블을 다시 읽어
+이름순 목록을 만들고, prefix 는 bisect 로 범위만 잘라 사용 횟수순으로 돌려준다.
+세대 번호는 ETag 로도 쓰여 바뀐 게 없으면 304.
+"""
+import bisect
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.contract import Payment
+from models.customer import Contact
+from models.handler import Handler
+from services import response_cache
+from services.counters import increment
+
+_MAX_CHAR = "\U0010ffff"
+
+# (세대, 이름순 [(이름, 사용 횟수)], 이름 목록)
+_snapshot: Tuple[int, List[Tuple[str, int]], List[str]] = (-1, [], [])
+_lock = threading.Lock()
+
+
+def normalize(name: Optional[str]) -> str:
+    return " ".join((name or "").split())
+
+
+# ── 갱신 ──
+
+def apply(db: Session, column: str, names: Iterable[Optional[str]], sign: int = 1) -> None:
+    """names 의 사용 횟수를 column(contact_count / payment_count) 에 더함 (sign=-1 이면 뺌)."""
+    counts = Counter(n for n in map(normalize, names) if n)
+    for name, count in counts.items():
+        increment(db, Handler, {"name": name}, {column: sign * count})
+    if counts:
+        response_cache.bump(db, response_cache.HANDLERS)
+
+
+def changed(db: Session, column: str, before, after) -> None:
+    """행 하나의 담당자 변경 반영 (before=None 은 생성, after=None 은 삭제)."""
+    old = normalize(before.handler) if before is not None else ""
+    new = normalize(after.handler) if after is not None else ""
+    if old != new:
+        apply(db, column, [old], -1)
+        apply(db, column, [new], +1)
+
+
+# ── 재계산 / 검증 ──
+
+def compute(db: Session) -> Dict[str, Dict[str, int]]:
+    out: Dict[str, Dict[str, int]] = {}
+    for model, column in ((Contact, "contact_count"), (Payment, "payment_count")):
+        rows = db.query(model.handler, func.count()).group_by(model.handler).all()
+        for raw, count in rows:
+            name = normalize(raw)
+            if name:
+                acc = out.setdefault(name, {"contact_count": 0, "payment_count": 0})
+                acc[column] += count
+    return out
+
+
+def rebuild(db: Session) -> int:
+    """handlers 테이블을 원본에서 다시 채움 (commit 은 호출자가). 담당자 수 반환."""
+    db.query(Handler).delete(synchronize_session=False)
+    computed = compute(db)
+    db.add_all(Handler(name=name, **counts) for name, counts in computed.items())
+    response_cache.bump(db, response_cache.HANDLERS)
+    db.flush()
+    return len(computed)
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """(key, 저장값, 재계산값) — 사용 횟수가 원본과 다른 담당자."""
+    computed = compute(db)
+    zero = {"contact_count": 0, "payment_count": 0}
+    stored = {
+        r.name: {"contact_count": r.contact_count, "payment_count": r.payment_count}
+        for r in db.query(Handler)
+    }
+    diffs = []
+    for name in sorted(set(stored) | set(computed)):
+        a, b = stored.get(name, zero), computed.get(name, zero)
+        for column in ("contact_count", "payment_count"):
+            if (a[column] or 0) != b[column]:
+                diffs.append((f"handler:{name} {column}", a[column] or 0, b[column]))
+    return diffs
+
+
+# ── 조회 ──
+
+def _load(db: Session) -> Tuple[int, List[Tuple[str, int]], List[str]]:
+    """현재 세대의 정렬 색인 — 세대가 바뀐 경우에만 테이블을 다시 읽음."""
+    global _snapshot
+    gen = response_cache.generation(db, response_cache.HANDLERS)
+    with _lock:
+        if _snapshot[0] == gen:
+            return _snapshot
+    rows = (
+        db.query(Handler.name, Handler.contact_count + Handler.payment_count)
+        .filter(Handler.contact_count + Handler.payment_count > 0)
+        .all()
+    )
+    # bisect 는 파이썬 문자열(코드포인트) 순서를 전제로 하므로 DB 콜레이션 대신 여기서 정렬
+    entries = sorted((name, count) for name, count in rows)
+    snapshot = (gen, entries, [name for name, _ in entries])
+    with _lock:
+        _snapshot = snapshot
+    return snapshot
+
+
+def suggest(db: Session, prefix: str = "", limit: Optional[int] = None) -> Tuple[int, List[str]]:
+    """(세대, prefix 로 시작하는 담당자 — 사용 횟수 많은 순, 같으면 이름순)."""
+    gen, entries, names = _load(db)
+    # 입력 중인 값이라 끝 공백은 유지 ("이 " → "이 아연")
+    prefix = re.sub(r"\s+", " ", (prefix or "").lstrip())
+    if prefix:
+        lo = bisect.bisect_left(names, prefix)
+        hi = bisect.bisect_left(names, prefix + _MAX_CHAR, lo)
+        entries = entries[lo:hi]
+    ranked = sorted(entries, key=lambda e: (-e[1], e[0]))
+    if limit is not None:
+        ranked = ranked[:limit]
+    return gen, [name for name, _ in ranked]
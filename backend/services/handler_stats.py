@@ -0,0 +1,274 @@
+"""담당자별 월간 활동 통계 (handler_monthly_stats 테이블).
+
+고객 한 명의 컨택 이력을 시간순으로 놓고 담당자 × 월 칸에 다음을 더한다.
+    - 컨택 수
+    - 리드: 고객의 첫 컨택 → 그 컨택의 담당자·월에 1
+    - 전환: 그 고객의 계약 상태가 계약 완료 이후(contract_signed/in_progress/completed)면 같은 칸에 1
+    - 컨택 간격: 직전 컨택과의 간격(일) 합계와 횟수 → 뒤 컨택의 담당자·월에
+컨택/고객 상태가 바뀌면 services/write_hooks.py 에서 그 고객의 변경 전/후 기여분 차이만 UPSERT 하므로
+조회 때 컨택 테이블을 훑지 않는다. 입금 건수/금액은 월별 매출 롤업(revenue_by_month)에서 읽는다.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.customer import Contact, Customer
+from models.dashboard import RevenueByMonth
+from models.handler import HandlerMonthlyStat
+from services.counters import increment
+from services.dashboard_stats import month_key
+from services.handler_index import normalize
+
+CONVERTED_STATUSES = ("contract_signed", "in_progress", "completed")
+
+FIELDS = ("contact_count", "lead_count", "converted_count", "gap_days", "gap_count")
+
+# (담당자, YYYY-MM) → {필드: 값}
+Stats = Dict[Tuple[str, str], Dict[str, float]]
+
+_TOLERANCE = 0.01
+
+
+def converted(status: Optional[str]) -> bool:
+    return status in CONVERTED_STATUSES
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+def _cell(out: Stats, contact) -> Dict[str, float]:
+    key = (normalize(contact.handler), month_key(contact.contacted_at))
+    return out.setdefault(key, dict.fromkeys(FIELDS, 0))
+
+
+def _collect(out: Stats, contacts: Iterable, status: Optional[str], sign: int = 1) -> None:
+    """고객 한 명의 컨택들(ORM 객체, snapshot, 컬럼 Row)의 기여분을 out 에 더함."""
+    rows = sorted(
+        (c for c in contacts if c.contacted_at),
+        key=lambda c: (_naive_utc(c.contacted_at), c.id or 0),
+    )
+    prev = None
+    for c in rows:
+        acc = _cell(out, c)
+        acc["contact_count"] += sign
+        if prev is None:
+            acc["lead_count"] += sign
+            if converted(status):
+                acc["converted_count"] += sign
+        else:
+            gap = _naive_utc(c.contacted_at) - _naive_utc(prev.contacted_at)
+            acc["gap_days"] += sign * gap.total_seconds() / 86400
+            acc["gap_count"] += sign
+        prev = c
+
+
+def _contacts(db: Session, customer_ids: List[int]) -> Dict[int, list]:
+    out: Dict[int, list] = defaultdict(list)
+    for i in range(0, len(customer_ids), 500):
+        rows = (
+            db.query(Contact.id, Contact.customer_id, Contact.handler, Contact.contacted_at)
+            .filter(Contact.customer_id.in_(customer_ids[i:i + 500]))
+            .all()
+        )
+        for r in rows:
+            out[r.customer_id].append(r)
+    return out
+
+
+def _statuses(db: Session, customer_ids: List[int]) -> Dict[int, str]:
+    out: Dict[int, str] = {}
+    for i in range(0, len(customer_ids), 500):
+        out.update(
+            db.query(Customer.id, Customer.contract_status)
+            .filter(Customer.id.in_(customer_ids[i:i + 500]))
+            .all()
+        )
+    return out
+
+
+def _apply(db: Session, stats: Stats) -> None:
+    for (handler, month), deltas in stats.items():
+        # 같은 값을 빼고 더한 부동소수 잔차는 버림
+        deltas = {k: round(v, 6) for k, v in deltas.items()}
+        increment(db, HandlerMonthlyStat, {"handler": handler, "month": month}, deltas)
+
+
+# ── 갱신 ──
+
+def contact_changed(db: Session, customer_id: int, before, after) -> None:
+    """컨택 하나의 생성/수정/삭제 반영 (flush 후 호출, before=None 은 생성, after=None 은 삭제).
+    변경 전 이력은 현재 이력에서 after 를 빼고 before 를 넣어 재구성."""
+    if (
+        before is not None
+        and after is not None
+        and normalize(before.handler) == normalize(after.handler)
+        and before.contacted_at == after.contacted_at
+    ):
+        return
+    current = _contacts(db, [customer_id])[customer_id]
+    changed_id = after.id if after is not None else before.id
+    previous = [c for c in current if c.id != changed_id]
+    if before is not None:
+        previous.append(before)
+    status = _statuses(db, [customer_id]).get(customer_id)
+    stats: Stats = {}
+    _collect(stats, previous, status, -1)
+    _collect(stats, current, status, +1)
+    _apply(db, stats)
+
+
+def customers_changed(db: Session, customer_ids: List[int], sign: int = 1) -> None:
+    """고객들의 컨택 이력 전체 기여분을 더함 (sign=-1 이면 뺌) — 삭제/병합용."""
+    if not customer_ids:
+        return
+    contacts = _contacts(db, customer_ids)
+    statuses = _statuses(db, list(contacts))
+    stats: Stats = {}
+    for customer_id, rows in contacts.items():
+        _collect(stats, rows, statuses.get(customer_id), sign)
+    _apply(db, stats)
+
+
+def conversions_changed(db: Session, customer_ids: List[int], now_converted: bool) -> None:
+    """계약 전환 여부가 바뀌는 고객들 — 첫 컨택 칸의 전환 수만 ±1."""
+    if not customer_ids:
+        return
+    sign = 1 if now_converted else -1
+    stats: Stats = {}
+    for rows in _contacts(db, customer_ids).values():
+        first = min(
+            (c for c in rows if c.contacted_at),
+            key=lambda c: (_naive_utc(c.contacted_at), c.id),
+            default=None,
+        )
+        if first is not None:
+            _cell(stats, first)["converted_count"] += sign
+    _apply(db, stats)
+
+
+def status_changing(db: Session, customer_ids: List[int], status: str) -> None:
+    """여러 고객의 계약 상태 일괄 UPDATE 직전에 호출 — 전환 여부가 실제로 바뀌는 고객만 반영."""
+    flipping = [
+        customer_id
+        for customer_id, current in _statuses(db, customer_ids).items()
+        if converted(current) != converted(status)
+    ]
+    conversions_changed(db, flipping, converted(status))
+
+
+# ── 재계산 / 검증 ──
+
+def compute(db: Session) -> Stats:
+    statuses = dict(db.query(Customer.id, Customer.contract_status).all())
+    contacts: Dict[int, list] = defaultdict(list)
+    for r in db.query(Contact.id, Contact.customer_id, Contact.handler, Contact.contacted_at):
+        contacts[r.customer_id].append(r)
+    stats: Stats = {}
+    for customer_id, rows in contacts.items():
+        _collect(stats, rows, statuses.get(customer_id))
+    return stats
+
+
+def rebuild(db: Session) -> int:
+    """handler_monthly_stats 를 원본에서 다시 채움 (commit 은 호출자가). 행 수 반환."""
+    db.query(HandlerMonthlyStat).delete(synchronize_session=False)
+    computed = compute(db)
+    db.add_all(
+        HandlerMonthlyStat(handler=handler, month=month, **values)
+        for (handler, month), values in computed.items()
+    )
+    db.flush()
+    return len(computed)
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """(key, 저장값, 재계산값) — 원본과 다른 담당자 × 월 카운터."""
+    computed = compute(db)
+    zero = dict.fromkeys(FIELDS, 0)
+    stored = {
+        (r.handler, r.month): {f: getattr(r, f) or 0 for f in FIELDS}
+        for r in db.query(HandlerMonthlyStat)
+    }
+    diffs = []
+    for key in sorted(set(stored) | set(computed)):
+        a, b = stored.get(key, zero), computed.get(key, zero)
+        for field in FIELDS:
+            if abs(a[field] - b[field]) > _TOLERANCE:
+                diffs.append((f"handler_monthly_stats:{'/'.join(key)} {field}", a[field], b[field]))
+    return diffs
+
+
+# ── 조회 ──
+
+def summary(
+    db: Session, from_month: Optional[str] = None, to_month: Optional[str] = None
+) -> List[dict]:
+    """담당자별 기간 합계 — 컨택 카운터와 월별 매출 롤업을 월 범위로 합산. 입금액 많은 순."""
+    criteria = []
+    rollup_criteria = []
+    if from_month:
+        criteria.append(HandlerMonthlyStat.month >= from_month)
+        rollup_criteria.append(RevenueByMonth.month >= from_month)
+    if to_month:
+        criteria.append(HandlerMonthlyStat.month <= to_month)
+        rollup_criteria.append(RevenueByMonth.month <= to_month)
+
+    acc: Dict[str, Dict[str, float]] = {}
+
+    def row(handler: str) -> Dict[str, float]:
+        return acc.setdefault(
+            normalize(handler), dict(dict.fromkeys(FIELDS, 0), payment_count=0, payment_amount=0.0)
+        )
+
+    contact_rows = (
+        db.query(
+            HandlerMonthlyStat.handler,
+            *(func.sum(getattr(HandlerMonthlyStat, f)) for f in FIELDS),
+        )
+        .filter(*criteria)
+        .group_by(HandlerMonthlyStat.handler)
+        .all()
+    )
+    for handler, *values in contact_rows:
+        item = row(handler)
+        for field, value in zip(FIELDS, values):
+            item[field] += value or 0
+    payment_rows = (
+        db.query(
+            RevenueByMonth.handler,
+            func.sum(RevenueByMonth.payment_count),
+            func.sum(RevenueByMonth.amount),
+        )
+        .filter(*rollup_criteria)
+        .group_by(RevenueByMonth.handler)
+        .all()
+    )
+    for handler, count, amount in payment_rows:
+        item = row(handler)
+        item["payment_count"] += count or 0
+        item["payment_amount"] += amount or 0
+
+    out = []
+    for handler, v in acc.items():
+        if not (v["contact_count"] or v["payment_count"]):
+            continue
+        out.append({
+            "handler": handler,
+            "contacts": int(v["contact_count"]),
+            "leads": int(v["lead_count"]),
+            "conversions": int(v["converted_count"]),
+            "conversionRate": (
+                round(v["converted_count"] / v["lead_count"], 4) if v["lead_count"] else None
+            ),
+            "avgContactGapDays": (
+                round(v["gap_days"] / v["gap_count"], 1) if v["gap_count"] else None
+            ),
+            "payments": int(v["payment_count"]),
+            "paymentAmount": v["payment_amount"],
+        })
+    out.sort(key=lambda o: (-o["paymentAmount"], -o["contacts"], o["handler"]))
+    return out
@@ -0,0 +1,221 @@
+"""외부 폼 접수 큐 (intake_submissions 테이블).
+
+웹훅은 enqueue() 로 한 행만 넣고 바로 응답하고, flush() 가 쌓인 접수를 BATCH_SIZE 개씩
+고객/컨택으로 만들어 배치마다 한 번 commit 한다. flush() 는 응답 후 BackgroundTasks 와
+서버 시작 시 호출되며, 프로세스 안에서는 하나만 돌고 (돌고 있으면 그쪽이 이어서 처리),
+워커 간에는 UPDATE ... WHERE status='queued' 로 행을 선점해서 같은 접수를 두 번 처리하지 않는다.
+"""
+import hashlib
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.customer import Customer, Contact, INQUIRY_SOURCES
+from models.intake import IntakeSubmission
+from services import write_hooks
+
+BATCH_SIZE = 20
+
+# 처리 중에 프로세스가 죽은 접수는 이 시간이 지나면 다시 처리
+_STALE_CLAIM = timedelta(minutes=10)
+
+# Idempotency-Key 없이 들어온 접수(페이로드 해시)는 이 시간 안의 재전송만 중복으로 봄
+# — 같은 내용으로 나중에 다시 문의하면 새 접수
+_HASH_KEY_WINDOW = timedelta(minutes=10)
+
+_flush_lock = threading.Lock()
+
+
+def idempotency_key(header: Optional[str], payload: Dict[str, Any]) -> str:
+    """Idempotency-Key 헤더가 있으면 그 값, 없으면 페이로드(키 정렬 JSON)의 SHA-256.
+    헤더 값은 계속 유효하고, 해시는 _HASH_KEY_WINDOW 동안만 중복 판정에 쓰임."""
+    if header and header.strip():
+        return "key:" + header.strip()[:190]
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def enqueue(
+    db: Session, items: List[Tuple[str, Dict[str, Any]]]
+) -> List[Tuple[IntakeSubmission, bool]]:
+    """(key, payload) 목록을 접수 — 이미 있는 key 는 기존 행을 돌려줌. (행, 새로 접수했는지).
+    페이로드 해시 key 의 기존 행이 처리가 끝났고 _HASH_KEY_WINDOW 보다 오래됐으면 그 행의 key 를 비우고 새로 접수.
+    동시에 같은 key 가 들어오면 commit 때 unique 위반(IntegrityError) — 호출자가 다시 시도."""
+    keys = list({key for key, _ in items})
+    existing = {
+        r.idempotency_key: r
+        for r in db.query(IntakeSubmission).filter(IntakeSubmission.idempotency_key.in_(keys))
+    }
+    cutoff = datetime.utcnow() - _HASH_KEY_WINDOW
+    expired = [
+        (key, row) for key, row in existing.items()
+        if key.startswith("sha256:") and row.status in ("done", "failed") and _received_before(row, cutoff)
+    ]
+    for key, row in expired:
+        # 지난 접수는 기록으로 남기고 key 만 행 id 를 붙여 비켜 줌
+        row.idempotency_key = f"{key}@{row.id}"
+        del existing[key]
+    if expired:
+        db.flush()
+    out = []
+    for key, payload in items:
+        row = existing.get(key)
+        if row is None:
+            row = IntakeSubmission(idempotency_key=key, payload=payload, status="queued")
+            db.add(row)
+            existing[key] = row
+            out.append((row, True))
+        else:
+            out.append((row, False))
+    db.flush()
+    return out
+
+
+def _received_before(row: IntakeSubmission, cutoff: datetime) -> bool:
+    received = row.received_at
+    if received is None:
+        return False
+    if received.tzinfo is not None:
+        received = received.astimezone(timezone.utc).replace(tzinfo=None)
+    return received < cutoff
+
+
+# ── 처리 ──
+
+def create_customer(db: Session, payload: Dict[str, Any]) -> Customer:
+    """접수 한 건 → 고객 (+ 문의 내용이 있으면 1차 컨택)."""
+    src = payload.get("inquirySource")
+    customer = Customer(
+        name=payload["name"],
+        company_name=payload.get("companyName") or "",
+        phone=payload.get("phone") or "",
+        email=payload.get("email") or "",
+        address=payload.get("address") or "",
+        manager=payload.get("manager") or "",
+        # 폼 문의 요약을 기본 정보 메모에도 저장
+        memo=payload.get("memo") or "",
+        inquiry_source=src if src in INQUIRY_SOURCES else "other",
+        contract_status="pre_consultation",
+    )
+    db.add(customer)
+    write_hooks.customer_saved(db, None, customer)
+
+    # 1차 컨택 기록도 함께 생성 (이력/타임라인 용)
+    if payload.get("memo"):
+        contact = Contact(
+            customer_id=customer.id,
+            sequence=1,
+            contacted_at=datetime.utcnow(),
+            content=f"📨 폼 문의:\n{payload['memo']}",
+        )
+        db.add(contact)
+        write_hooks.contact_saved(db, None, contact)
+    return customer
+
+
+def _claim(db: Session) -> List[IntakeSubmission]:
+    """대기 중인 접수 BATCH_SIZE 개를 이 워커 것으로 표시하고 가져옴."""
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    claimable = or_(
+        IntakeSubmission.status == "queued",
+        and_(
+            IntakeSubmission.status == "processing",
+            IntakeSubmission.claimed_at < now - _STALE_CLAIM,
+        ),
+    )
+    ids = (
+        db.query(IntakeSubmission.id)
+        .filter(claimable)
+        .order_by(IntakeSubmission.id)
+        .limit(BATCH_SIZE)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(IntakeSubmission)
+        .where(IntakeSubmission.id.in_(ids), claimable)
+        .values(status="processing", claim_token=token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return (
+        db.query(IntakeSubmission)
+        .filter(IntakeSubmission.claim_token == token, IntakeSubmission.status == "processing")
+        .order_by(IntakeSubmission.id)
+        .all()
+    )
+
+
+def _finish(row: IntakeSubmission, customer: Optional[Customer], error: Optional[Exception]) -> None:
+    if error is None:
+        row.status = "done"
+        row.customer_id = customer.id
+    else:
+        row.status = "failed"
+        row.error = str(error)[:1000]
+    row.claim_token = None
+    row.processed_at = datetime.utcnow()
+
+
+def _process(db: Session, rows: List[IntakeSubmission]) -> None:
+    """배치를 한 트랜잭션으로 처리. 한 건이라도 실패하면 배치를 되돌리고 건별 트랜잭션으로 다시 —
+    SAVEPOINT(begin_nested)는 pysqlite 기본 설정에서 제대로 롤백되지 않으므로 쓰지 않음."""
+    try:
+        for row in rows:
+            _finish(row, create_customer(db, row.payload), None)
+        db.commit()
+        return
+    except Exception:
+        db.rollback()
+    for row in rows:
+        try:
+            customer = create_customer(db, row.payload)
+            _finish(row, customer, None)
+            db.commit()
+        except Exception as e:  # 한 건 실패가 배치 전체를 막지 않도록 기록만
+            db.rollback()
+            _finish(row, None, e)
+            db.commit()
+
+
+def _drain() -> int:
+    total = 0
+    while True:
+        db = SessionLocal()
+        try:
+            rows = _claim(db)
+            if not rows:
+                return total
+            _process(db, rows)
+            total += len(rows)
+        finally:
+            db.close()
+
+
+def _pending() -> bool:
+    db = SessionLocal()
+    try:
+        queued = db.query(IntakeSubmission.id).filter(IntakeSubmission.status == "queued")
+        return queued.first() is not None
+    finally:
+        db.close()
+
+
+def flush() -> int:
+    """대기 중인 접수를 모두 처리. 처리한 건수 반환 (다른 스레드가 처리 중이면 그쪽에 맡기고 0)."""
+    total = 0
+    while _flush_lock.acquire(blocking=False):
+        try:
+            total += _drain()
+        finally:
+            _flush_lock.release()
+        # 잠금을 푸는 사이 들어온 접수 (그 요청의 flush 는 잠금을 못 얻고 돌아갔을 수 있음)
+        if not _pending():
+            break
+    return total
@@ -0,0 +1,49 @@
+"""자재 카탈로그(브랜드/분류/공종/건수) 프로세스 내 스냅샷.
+
+카탈로그는 가끔만 바뀌므로 화면마다 DB 를 읽지 않고 메모리 스냅샷으로 응답한다.
+자재/브랜드/분류/공종/단가 쓰기는 MaterialService 에서 캐시 세대(response_cache.CATALOG)를 올리고,
+조회는 세대가 바뀌었을 때만 스냅샷을 다시 만든다. 세대 번호는 ETag 로도 쓰여 바뀐 게 없으면 304.
+"""
+import threading
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models.schemas.material import BrandResponse, CategoryResponse, WorkTypeResponse
+from services import response_cache
+from services.material_service import MaterialService
+
+_snapshot: Optional[SimpleNamespace] = None
+_lock = threading.Lock()
+
+
+def _build(db: Session, gen: int) -> SimpleNamespace:
+    service = MaterialService(db)
+    categories = [
+        CategoryResponse.model_validate(c).model_dump() for c in service.list_categories()
+    ]
+    return SimpleNamespace(
+        generation=gen,
+        brands=[BrandResponse.model_validate(b).model_dump() for b in service.list_brands()],
+        categories=categories,
+        level1=sorted({c["level1"] for c in categories}),
+        work_types=[
+            WorkTypeResponse.model_validate(w).model_dump() for w in service.list_work_types()
+        ],
+        stats=service.get_stats(),
+    )
+
+
+def load(db: Session) -> SimpleNamespace:
+    """현재 세대의 카탈로그 — 세대가 바뀐 경우에만 DB 에서 다시 읽음.
+    (generation, brands, categories, level1, work_types, stats)"""
+    global _snapshot
+    gen = response_cache.generation(db, response_cache.CATALOG)
+    with _lock:
+        if _snapshot is not None and _snapshot.generation == gen:
+            return _snapshot
+    snapshot = _build(db, gen)
+    with _lock:
+        _snapshot = snapshot
+    return snapshot
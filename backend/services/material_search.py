@@ -0,0 +1,131 @@
+"""자재 검색 (material_search_grams 역색인).
+
+제품명/품번/규격/브랜드명을 services/customer_search.py 와 같은 방식(소문자·NFC, 1·2글자 조각)으로 색인한다.
+검색어의 조각을 모두 가진 자재만 인덱스에서 골라낸 뒤 LIKE 로 확인하므로
+분류/브랜드 필터와 함께 써도 '%x%' 로 테이블 전체를 훑지 않는다.
+자재 생성/수정 때 MaterialService 에서 같은 트랜잭션 안에서 다시 색인한다.
+(자재 삭제 시에는 FK ON DELETE CASCADE 로 함께 지워짐)
+"""
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from models.material import Brand, Material, MaterialSearchGram
+from services.customer_search import LIKE_ESCAPE, escape_like, grams, normalize, query_grams
+
+# 필드별 가중치 — 제품명 일치가 가장 앞에 오도록
+_FIELD_WEIGHTS = {"product_name": 10, "product_code": 6, "brand_name": 4, "spec": 2}
+
+
+def _columns():
+    return {
+        "product_name": Material.product_name,
+        "product_code": Material.product_code,
+        "spec": Material.spec,
+        "brand_name": Brand.name,
+    }
+
+
+def material_grams(product_name, product_code, spec, brand_name) -> Set[str]:
+    out: Set[str] = set()
+    for text in (product_name, product_code, spec, brand_name):
+        out |= grams(text)
+    return out
+
+
+# ── 색인 ──
+
+def reindex(db: Session, material: Material) -> None:
+    """flush 후 호출 (material.id 필요)."""
+    brand_name = (
+        db.query(Brand.name).filter(Brand.id == material.brand_id).scalar()
+        if material.brand_id
+        else None
+    )
+    db.query(MaterialSearchGram).filter(
+        MaterialSearchGram.material_id == material.id
+    ).delete(synchronize_session=False)
+    db.add_all(
+        MaterialSearchGram(gram=g, material_id=material.id)
+        for g in material_grams(material.product_name, material.product_code, material.spec, brand_name)
+    )
+
+
+def _source_rows(db: Session):
+    return (
+        db.query(
+            Material.id, Material.product_name, Material.product_code, Material.spec,
+            Brand.name.label("brand_name"),
+        )
+        .outerjoin(Brand, Material.brand_id == Brand.id)
+        .all()
+    )
+
+
+def rebuild(db: Session) -> int:
+    """색인을 처음부터 다시 만듦 (commit 은 호출자가). 저장한 조각 수 반환."""
+    db.query(MaterialSearchGram).delete(synchronize_session=False)
+    count = 0
+    for m in _source_rows(db):
+        rows = [
+            MaterialSearchGram(gram=g, material_id=m.id)
+            for g in material_grams(m.product_name, m.product_code, m.spec, m.brand_name)
+        ]
+        db.add_all(rows)
+        count += len(rows)
+    db.flush()
+    return count
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """(key, 저장 조각 수, 기대 조각 수) — 색인이 원본과 다른 자재 목록."""
+    stored: Dict[int, Set[str]] = {}
+    for gram, material_id in db.query(MaterialSearchGram.gram, MaterialSearchGram.material_id):
+        stored.setdefault(material_id, set()).add(gram)
+    diffs = []
+    for m in _source_rows(db):
+        expected = material_grams(m.product_name, m.product_code, m.spec, m.brand_name)
+        have = stored.pop(m.id, set())
+        if have != expected:
+            diffs.append((f"material_search:{m.id}", len(have), len(expected)))
+    diffs.extend((f"material_search:{mid}", len(g), 0) for mid, g in stored.items())
+    return diffs
+
+
+# ── 조회 ──
+
+def match(q: str):
+    """검색 조건 — 색인에서 조각을 모두 가진 자재로 좁힌 뒤 LIKE 로 확인.
+    Brand 가 outer join 된 쿼리에서 사용."""
+    needed = query_grams(q)
+    candidates = (
+        select(MaterialSearchGram.material_id)
+        .where(MaterialSearchGram.gram.in_(needed))
+        .group_by(MaterialSearchGram.material_id)
+        .having(func.count() == len(needed))
+        .scalar_subquery()
+    )
+    like = f"%{escape_like(normalize(q))}%"
+    return and_(
+        Material.id.in_(candidates),
+        or_(*[func.lower(col).like(like, escape=LIKE_ESCAPE) for col in _columns().values()]),
+    )
+
+
+def score(q: str):
+    """관련도 점수 식 — 필드별로 완전 일치 > 앞부분 일치 > 포함 순으로 가중치를 곱해 더함."""
+    needle = normalize(q)
+    pattern = escape_like(needle)
+    total = None
+    for field, col in _columns().items():
+        text = func.lower(func.coalesce(col, ""))
+        weight = _FIELD_WEIGHTS[field]
+        term = case(
+            (text == needle, weight * 3),
+            (text.like(f"{pattern}%", escape=LIKE_ESCAPE), weight * 2),
+            (text.like(f"%{pattern}%", escape=LIKE_ESCAPE), weight),
+            else_=0,
+        )
+        total = term if total is None else total + term
+    return total
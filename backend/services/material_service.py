@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Query, Session, joinedload
+from sqlalchemy import func
 from models.material import (
     Brand, Category, Material, WorkType, LaborRate, MiscItem, SketchupMapping,
 )
@@ -7,10 +7,80 @@ from models.schemas.material import (
     MaterialCreate, MaterialUpdate,
     LaborRateCreate, MiscItemCreate,
 )
+from services import material_search, response_cache
 from typing import Optional, List, Tuple
 
 
+# 목록 조회는 필요한 컬럼만 한 쿼리로 (브랜드/분류/공종은 outer join) — 행마다 관계를 lazy load 하지 않음
+_MATERIAL_COLUMNS = (
+    Material.id,
+    Material.product_name,
+    Material.product_code,
+    Material.spec,
+    Material.unit,
+    Material.unit_price,
+    Material.coverage_area_py,
+    Material.coverage_area_m2,
+    Material.price_per_py,
+    Material.price_per_m2,
+    Material.loss_rate,
+    Material.purchase_url,
+    Material.note,
+    Material.is_active,
+    Material.created_at,
+    Material.updated_at,
+    Brand.name.label("brand_name"),
+    Category.level1.label("category_level1"),
+    Category.level2.label("category_level2"),
+    Category.level3.label("category_level3"),
+)
+
+_LABOR_RATE_COLUMNS = (
+    LaborRate.id,
+    LaborRate.item_name,
+    LaborRate.spec,
+    LaborRate.unit,
+    LaborRate.material_cost,
+    LaborRate.labor_cost,
+    LaborRate.expense_cost,
+    LaborRate.total_cost,
+    LaborRate.note,
+    LaborRate.is_active,
+    LaborRate.updated_at,
+    WorkType.work_name.label("work_type_name"),
+)
+
+_MISC_ITEM_COLUMNS = (
+    MiscItem.id,
+    MiscItem.item_name,
+    MiscItem.spec,
+    MiscItem.unit,
+    MiscItem.unit_price,
+    MiscItem.note,
+    WorkType.work_name.label("work_type_name"),
+)
+
+
+def _page(query: Query, skip: int, limit: int, include_total: bool) -> Tuple[list, Optional[int]]:
+    """(페이지 행, 전체 건수) — 정렬된 query 를 받아 전체 건수는 별도 COUNT 쿼리 대신 같은 쿼리의 COUNT(*) OVER ().
+    include_total=False 면 건수는 None (무한 스크롤 등 건수가 필요 없는 화면용)."""
+    if not include_total:
+        return query.offset(skip).limit(limit).all(), None
+    query = query.add_columns(func.count().over().label("total_count"))
+    rows = query.offset(skip).limit(limit).all()
+    if rows:
+        return rows, rows[0].total_count
+    if skip == 0:
+        return rows, 0
+    # 마지막 페이지 너머를 요청한 경우에만 건수를 따로 확인
+    first = query.limit(1).first()
+    return rows, first.total_count if first else 0
+
+
 class MaterialService:
+    """자재/단가 DB 조회·쓰기. 쓰기 메서드는 commit 전에 카탈로그 세대를 올려
+    메모리 카탈로그 스냅샷(services/material_catalog.py)을 무효화한다."""
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -102,28 +172,30 @@ class MaterialService:
         search: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[dict], int]:
-        query = self.db.query(Material)
+        include_total: bool = True,
+    ) -> Tuple[List[dict], Optional[int]]:
+        query = (
+            self.db.query(*_MATERIAL_COLUMNS)
+            .select_from(Material)
+            .outerjoin(Brand, Material.brand_id == Brand.id)
+            .outerjoin(Category, Material.category_id == Category.id)
+        )
 
         if category_level1:
-            query = query.join(Category).filter(Category.level1 == category_level1)
+            query = query.filter(Category.level1 == category_level1)
         if category_level2:
-            if not category_level1:
-                query = query.join(Category)
             query = query.filter(Category.level2 == category_level2)
         if brand_name:
-            query = query.join(Brand).filter(Brand.name == brand_name)
+            query = query.filter(Brand.name == brand_name)
         if search:
-            query = query.filter(
-                or_(
-                    Material.product_name.contains(search),
-                    Material.product_code.contains(search),
-                    Material.spec.contains(search),
-                )
+            # 제품명/품번/규격/브랜드 n-gram 색인으로 후보를 좁히고 관련도순 정렬
+            query = query.filter(material_search.match(search)).order_by(
+                material_search.score(search).desc(), Material.id
             )
+        else:
+            query = query.order_by(Material.id)
 
-        total = query.count()
-        materials = query.order_by(Material.id).offset(skip).limit(limit).all()
+        materials, total = _page(query, skip, limit, include_total)
 
         results = []
         for m in materials:
@@ -144,16 +216,21 @@ class MaterialService:
                 "is_active": m.is_active if m.is_active is not None else True,
                 "created_at": m.created_at,
                 "updated_at": m.updated_at,
-                "brand_name": m.brand.name if m.brand else "",
-                "category_level1": m.category.level1 if m.category else "",
-                "category_level2": m.category.level2 if m.category else "",
-                "category_level3": m.category.level3 if m.category else "",
+                "brand_name": m.brand_name or "",
+                "category_level1": m.category_level1 or "",
+                "category_level2": m.category_level2 or "",
+                "category_level3": m.category_level3 or "",
             }
             results.append(d)
         return results, total
 
     def get_material(self, material_id: int) -> Optional[Material]:
-        return self.db.query(Material).filter(Material.id == material_id).first()
+        return (
+            self.db.query(Material)
+            .options(joinedload(Material.brand), joinedload(Material.category))
+            .filter(Material.id == material_id)
+            .first()
+        )
 
     def create_material(self, data: MaterialCreate) -> Material:
         brand_id = data.brand_id
@@ -187,6 +264,9 @@ class MaterialService:
         )
         self._compute_prices(material)
         self.db.add(material)
+        self.db.flush()
+        material_search.reindex(self.db, material)
+        response_cache.bump(self.db, response_cache.CATALOG)
         self.db.commit()
         self.db.refresh(material)
         return material
@@ -195,9 +275,14 @@ class MaterialService:
         material = self.get_material(material_id)
         if not material:
             return None
-        for key, value in data.model_dump(exclude_unset=True).items():
+        changes = data.model_dump(exclude_unset=True)
+        for key, value in changes.items():
             setattr(material, key, value)
         self._compute_prices(material)
+        if changes.keys() & {"product_name", "product_code", "spec", "brand_id"}:
+            self.db.flush()
+            material_search.reindex(self.db, material)
+        response_cache.bump(self.db, response_cache.CATALOG)
         self.db.commit()
         self.db.refresh(material)
         return material
@@ -207,6 +292,7 @@ class MaterialService:
         if not material:
             return False
         self.db.delete(material)
+        response_cache.bump(self.db, response_cache.CATALOG)
         self.db.commit()
         return True
 
@@ -233,6 +319,7 @@ class MaterialService:
             is_active=data.is_active if data.is_active is not None else True,
         )
         self.db.add(lr)
+        response_cache.bump(self.db, response_cache.CATALOG)
         self.db.commit()
         self.db.refresh(lr)
         return lr
@@ -243,15 +330,19 @@ class MaterialService:
         search: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[dict], int]:
-        query = self.db.query(LaborRate)
+        include_total: bool = True,
+    ) -> Tuple[List[dict], Optional[int]]:
+        query = (
+            self.db.query(*_LABOR_RATE_COLUMNS)
+            .select_from(LaborRate)
+            .outerjoin(WorkType, LaborRate.work_type_id == WorkType.id)
+        )
         if work_type_name:
-            query = query.join(WorkType).filter(WorkType.work_name == work_type_name)
+            query = query.filter(WorkType.work_name == work_type_name)
         if search:
             query = query.filter(LaborRate.item_name.contains(search))
 
-        total = query.count()
-        items = query.order_by(LaborRate.id).offset(skip).limit(limit).all()
+        items, total = _page(query.order_by(LaborRate.id), skip, limit, include_total)
 
         results = []
         for lr in items:
@@ -267,7 +358,7 @@ class MaterialService:
                 "note": lr.note or "",
                 "is_active": lr.is_active if lr.is_active is not None else True,
                 "updated_at": lr.updated_at,
-                "work_type_name": lr.work_type.work_name if lr.work_type else "",
+                "work_type_name": lr.work_type_name or "",
             }
             results.append(d)
         return results, total
@@ -289,6 +380,7 @@ class MaterialService:
             note=data.note or "",
         )
         self.db.add(item)
+        response_cache.bump(self.db, response_cache.CATALOG)
         self.db.commit()
         self.db.refresh(item)
         return item
@@ -299,15 +391,19 @@ class MaterialService:
         search: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[dict], int]:
-        query = self.db.query(MiscItem)
+        include_total: bool = True,
+    ) -> Tuple[List[dict], Optional[int]]:
+        query = (
+            self.db.query(*_MISC_ITEM_COLUMNS)
+            .select_from(MiscItem)
+            .outerjoin(WorkType, MiscItem.work_type_id == WorkType.id)
+        )
         if work_type_name:
-            query = query.join(WorkType).filter(WorkType.work_name == work_type_name)
+            query = query.filter(WorkType.work_name == work_type_name)
         if search:
             query = query.filter(MiscItem.item_name.contains(search))
 
-        total = query.count()
-        items = query.order_by(MiscItem.id).offset(skip).limit(limit).all()
+        items, total = _page(query.order_by(MiscItem.id), skip, limit, include_total)
 
         results = []
         for mi in items:
@@ -318,7 +414,7 @@ class MaterialService:
                 "unit": mi.unit or "",
                 "unit_price": mi.unit_price or 0,
                 "note": mi.note or "",
-                "work_type_name": mi.work_type.work_name if mi.work_type else "",
+                "work_type_name": mi.work_type_name or "",
             }
             results.append(d)
         return results, total
@@ -0,0 +1,89 @@
+"""keyset 페이지네이션 커서 인코딩.
+
+커서는 마지막 행의 정렬 키 값들을 JSON 배열로 묶어 URL-safe base64 로 만든 불투명 문자열.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.orm import Session
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        ensure_ascii=False,
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """커서를 값 목록으로 — 형식이 틀리면 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="잘못된 cursor")
+    return values
+
+
+def parse_datetime(value: Any) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor")
+
+
+def parse_text(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return value
+
+
+def parse_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> List[Any]:
+    """커서를 디코딩하고 자리마다 parser(int, float, parse_text, parse_datetime 등)로 변환 — 실패하면 400."""
+    values = decode_cursor(cursor, len(parsers))
+    try:
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor")
+
+
+def _db_timestamp(column) -> bool:
+    """값을 DB 의 CURRENT_TIMESTAMP 로만 채우는 컬럼인지 (server_default + onupdate=func.now(), 예: updated_at)."""
+    col = getattr(column, "expression", column)
+    return getattr(col, "server_default", None) is not None and getattr(col, "onupdate", None) is not None
+
+
+def _comparable(db: Session, columns: Sequence, values: Sequence):
+    """(columns) 와 (values) 를 비교 가능한 튜플로. 컬럼 쪽은 감싸지 않아야 (col, id) 인덱스로 범위 탐색을 함.
+
+    SQLite 는 날짜를 저장된 문자열 그대로 비교한다. 파이썬에서 쓴 값은 'YYYY-MM-DD HH:MM:SS.ffffff' 로
+    바인딩 형식과 같지만, CURRENT_TIMESTAMP 로 채워지는 컬럼은 'YYYY-MM-DD HH:MM:SS' 이므로
+    그런 컬럼의 커서 값만 같은 형식의 문자열로 바인딩."""
+    if db.get_bind().dialect.name == "sqlite":
+        values = [
+            literal(v.replace(tzinfo=None).strftime("%Y-%m-%d %H:%M:%S"), String())
+            if isinstance(v, datetime) and _db_timestamp(c)
+            else v
+            for c, v in zip(columns, values)
+        ]
+    return tuple_(*columns), tuple_(*values)
+
+
+def before(db: Session, columns: Sequence, values: Sequence):
+    """내림차순 keyset 조건 (columns) < (values)."""
+    left, right = _comparable(db, columns, values)
+    return left < right
+
+
+def after(db: Session, columns: Sequence, values: Sequence):
+    """오름차순 keyset 조건 (columns) > (values)."""
+    left, right = _comparable(db, columns, values)
+    return left > right
@@ -0,0 +1,335 @@
+"""은행 거래내역 대사 — 입금 내역(CSV / XLSX)을 진행 중인 계약에 맞춰 입금(Payment)으로 등록.
+
+미수금이 남은 계약을 한 번 읽어서 해시 색인 세 개를 만든 뒤 입금 한 건당 색인 조회만 한다.
+    - 남은 금액 (원 단위) → 계약
+    - 고객명/회사명 정규화 값 → 계약
+    - 고객명/회사명 앞부분 → 계약 (은행 입금자명은 글자 수 제한으로 잘려 옴)
+후보마다 입금자명·금액·계약일과의 날짜 차이로 점수를 매기고, 확실한 것(AUTO_SCORE 이상,
+2순위와 차이가 있을 때)은 자동 등록, 애매한 것은 제안으로만 돌려준다.
+입금은 날짜순으로 처리하며, 매칭된 금액만큼 계약의 남은 금액을 줄여 다음 입금 매칭에 반영.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.contract import Contract, Payment
+from models.customer import Customer
+from services import customer_import
+
+# 헤더 → 필드 (은행마다 다른 표기 지원)
+COLUMN_MAP = {
+    "거래일시": "date",
+    "거래일자": "date",
+    "거래일": "date",
+    "일자": "date",
+    "날짜": "date",
+    "date": "date",
+    "입금액": "amount",
+    "입금금액": "amount",
+    "입금": "amount",
+    "맡기신금액": "amount",
+    "amount": "amount",
+    "deposit": "amount",
+    "입금자": "depositor",
+    "입금자명": "depositor",
+    "보낸분": "depositor",
+    "보낸 분": "depositor",
+    "의뢰인": "depositor",
+    "기재내용": "depositor",
+    "적요": "depositor",
+    "depositor": "depositor",
+    "메모": "memo",
+    "비고": "memo",
+    "memo": "memo",
+}
+_REQUIRED = ("date", "amount", "depositor")
+
+# 이 점수 이상이고 2순위보다 _AUTO_MARGIN 이상 높으면 자동 등록
+AUTO_SCORE = 0.7
+_AUTO_MARGIN = 0.1
+# 이 점수 이상이면 제안
+PROPOSE_SCORE = 0.4
+
+# 계약일 이후 이 기간 안의 입금일수록 가점 (계약일보다 _EARLY_DAYS 이상 이르면 가점 없음)
+_DATE_WINDOW_DAYS = 120
+_EARLY_DAYS = 7
+
+_MIN_PREFIX = 2
+_MAX_PREFIX = 20
+
+# 응답에 담는 행 오류 최대 개수 (건수는 전부 셈)
+MAX_REPORTED_ERRORS = 1000
+
+# 법인 표기 — 입금자명/회사명 비교 전에 제거
+_CORP_MARKS = re.compile(r"\(주\)|㈜|주식회사|\(유\)|유한회사|\(사\)|\(재\)|[\s().,·\-]")
+
+
+def normalize_name(text: Optional[str]) -> str:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _CORP_MARKS.sub("", text)
+
+
+# ── 파일 읽기 ──
+
+def _parse_amount(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = re.sub(r"[,\s원₩]", "", str(value))
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"잘못된 금액: {value}")
+
+
+def _parse_date(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = re.sub(r"[./]", "-", str(value).strip()).strip("-")
+    try:
+        if re.fullmatch(r"\d{8}", text):
+            return datetime.strptime(text, "%Y%m%d")
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"잘못된 거래일: {value}")
+
+
+def read_deposits(
+    filename: str, fileobj: IO[bytes], errors: List[Dict[str, Any]]
+) -> List[SimpleNamespace]:
+    """입금 행만 (입금액이 없거나 0 인 출금 행은 건너뜀). 형식 오류는 errors 에 추가."""
+    deposits = []
+    rows = customer_import.read_rows(filename, fileobj, COLUMN_MAP, _REQUIRED)
+    for line_no, data in rows:
+        if not data.get("amount"):
+            continue
+        try:
+            amount = _parse_amount(data["amount"])
+            if amount <= 0:
+                continue
+            deposits.append(SimpleNamespace(
+                row=line_no,
+                date=_parse_date(data.get("date")),
+                amount=amount,
+                depositor=str(data.get("depositor") or "").strip(),
+                memo=str(data.get("memo") or "").strip(),
+            ))
+        except ValueError as e:
+            errors.append({"row": line_no, "message": str(e)})
+    return deposits
+
+
+# ── 색인 ──
+
+def _open_contracts(db: Session) -> List[SimpleNamespace]:
+    """미수금이 남은 진행 중 계약."""
+    rows = (
+        db.query(
+            Contract.id,
+            Contract.customer_id,
+            Contract.title,
+            Contract.contract_amount,
+            Contract.contract_date,
+            Contract.paid_total.label("paid"),
+            Customer.name,
+            Customer.company_name,
+        )
+        .join(Customer, Customer.id == Contract.customer_id)
+        .filter(Contract.state == "active")
+        .all()
+    )
+    out = []
+    for r in rows:
+        remaining = (r.contract_amount or 0) - (r.paid or 0)
+        if remaining <= 0.5:
+            continue
+        try:
+            signed = datetime.strptime(r.contract_date or "", "%Y-%m-%d")
+        except ValueError:
+            signed = None
+        out.append(SimpleNamespace(
+            id=r.id,
+            customer_id=r.customer_id,
+            customer_name=r.name or "",
+            title=r.title or "",
+            signed=signed,
+            remaining=remaining,
+            names={n for n in (normalize_name(r.name), normalize_name(r.company_name)) if n},
+        ))
+    return out
+
+
+class _Index:
+    def __init__(self, contracts: List[SimpleNamespace]):
+        self.by_remaining: Dict[int, Set[int]] = defaultdict(set)
+        self.by_name: Dict[str, Set[int]] = defaultdict(set)
+        self.by_prefix: Dict[str, Set[int]] = defaultdict(set)
+        self.contracts = {c.id: c for c in contracts}
+        for c in contracts:
+            self.by_remaining[round(c.remaining)].add(c.id)
+            for name in c.names:
+                self.by_name[name].add(c.id)
+                for n in range(_MIN_PREFIX, min(len(name), _MAX_PREFIX)):
+                    self.by_prefix[name[:n]].add(c.id)
+
+    def candidates(self, deposit: SimpleNamespace, name: str) -> Set[int]:
+        ids = set(self.by_remaining.get(round(deposit.amount), ()))
+        if name:
+            ids |= self.by_name.get(name, set())
+            ids |= self.by_prefix.get(name, set())
+        return ids
+
+    def consume(self, contract: SimpleNamespace, amount: float) -> None:
+        """매칭된 입금만큼 남은 금액을 줄이고 금액 색인을 옮김."""
+        self.by_remaining[round(contract.remaining)].discard(contract.id)
+        contract.remaining -= amount
+        if contract.remaining > 0.5:
+            self.by_remaining[round(contract.remaining)].add(contract.id)
+
+
+def _score(deposit: SimpleNamespace, name: str, c: SimpleNamespace) -> Tuple[float, List[str]]:
+    """(0~1 점수, 일치 항목). 입금자명 0.5(앞부분 일치 0.4) + 금액 0.4(일부 입금 0.2) + 날짜 0.1."""
+    total = 0.0
+    reasons = []
+    if name and name in c.names:
+        total += 0.5
+        reasons.append("name")
+    elif _name_matches(name, c.names):
+        total += 0.4
+        reasons.append("name_prefix")
+    if abs(deposit.amount - c.remaining) < 0.5:
+        total += 0.4
+        reasons.append("amount")
+    elif deposit.amount < c.remaining:
+        total += 0.2
+        reasons.append("partial")
+    else:
+        # 남은 금액보다 큰 입금은 이 계약 건이 아님
+        return 0.0, []
+    if c.signed is not None:
+        days = (deposit.date.replace(tzinfo=None) - c.signed).days
+        if -_EARLY_DAYS <= days <= _DATE_WINDOW_DAYS:
+            total += 0.1 * (1 - max(days, 0) / _DATE_WINDOW_DAYS)
+            reasons.append("date")
+    return round(total, 3), reasons
+
+
+def _name_matches(name: str, names: Set[str]) -> bool:
+    return bool(name) and any(n == name or n.startswith(name) for n in names)
+
+
+def _recorded(
+    db: Session, deposits: List[SimpleNamespace]
+) -> Dict[Tuple[int, date], List[SimpleNamespace]]:
+    """내역 기간에 이미 등록된 입금 (금액, 날짜) → [계약/고객명] — paid_at 인덱스 범위 조회 한 번.
+    같은 내역을 다시 올렸을 때 (계약이 완납돼 후보에서 빠졌어도) 중복 등록하지 않도록."""
+    if not deposits:
+        return {}
+    dates = [d.date.replace(tzinfo=None) for d in deposits]
+    start = datetime.combine(min(dates).date(), datetime.min.time())
+    end = datetime.combine(max(dates).date(), datetime.max.time())
+    rows = (
+        db.query(
+            Payment.contract_id,
+            Payment.amount,
+            Payment.paid_at,
+            Contract.customer_id,
+            Customer.name,
+            Customer.company_name,
+        )
+        .join(Contract, Contract.id == Payment.contract_id)
+        .join(Customer, Customer.id == Contract.customer_id)
+        .filter(Payment.paid_at >= start, Payment.paid_at <= end)
+        .all()
+    )
+    out: Dict[Tuple[int, date], List[SimpleNamespace]] = defaultdict(list)
+    for r in rows:
+        out[(round(r.amount or 0), r.paid_at.date())].append(SimpleNamespace(
+            contract_id=r.contract_id,
+            customer_id=r.customer_id,
+            customer_name=r.name or "",
+            names={n for n in (normalize_name(r.name), normalize_name(r.company_name)) if n},
+        ))
+    return out
+
+
+# ── 매칭 ──
+
+def match(
+    db: Session, deposits: List[SimpleNamespace]
+) -> Iterator[Tuple[SimpleNamespace, Dict[str, Any]]]:
+    """입금마다 (입금, 결과 dict) — status: auto / proposed / duplicate / unmatched."""
+    index = _Index(_open_contracts(db))
+    recorded = _recorded(db, deposits)
+
+    for d in sorted(deposits, key=lambda d: (d.date.replace(tzinfo=None), d.row)):
+        name = normalize_name(d.depositor)
+        scored = []
+        for contract_id in index.candidates(d, name):
+            c = index.contracts[contract_id]
+            value, reasons = _score(d, name, c)
+            if value >= PROPOSE_SCORE:
+                scored.append((value, c, reasons))
+        scored.sort(key=lambda s: (-s[0], s[1].id))
+
+        result: Dict[str, Any] = {
+            "row": d.row,
+            "date": d.date.isoformat(),
+            "amount": d.amount,
+            "depositor": d.depositor,
+            "status": "unmatched",
+            "contractId": None,
+            "customerId": None,
+            "customerName": "",
+            "contractTitle": "",
+            "remainingBefore": None,
+            "score": 0.0,
+            "reasons": [],
+            "paymentId": None,
+        }
+        same = recorded.get((round(d.amount), d.date.date()), [])
+        dup = next((r for r in same if _name_matches(name, r.names)), None)
+        if dup is None and scored:
+            dup = next((r for r in same if r.contract_id == scored[0][1].id), None)
+        if dup is not None:
+            result.update(
+                status="duplicate",
+                contractId=dup.contract_id,
+                customerId=dup.customer_id,
+                customerName=dup.customer_name,
+            )
+        elif scored:
+            value, c, reasons = scored[0]
+            runner_up = scored[1][0] if len(scored) > 1 else 0.0
+            auto = value >= AUTO_SCORE and value - runner_up >= _AUTO_MARGIN
+            result.update(
+                status="auto" if auto else "proposed",
+                contractId=c.id,
+                customerId=c.customer_id,
+                customerName=c.customer_name,
+                contractTitle=c.title,
+                remainingBefore=c.remaining,
+                score=value,
+                reasons=reasons,
+            )
+            index.consume(c, d.amount)
+        yield d, result
+
+
+def new_payment(
+    contract_id: int, amount: float, paid_at: datetime, depositor: str, memo: str = ""
+) -> Payment:
+    text = f"은행 입금: {depositor}" if depositor else "은행 입금"
+    return Payment(
+        contract_id=contract_id,
+        amount=amount,
+        paid_at=paid_at,
+        method="bank_transfer",
+        memo=f"{text} ({memo})" if memo else text,
+    )
@@ -0,0 +1,60 @@
+"""짧은 TTL 의 프로세스 내 응답 캐시.
+
+캐시 항목은 (영역, 엔드포인트, 파라미터) 로 구분되고, 저장 당시의 세대 번호를 함께 기억한다.
+쓰기 쪽에서 bump() 로 DB 의 세대 카운터를 올리면 모든 워커의 기존 항목이 다음 조회 때 무효가 된다.
+조회 비용은 세대 번호 한 행 읽기뿐.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.cache import CacheGeneration
+from services.counters import increment
+
+DASHBOARD = "dashboard"
+HANDLERS = "handlers"  # 담당자 자동완성 (services/handler_index.py)
+CATALOG = "catalog"    # 자재 카탈로그 스냅샷 (services/material_catalog.py)
+
+_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+_MAX_ENTRIES = 256
+
+# key → (세대, 만료 시각, 값)
+_entries: Dict[Tuple[str, Hashable], Tuple[int, float, Any]] = {}
+_lock = threading.Lock()
+
+
+def generation(db: Session, name: str) -> int:
+    return (
+        db.query(CacheGeneration.generation)
+        .filter(CacheGeneration.name == name)
+        .scalar()
+        or 0
+    )
+
+
+def bump(db: Session, name: str) -> None:
+    """해당 영역 캐시 무효화 — 쓰기와 같은 트랜잭션 안에서 호출."""
+    increment(db, CacheGeneration, {"name": name}, {"generation": 1})
+
+
+def get_or_compute(db: Session, name: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+    gen = generation(db, name)
+    now = time.monotonic()
+    cache_key = (name, key)
+    with _lock:
+        hit = _entries.get(cache_key)
+    if hit and hit[0] == gen and hit[1] > now:
+        return hit[2]
+
+    value = compute()
+    with _lock:
+        if len(_entries) >= _MAX_ENTRIES:
+            # 만료된 항목부터, 없으면 오래된 순으로 1/4 정리
+            expired = [k for k, (_, expires_at, _) in _entries.items() if expires_at <= now]
+            for k in expired or list(_entries)[: _MAX_ENTRIES // 4]:
+                _entries.pop(k, None)
+        _entries[cache_key] = (gen, now + _TTL_SECONDS, value)
+    return value
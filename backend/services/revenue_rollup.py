@@ -0,0 +1,180 @@
+"""월별 매출 롤업 (revenue_by_month 테이블) 과 기간별 매출 시계열.
+
+입금 추가/수정/삭제 시 services/write_hooks.py 에서 같은 트랜잭션으로 갱신한다.
+월 단위 조회는 롤업만 읽고, 일/주 단위는 paid_at 인덱스 범위 스캔으로 계산한다.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.contract import Payment
+from models.dashboard import RevenueByMonth
+from services.counters import increment
+from services.dashboard_stats import month_key
+from services.handler_index import normalize as normalize_handler
+
+# (month, method, handler) → [amount, count]
+Rollup = Dict[Tuple[str, str, str], List[float]]
+
+_TOLERANCE = 0.01
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.astimezone(timezone.utc) if dt.tzinfo is not None else dt
+
+
+def _key(p) -> Tuple[str, str, str]:
+    # 담당자는 handlers / handler_monthly_stats 와 같은 정규화 키로
+    return (month_key(p.paid_at), p.method or "bank_transfer", normalize_handler(p.handler))
+
+
+def _collect(payments: Iterable, sign: int = 1) -> Rollup:
+    out: Rollup = {}
+    for p in payments:
+        if not p.paid_at:
+            continue
+        acc = out.setdefault(_key(p), [0.0, 0])
+        acc[0] += sign * (p.amount or 0)
+        acc[1] += sign
+    return out
+
+
+def apply(db: Session, payments: Iterable, sign: int = 1) -> None:
+    """입금 행들(ORM 객체, snapshot, 컬럼 Row)의 기여분을 롤업에 더함 (sign=-1 이면 뺌)."""
+    for (month, method, handler), (amount, count) in _collect(payments, sign).items():
+        increment(
+            db,
+            RevenueByMonth,
+            {"month": month, "method": method, "handler": handler},
+            {"amount": amount, "payment_count": count},
+        )
+
+
+# ── 재계산 / 검증 ──
+
+def compute(db: Session) -> Rollup:
+    return _collect(
+        db.query(Payment.amount, Payment.paid_at, Payment.method, Payment.handler).all()
+    )
+
+
+def needs_rebuild(db: Session) -> bool:
+    """원본에 입금이 있는데 롤업이 비었거나, 예전(앞뒤 공백만 제거한) 담당자 키가 남아 있으면 True."""
+    if db.query(RevenueByMonth.month).first() is None:
+        return db.query(Payment.id).first() is not None
+    handlers = db.query(RevenueByMonth.handler).distinct()
+    return any(h != normalize_handler(h) for (h,) in handlers)
+
+
+def rebuild(db: Session) -> int:
+    rollup = compute(db)
+    db.query(RevenueByMonth).delete(synchronize_session=False)
+    db.add_all(
+        RevenueByMonth(month=m, method=me, handler=h, amount=a, payment_count=int(c))
+        for (m, me, h), (a, c) in rollup.items()
+        if c
+    )
+    db.flush()
+    return len(rollup)
+
+
+def check(db: Session) -> List[Tuple[str, float, float]]:
+    """(key, 저장값, 재계산값) — 금액/건수가 다른 롤업 행 목록."""
+    stored = {
+        (r.month, r.method, r.handler): [r.amount, r.payment_count]
+        for r in db.query(RevenueByMonth).all()
+    }
+    expected = compute(db)
+    diffs = []
+    for key in sorted(set(stored) | set(expected)):
+        a = stored.get(key, [0.0, 0])
+        b = expected.get(key, [0.0, 0])
+        label = "revenue_by_month:" + "/".join(key)
+        if abs(a[0] - b[0]) > _TOLERANCE:
+            diffs.append((label + " amount", a[0], b[0]))
+        if a[1] != b[1]:
+            diffs.append((label + " count", a[1], b[1]))
+    return diffs
+
+
+# ── 조회 ──
+
+def monthly_totals(db: Session, from_month: str, to_month: str) -> Dict[str, float]:
+    """{YYYY-MM: 매출} — 롤업에서 월 범위 합계."""
+    rows = (
+        db.query(RevenueByMonth.month, func.sum(RevenueByMonth.amount))
+        .filter(RevenueByMonth.month >= from_month, RevenueByMonth.month <= to_month)
+        .group_by(RevenueByMonth.month)
+        .all()
+    )
+    return {m: amount or 0 for m, amount in rows}
+
+
+def _bucket_key(dt: datetime, bucket: str) -> str:
+    d = _utc(dt).date()
+    if bucket == "week":
+        d = d - timedelta(days=d.weekday())  # 주 시작(월요일) 날짜
+    return d.isoformat()
+
+
+def series(
+    db: Session,
+    start: date,
+    end: date,
+    bucket: str = "month",
+    group_by: Optional[str] = None,
+) -> List[Tuple[str, Optional[str], float, int]]:
+    """[start, end] 기간의 (bucket, group, 금액, 건수) 목록, bucket/group 오름차순.
+
+    bucket: day | week | month, group_by: None | method | handler
+    """
+    if bucket == "month":
+        group_col = getattr(RevenueByMonth, group_by) if group_by else None
+        cols = [RevenueByMonth.month]
+        if group_col is not None:
+            cols.append(group_col)
+        rows = (
+            db.query(
+                *cols,
+                func.sum(RevenueByMonth.amount),
+                func.sum(RevenueByMonth.payment_count),
+            )
+            .filter(
+                RevenueByMonth.month >= start.strftime("%Y-%m"),
+                RevenueByMonth.month <= end.strftime("%Y-%m"),
+            )
+            .group_by(*cols)
+            .all()
+        )
+        out = [
+            (r[0], r[1] if group_col is not None else None, r[-2] or 0, int(r[-1] or 0))
+            for r in rows
+        ]
+        return sorted((o for o in out if o[3]), key=lambda o: (o[0], o[1] or ""))
+
+    # 일/주 단위 — 기간 내 입금만 컬럼 단위로 읽어서 묶음
+    start_dt = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+    end_dt = datetime(end.year, end.month, end.day, tzinfo=timezone.utc) + timedelta(days=1)
+    payments = (
+        db.query(Payment.amount, Payment.paid_at, Payment.method, Payment.handler)
+        .filter(Payment.paid_at >= start_dt, Payment.paid_at < end_dt)
+        .all()
+    )
+    acc: Dict[Tuple[str, Optional[str]], List[float]] = {}
+    for p in payments:
+        if not p.paid_at:
+            continue
+        group = None
+        if group_by == "method":
+            group = p.method or "bank_transfer"
+        elif group_by == "handler":
+            group = normalize_handler(p.handler)
+        item = acc.setdefault((_bucket_key(p.paid_at, bucket), group), [0.0, 0])
+        item[0] += p.amount or 0
+        item[1] += 1
+    return sorted(
+        ((b, g, a, int(c)) for (b, g), (a, c) in acc.items()),
+        key=lambda o: (o[0], o[1] or ""),
+    )
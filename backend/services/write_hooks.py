@@ -0,0 +1,298 @@
+"""고객/컨택/계약/입금 쓰기 후 파생 데이터 동기화.
+
+라우터는 변경 전 상태를 snapshot() 으로 떠 두고, 변경 후 아래 함수를 호출한다.
+모든 갱신은 호출한 세션의 트랜잭션 안에서 실행되므로 라우터의 commit 과 함께 반영된다.
+(before=None 은 생성, after=None 은 삭제)
+"""
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from models.contract import Contract, Payment
+from models.customer import Contact, Customer
+from services import (
+    activity_log,
+    contract_state,
+    customer_dedup,
+    customer_finance,
+    customer_search,
+    dashboard_stats,
+    handler_index,
+    handler_stats,
+    response_cache,
+    revenue_rollup,
+)
+
+
+def snapshot(row) -> SimpleNamespace:
+    """ORM 객체의 현재 컬럼 값 복사본 (이후 in-place 수정과 무관)."""
+    return SimpleNamespace(**{c.key: getattr(row, c.key) for c in row.__table__.columns})
+
+
+def _payment_rows(db: Session, *criteria):
+    return (
+        db.query(Payment.amount, Payment.paid_at, Payment.method, Payment.handler)
+        .join(Contract, Payment.contract_id == Contract.id)
+        .filter(*criteria)
+        .all()
+    )
+
+
+# ── Customer ──
+
+def customer_saved(db: Session, before, after) -> None:
+    if after is not None:
+        customer_search.normalize_fields(after)
+        customer_search.set_keys(after)
+    db.flush()
+    deltas = []
+    if before is not None:
+        deltas.append(dashboard_stats.customer_delta(before, -1))
+    if after is not None:
+        deltas.append(dashboard_stats.customer_delta(after, +1))
+        if before is None:
+            activity_log.customer_created(db, after)
+        if before is None or customer_search.text_changed(before, after):
+            customer_search.reindex(db, after)
+        if before is None or customer_dedup.key_changed(before, after):
+            customer_dedup.detect(db, after)
+        if before is not None and (
+            handler_stats.converted(before.contract_status)
+            != handler_stats.converted(after.contract_status)
+        ):
+            handler_stats.conversions_changed(
+                db, [after.id], handler_stats.converted(after.contract_status)
+            )
+    dashboard_stats.apply(db, deltas)
+    response_cache.bump(db, response_cache.DASHBOARD)
+
+
+def customers_merging(db: Session, target_id: int, source_ids: List[int]) -> None:
+    """병합 직전에 호출 — 컨택이 합쳐지면 첫 컨택/컨택 간격이 달라지므로
+    target 과 원본 고객의 담당자 통계 기여분을 뺐다가 customer_merged() 에서 다시 더함."""
+    handler_stats.customers_changed(
+        db, [target_id] + [i for i in source_ids if i != target_id], -1
+    )
+
+
+def customer_merged(db: Session, before, target) -> None:
+    """병합 후 호출 — 원본 고객은 customers_deleting() 후 이미 삭제된 상태.
+    옮겨 온 계약/입금/컨택으로 target 의 집계 컬럼을 다시 계산."""
+    customer_saved(db, before, target)
+    customer_finance.recompute(db, [target.id])
+    handler_stats.customers_changed(db, [target.id], +1)
+
+
+def customers_deleting(db: Session, customer_ids: List[int]) -> None:
+    """고객 삭제 직전에 호출 — cascade 로 함께 지워질 계약/입금까지 반영."""
+    if not customer_ids:
+        return
+    payments = _payment_rows(db, Contract.customer_id.in_(customer_ids))
+    deltas = [dashboard_stats.customers_removal_delta(db, customer_ids)]
+    deltas.extend(dashboard_stats.payment_delta(p, -1) for p in payments)
+    dashboard_stats.apply(db, deltas)
+    revenue_rollup.apply(db, payments, -1)
+    contact_handlers = db.query(Contact.handler).filter(
+        Contact.customer_id.in_(customer_ids), Contact.handler != ""
+    )
+    handler_index.apply(db, "contact_count", [h for (h,) in contact_handlers], -1)
+    handler_index.apply(db, "payment_count", [p.handler for p in payments], -1)
+    handler_stats.customers_changed(db, customer_ids, -1)
+    response_cache.bump(db, response_cache.DASHBOARD)
+
+
+# 이보다 많이 가져오면 중복 후보는 고객별 조회 대신 일괄 탐지로
+_IMPORT_DEDUP_BATCH = 200
+
+
+def customers_imported(db: Session, customer_ids: List[int]) -> None:
+    """대량 가져오기(INSERT executemany) 후 호출 — 통계/검색 색인/활동 로그/중복 후보를 한 번에."""
+    if not customer_ids:
+        return
+    rows = []
+    for i in range(0, len(customer_ids), 500):
+        rows.extend(
+            db.query(
+                Customer.id,
+                Customer.name,
+                Customer.company_name,
+                Customer.phone,
+                Customer.email,
+                Customer.contract_status,
+                Customer.inquiry_source,
+                Customer.created_at,
+            )
+            .filter(Customer.id.in_(customer_ids[i:i + 500]))
+            .all()
+        )
+    dashboard_stats.apply(db, [dashboard_stats.customer_delta(r, +1) for r in rows])
+    customer_search.index_many(db, rows)
+    activity_log.customers_created(db, rows)
+    if len(rows) > _IMPORT_DEDUP_BATCH:
+        customer_dedup.rebuild(db)
+    else:
+        for r in rows:
+            customer_dedup.detect(db, r)
+    response_cache.bump(db, response_cache.DASHBOARD)
+
+
+def customers_updating(db: Session, customer_ids: List[int], values: dict) -> None:
+    """여러 고객 일괄 UPDATE 직전에 호출 (values: 바뀔 컬럼 → 값).
+    이름/연락처는 일괄 변경 대상이 아니므로 검색 색인/중복 후보는 그대로."""
+    if not customer_ids:
+        return
+    dashboard_stats.apply(db, [dashboard_stats.customers_change_delta(
+        db,
+        customer_ids,
+        contract_status=values.get("contract_status"),
+        inquiry_source=values.get("inquiry_source"),
+    )])
+    if values.get("contract_status") is not None:
+        handler_stats.status_changing(db, customer_ids, values["contract_status"])
+    response_cache.bump(db, response_cache.DASHBOARD)
+
+
+# ── Contact ──
+
+def contact_saved(db: Session, before, after) -> None:
+    db.flush()
+    if before is None and after is not None:
+        activity_log.contact_logged(db, after)
+        customer_finance.apply(db, after.customer_id, [{"contact_count": 1}])
+    elif before is not None and after is None:
+        customer_finance.apply(db, before.customer_id, [{"contact_count": -1}])
+    handler_index.changed(db, "contact_count", before, after)
+    handler_stats.contact_changed(
+        db, (after if after is not None else before).customer_id, before, after
+    )
+    response_cache.bump(db, response_cache.DASHBOARD)
+
+
+# ── Contract ──
+
+def contract_saved(db: Session, before, after: Contract) -> None:
+    db.flush()
+    paid = after.paid_total or 0
+    deltas = [dashboard_stats.contract_delta(after, paid, +1)]
+    finance = [customer_finance.contract_delta(after, paid, +1)]
+    if before is not None:
+        deltas.append(dashboard_stats.contract_delta(before, paid, -1))
+        if before.customer_id == after.customer_id:
+            finance.append(customer_finance.contract_delta(before, paid, -1))
+        else:
+            customer_finance.apply(
+                db, before.customer_id, [customer_finance.contract_delta(before, paid, -1)]
+            )
+    else:
+        activity_log.contract_created(db, after)
+    customer_finance.apply(db, after.customer_id, finance)
+    dashboard_stats.apply(db, deltas)
+    response_cache.bump(db, response_cache.DASHBOARD)
+
+
+def contract_deleting(db: Session, contract: Contract) -> None:
+    """계약 삭제 직전에 호출 — 딸린 입금까지 반영."""
+    paid = contract.paid_total or 0
+    deltas = [dashboard_stats.contract_delta(contract, paid, -1)]
+    customer_finance.apply(
+        db, contract.customer_id, [customer_finance.contract_delta(contract, paid, -1)]
+    )
+    payments = _payment_rows(db, Payment.contract_id == contract.id)
+    deltas.extend(dashboard_stats.payment_delta(p, -1) for p in payments)
+    dashboard_stats.apply(db, deltas)
+    revenue_rollup.apply(db, payments, -1)
+    handler_index.apply(db, "payment_count", [p.handler for p in payments], -1)
+    response_cache.bump(db, response_cache.DASHBOARD)
+
+
+def contracts_tax_invoice_updating(db: Session, contract_ids: List[int], issued: bool) -> List[int]:
+    """세금계산서 발행 여부 일괄 UPDATE 직전에 호출 — 실제로 바뀔 계약만 고객별 발행 대기 수에 반영.
+    바뀔 계약 id 목록 반환."""
+    if not contract_ids:
+        return []
+    rows = (
+        db.query(Contract.id, Contract.customer_id, Contract.state)
+        .filter(Contract.id.in_(contract_ids), Contract.tax_invoice_issued != issued)
+        .all()
+    )
+    pending: Dict[int, int] = defaultdict(int)
+    for r in rows:
+        if r.state != "cancelled":
+            pending[r.customer_id] += -1 if issued else 1
+    for customer_id, delta in pending.items():
+        customer_finance.apply(db, customer_id, [{"tax_pending_count": delta}])
+    response_cache.bump(db, response_cache.DASHBOARD)
+    return [r.id for r in rows]
+
+
+# ── Payment ──
+
+def payment_saved(
+    db: Session, contract: Contract, before, after: Optional[Payment]
+) -> float:
+    """입금 추가/수정/삭제 반영 — 계약 입금 합계는 변경분만 더하고, 완납/미납이 되면 상태도 전환.
+    반영 후 계약의 입금 합계 반환."""
+    db.flush()
+    contract_before = snapshot(contract)
+    delta = (
+        ((after.amount or 0) if after is not None else 0)
+        - ((before.amount or 0) if before is not None else 0)
+    )
+    paid_before, paid_after = contract_state.add_paid(db, contract, delta)
+    deltas = [
+        dashboard_stats.contract_delta(contract_before, paid_before, -1),
+        dashboard_stats.contract_delta(contract, paid_after, +1),
+    ]
+    customer_finance.apply(db, contract.customer_id, [
+        customer_finance.contract_delta(contract_before, paid_before, -1),
+        customer_finance.contract_delta(contract, paid_after, +1),
+    ])
+    if before is not None:
+        deltas.append(dashboard_stats.payment_delta(before, -1))
+        revenue_rollup.apply(db, [before], -1)
+    if after is not None:
+        deltas.append(dashboard_stats.payment_delta(after, +1))
+        revenue_rollup.apply(db, [after], +1)
+        if before is None:
+            activity_log.payment_received(db, contract, after)
+    handler_index.changed(db, "payment_count", before, after)
+    dashboard_stats.apply(db, deltas)
+    response_cache.bump(db, response_cache.DASHBOARD)
+    return paid_after
+
+
+def payments_added(db: Session, payments: List[Payment]) -> None:
+    """여러 입금을 한꺼번에 추가한 뒤 호출 (은행 내역 대사) — 계약별로 묶어 한 번씩 반영."""
+    if not payments:
+        return
+    db.flush()
+    added: Dict[int, float] = defaultdict(float)
+    for p in payments:
+        added[p.contract_id] += p.amount or 0
+    contracts = {
+        c.id: c for c in db.query(Contract).filter(Contract.id.in_(list(added)))
+    }
+    deltas = []
+    finance: Dict[int, list] = defaultdict(list)
+    for contract_id, amount in added.items():
+        contract = contracts[contract_id]
+        contract_before = snapshot(contract)
+        paid_before, paid_after = contract_state.add_paid(db, contract, amount)
+        deltas.append(dashboard_stats.contract_delta(contract_before, paid_before, -1))
+        deltas.append(dashboard_stats.contract_delta(contract, paid_after, +1))
+        finance[contract.customer_id].append(
+            customer_finance.contract_delta(contract_before, paid_before, -1)
+        )
+        finance[contract.customer_id].append(
+            customer_finance.contract_delta(contract, paid_after, +1)
+        )
+    for customer_id, customer_deltas in finance.items():
+        customer_finance.apply(db, customer_id, customer_deltas)
+    deltas.extend(dashboard_stats.payment_delta(p, +1) for p in payments)
+    revenue_rollup.apply(db, payments, +1)
+    handler_index.apply(db, "payment_count", [p.handler for p in payments])
+    activity_log.payments_received(db, contracts, payments)
+    dashboard_stats.apply(db, deltas)
+    response_cache.bump(db, response_cache.DASHBOARD)
@@ -1,5 +1,14 @@
 import axios from 'axios';
-import type { ContractDetail, ContractInput, PaymentInput } from '../types/contract';
+import type {
+  ContractDetail,
+  ContractInput,
+  ContractListParams,
+  ContractPage,
+  PaymentInput,
+  ReconcileConfirmItem,
+  ReconcileResult,
+  TaxInvoicePage,
+} from '../types/contract';
 
 const getApiBase = () =>
   window.location.hostname === 'localhost'
@@ -7,6 +16,30 @@ const getApiBase = () =>
     : 'https://convil-estimate.onrender.com';
 
 const contractsApi = {
+  async list(params?: ContractListParams): Promise<ContractPage> {
+    const { data } = await axios.get(`${getApiBase()}/api/contracts`, { params });
+    return data;
+  },
+
+  async listTaxInvoicePending(params?: {
+    customerId?: number;
+    limit?: number;
+    cursor?: string;
+  }): Promise<TaxInvoicePage> {
+    const { data } = await axios.get(`${getApiBase()}/api/contracts/tax-invoice-pending`, {
+      params,
+    });
+    return data;
+  },
+
+  async setTaxInvoiceIssued(ids: number[], issued = true): Promise<{ updated: number }> {
+    const { data } = await axios.patch(`${getApiBase()}/api/contracts/tax-invoice`, {
+      ids,
+      issued,
+    });
+    return data;
+  },
+
   async listForCustomer(customerId: number): Promise<ContractDetail[]> {
     const { data } = await axios.get(
       `${getApiBase()}/api/customers/${customerId}/contracts`,
@@ -72,6 +105,24 @@ const contractsApi = {
     );
     return data;
   },
+
+  async reconcile(file: File, apply = false): Promise<ReconcileResult> {
+    const form = new FormData();
+    form.append('file', file);
+    const { data } = await axios.post(`${getApiBase()}/api/contracts/reconcile`, form, {
+      params: { apply },
+    });
+    return data;
+  },
+
+  async confirmReconciled(
+    items: ReconcileConfirmItem[],
+  ): Promise<{ created: number; paymentIds: number[] }> {
+    const { data } = await axios.post(`${getApiBase()}/api/contracts/reconcile/confirm`, {
+      items,
+    });
+    return data;
+  },
 };
 
 export default contractsApi;
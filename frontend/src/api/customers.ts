@@ -4,6 +4,7 @@ import type {
   CustomerListItem,
   CustomerDetail,
   ContactInput,
+  ContactPage,
   ContractStatus,
   InquirySource,
 } from '../types/customer';
@@ -23,8 +24,19 @@ const customersApi = {
     return data;
   },
 
-  async get(id: number): Promise<CustomerDetail> {
-    const { data } = await axios.get(`${getApiBase()}/api/customers/${id}`);
+  async get(id: number, params?: { contactLimit?: number }): Promise<CustomerDetail> {
+    const { data } = await axios.get(`${getApiBase()}/api/customers/${id}`, { params });
+    return data;
+  },
+
+  async listContacts(
+    customerId: number,
+    params?: { limit?: number; cursor?: string },
+  ): Promise<ContactPage> {
+    const { data } = await axios.get(
+      `${getApiBase()}/api/customers/${customerId}/contacts`,
+      { params },
+    );
     return data;
   },
 
@@ -55,6 +67,17 @@ const customersApi = {
     return data;
   },
 
+  async bulkUpdate(
+    ids: number[],
+    changes: { contractStatus?: ContractStatus; manager?: string; inquirySource?: InquirySource },
+  ): Promise<{ updated: number }> {
+    const { data } = await axios.post(`${getApiBase()}/api/customers/bulk-update`, {
+      ids,
+      ...changes,
+    });
+    return data;
+  },
+
   async addContact(customerId: number, input: ContactInput): Promise<CustomerDetail> {
     const { data } = await axios.post(
       `${getApiBase()}/api/customers/${customerId}/contacts`,
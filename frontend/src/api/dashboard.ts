@@ -30,6 +30,8 @@ export interface OutstandingItem {
   paidAmount: number;
   remainingAmount: number;
   contractDate: string;
+  ageDays?: number | null; // 계약일로부터 경과 일수
+  agingBucket?: '0-30' | '31-60' | '61-90' | '90+' | 'unknown';
 }
 
 export interface DashboardSummary {
@@ -5,9 +5,27 @@ const getApiBase = () =>
     ? ''
     : 'https://convil-estimate.onrender.com';
 
+export interface HandlerStats {
+  handler: string; // 미지정은 ''
+  contacts: number;
+  leads: number; // 첫 컨택을 맡은 고객 수
+  conversions: number; // 그 중 계약 완료 이후 상태인 고객 수
+  conversionRate?: number | null;
+  avgContactGapDays?: number | null;
+  payments: number;
+  paymentAmount: number;
+}
+
 const handlersApi = {
-  async list(): Promise<string[]> {
-    const { data } = await axios.get(`${getApiBase()}/api/handlers`);
+  /** 담당자 이름 — prefix 로 시작하는 이름을 사용 횟수순으로 */
+  async list(params?: { prefix?: string; limit?: number }): Promise<string[]> {
+    const { data } = await axios.get(`${getApiBase()}/api/handlers`, { params });
+    return data;
+  },
+
+  /** 담당자별 컨택/전환/입금 실적 — 월 범위(YYYY-MM), 없으면 전체 기간 */
+  async stats(params?: { fromMonth?: string; toMonth?: string }): Promise<HandlerStats[]> {
+    const { data } = await axios.get(`${getApiBase()}/api/handlers/stats`, { params });
     return data;
   },
 };
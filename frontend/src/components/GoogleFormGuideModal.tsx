@@ -69,6 +69,8 @@ function onFormSubmit(e) {
 
   var headers = { 'Content-Type': 'application/json' };
   if (WEBHOOK_TOKEN) headers['X-Webhook-Token'] = WEBHOOK_TOKEN;
+  // 같은 응답이 재전송돼도 고객이 한 번만 생성되도록
+  headers['Idempotency-Key'] = e.response.getId();
 
   UrlFetchApp.fetch(WEBHOOK_URL, {
     method: 'post',
@@ -10,27 +10,28 @@ interface Props {
   listId?: string;
 }
 
-// 모듈 단위 캐시 — 한 번만 fetch
-let cachedHandlers: string[] | null = null;
-let inflight: Promise<string[]> | null = null;
+const SUGGEST_LIMIT = 20;
+const DEBOUNCE_MS = 150;
 
-async function getHandlers(): Promise<string[]> {
-  if (cachedHandlers) return cachedHandlers;
-  if (inflight) return inflight;
-  inflight = handlersApi.list().then((list) => {
-    cachedHandlers = list;
-    inflight = null;
-    return list;
-  }).catch(() => {
-    inflight = null;
-    return [];
-  });
-  return inflight;
+// 모듈 단위 캐시 — 입력한 앞부분별 결과 (서버도 ETag 로 재검증하므로 새로고침 전까지만 유지)
+const cache = new Map<string, Promise<string[]>>();
+
+function getHandlers(prefix: string): Promise<string[]> {
+  const key = prefix.trimStart();
+  let hit = cache.get(key);
+  if (!hit) {
+    hit = handlersApi.list({ prefix: key, limit: SUGGEST_LIMIT }).catch(() => {
+      cache.delete(key);
+      return [];
+    });
+    cache.set(key, hit);
+  }
+  return hit;
 }
 
 /** 외부에서 새 담당자 추가 시 캐시 무효화 */
 export function invalidateHandlerCache() {
-  cachedHandlers = null;
+  cache.clear();
 }
 
 export default function HandlerInput({
@@ -42,9 +43,19 @@ export default function HandlerInput({
 }: Props) {
   const [options, setOptions] = useState<string[]>([]);
 
+  // 입력할 때마다 앞부분으로 자동완성 (사용 횟수순)
   useEffect(() => {
-    getHandlers().then(setOptions);
-  }, []);
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      getHandlers(value).then((list) => {
+        if (!cancelled) setOptions(list);
+      });
+    }, DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [value]);
 
   return (
     <>
@@ -75,9 +75,75 @@ export interface ContractDetail {
   remainingAmount: number;
   createdAt: string;
   updatedAt: string;
+  version: number; // 행 버전 — 입금 합계 등 집계만 바뀌어도 증가
   payments: Payment[];
 }
 
+// 전체 계약 목록 (GET /api/contracts) — 입금 내역 없이 합계만
+export interface ContractListItem extends Omit<ContractDetail, 'memo' | 'payments'> {
+  customerName: string;
+}
+
+export interface ContractPage {
+  items: ContractListItem[];
+  nextCursor: string | null;
+}
+
+// 은행 거래내역 대사 (POST /api/contracts/reconcile)
+export type ReconcileStatus = 'auto' | 'proposed' | 'duplicate' | 'unmatched';
+
+export interface ReconcileItem {
+  row: number;
+  date: string;
+  amount: number;
+  depositor: string;
+  status: ReconcileStatus;
+  contractId: number | null;
+  customerId: number | null;
+  customerName: string;
+  contractTitle: string;
+  remainingBefore: number | null;
+  score: number;
+  reasons: string[];
+  paymentId: number | null;
+}
+
+export interface ReconcileResult {
+  deposits: number;
+  auto: number;
+  proposed: number;
+  duplicate: number;
+  unmatched: number;
+  failed: number;
+  applied: number;
+  errors: { row: number; message: string }[];
+  items: ReconcileItem[];
+}
+
+export interface ReconcileConfirmItem {
+  contractId: number;
+  amount: number;
+  paidAt: string;
+  depositor?: string;
+  memo?: string;
+}
+
+export interface TaxInvoicePage extends ContractPage {
+  total: number; // 발행 대기 전체 건수
+}
+
+export interface ContractListParams {
+  state?: ContractState;
+  taxInvoiceIssued?: boolean;
+  customerId?: number;
+  dateFrom?: string; // YYYY-MM-DD
+  dateTo?: string;
+  minAmount?: number;
+  maxAmount?: number;
+  limit?: number;
+  cursor?: string;
+}
+
 export const emptyContract = (): ContractInput => ({
   title: '',
   contractAmount: 0,
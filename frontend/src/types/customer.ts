@@ -111,7 +111,15 @@ export interface CustomerDetail extends CustomerInput {
   id: number;
   createdAt: string;
   updatedAt: string;
+  version: number; // 행 버전 — 컨택 수/미수금 등 집계만 바뀌어도 증가
   contacts: Contact[];
+  contactTotal?: number; // 전체 컨택 수
+  contactsNextCursor?: string | null; // contactLimit 로 일부만 받았을 때 이전 컨택 커서
+}
+
+export interface ContactPage {
+  items: Contact[];
+  nextCursor: string | null;
 }
 
 export interface ContactInput {